@@ -1,64 +1,87 @@
 from web_scraping import JSONDownloader
-from read_test_data import TestMatchReader
-from read_odi_data import ODIMatchReader
-from read_t20_data import T20MatchReader
-from read_ipl_data import IPLMatchReader
+from ingest import MatchIngestor
 from create_tables import DatabaseHandler
+from parquet_store import ParquetStore
+import instrumentation
 
-def main():
-    """Main function to execute the cricket data pipeline"""
+def create_store(backend, readers, bulk_load=True, load_workers=4, commit_every="batch", parquet_root="parquet"):
+    """Create the storage backend: a ParquetStore under parquet_root, or a DatabaseHandler for MySQL
+
+    The DataFrames may not be built yet (streaming), so the deliveries tables to bulk load are
+    named from the readers.
+    """
+    if backend == "parquet":
+        return ParquetStore(root=parquet_root)
+    deliveries_tables = [f'{reader.format_name}_deliveries' for reader in readers]
+    bulk_load_tables = deliveries_tables if bulk_load else []
+    return DatabaseHandler(bulk_load_tables=bulk_load_tables, load_workers=load_workers, commit_every=commit_every)
+
+def main(workers=None, incremental=True, bulk_load=True, normalise=False, backend="mysql", stream=False, batch_matches=500,
+         load_workers=4, commit_every="batch", summaries=True, metrics_log=None, prometheus_file=None,
+         profile_stages=(), trace_memory_stages=()):
+    """Main function to execute the cricket data pipeline
+
+    workers sets the number of parsing processes (None uses one per CPU).
+    incremental only loads match files that are new or changed since the last run;
+    pass incremental=False to reload every table from scratch.
+    bulk_load loads the deliveries tables with LOAD DATA LOCAL INFILE (falling back to inserts).
+    normalise stores player/team/venue/official names as integer keys into dimension tables.
+    backend selects the storage: "mysql" (default) or "parquet" for season-partitioned Parquet files.
+    stream parses and stores batch_matches matches at a time, overlapping parsing with loading
+    so memory stays flat (parsing then runs in one background thread and workers is unused).
+    load_workers loads that many MySQL tables in parallel over pooled connections, and
+    commit_every sets the insert transaction size: "batch", "table" or a number of rows.
+    summaries also stores the pre-aggregated batting, bowling, phase and team total tables.
+    Every stage (downloads, parsing, DataFrame builds, table creates and loads) is timed:
+    metrics_log appends one JSON line per stage ("-" for stderr) and prometheus_file gets the
+    totals in the Prometheus text format. profile_stages / trace_memory_stages name stages
+    (e.g. "insert", or "*" for all) to run under cProfile (.prof files in profiles/) or tracemalloc.
+    """
+    recorder = instrumentation.configure(log_path=metrics_log, prometheus_path=prometheus_file,
+                                         profile_stages=profile_stages, trace_memory_stages=trace_memory_stages)
     print("=== Starting Cricket Match Data Processing Pipeline ===")
     
     # Step 1: Download cricket match data
     print("\n=== Downloading Cricket Match Data ===")
-    downloader = JSONDownloader(download_dir="data")
-    downloader.scrape_and_download()
-    
-    # Step 2: Process Test match data
-    print("\n=== Processing Test Match Data ===")
-    test_reader = TestMatchReader(data_folder="data")
-    test_dataframes = test_reader.read_data()
-    
-    if test_dataframes:
-        print("\n=== Storing Test Match Data to MySQL ===")
-        db_handler = DatabaseHandler()
-        db_handler.process_dataframes(test_dataframes)
-        db_handler.close_connection()
+    with instrumentation.stage('download_step'):
+        downloader = JSONDownloader(download_dir="data")
+        downloader.scrape_and_download()
     
-    # Step 3: Process ODI match data
-    print("\n=== Processing ODI Match Data ===")
-    odi_reader = ODIMatchReader(data_folder="data")
-    odi_dataframes = odi_reader.read_data()
+    # Step 2: Process Test, ODI, T20 and IPL match data in a single pass over the archives
+    print("\n=== Processing Cricket Match Data ===")
+    ingestor = MatchIngestor(data_folder="data", normalise=normalise, summaries=summaries)
+    with instrumentation.stage('ingest_step'):
+        if stream:
+            dataframes = ingestor.iter_batches(batch_matches=batch_matches, incremental=incremental)
+            pending = bool(ingestor.member_crcs)
+        else:
+            dataframes = ingestor.read_data(workers=workers, incremental=incremental)
+            pending = bool(dataframes)
     
-    if odi_dataframes:
-        print("\n=== Storing ODI Match Data to MySQL ===")
-        db_handler = DatabaseHandler()
-        db_handler.process_dataframes(odi_dataframes)
+    # Step 3: Store every format's tables, then remember what was ingested
+    stored = True
+    if pending or ingestor.stale_match_ids:
+        print(f"\n=== Storing Cricket Match Data to {'Parquet' if backend == 'parquet' else 'MySQL'} ===")
+        db_handler = create_store(backend, ingestor.readers, bulk_load, load_workers, commit_every)
+        # Streamed batches are parsed while they are stored, so the store step includes their parsing
+        with instrumentation.stage('store_step', backend=backend) as timer:
+            if stream:
+                stored = db_handler.process_stream(dataframes, stale_match_ids=ingestor.stale_match_ids)
+            else:
+                stored = db_handler.process_dataframes(dataframes, stale_match_ids=ingestor.stale_match_ids)
+            timer['error'] = not stored
         db_handler.close_connection()
+    else:
+        print("\nNo new or changed matches to store")
     
-    # Step 4: Process T20 match data
-    print("\n=== Processing T20 Match Data ===")
-    t20_reader = T20MatchReader(data_folder="data")
-    t20_dataframes = t20_reader.read_data()
-    
-    if t20_dataframes:
-        print("\n=== Storing T20 Match Data to MySQL ===")
-        db_handler = DatabaseHandler()
-        db_handler.process_dataframes(t20_dataframes)
-        db_handler.close_connection()
-    
-    # Step 5: Process IPL match data
-    print("\n=== Processing IPL Match Data ===")
-    ipl_reader = IPLMatchReader(data_folder="data")
-    ipl_dataframes = ipl_reader.read_data()
-    
-    if ipl_dataframes:
-        print("\n=== Storing IPL Match Data to MySQL ===")
-        db_handler = DatabaseHandler()
-        db_handler.process_dataframes(ipl_dataframes)
-        db_handler.close_connection()
+    if stored:
+        ingestor.save_manifest()
     
+    print("\n=== Stage Timings ===")
+    recorder.report()
+    if recorder.write_prometheus():
+        print(f"Metrics written to {prometheus_file}")
     print("\n=== Pipeline Completed ===")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
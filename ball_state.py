@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from metrics import legal_balls, column
+
+# Dismissals that do not count as a wicket falling - the batter retires but is not out
+NOT_WICKETS = ('retired hurt', 'retired not out')
+
+def innings_starts(deliveries):
+    """Return a boolean array marking the first delivery of every innings"""
+    match_codes = pd.factorize(deliveries['match_id'])[0]
+    innings_number = deliveries['innings_number'].to_numpy()
+    starts = np.ones(len(deliveries), dtype=bool)
+    starts[1:] = (match_codes[1:] != match_codes[:-1]) | (innings_number[1:] != innings_number[:-1])
+    return starts
+
+def innings_cumsum(values, starts):
+    """Running total of values that restarts at every innings start"""
+    values = np.asarray(values, dtype=np.int64)
+    totals = np.cumsum(values)
+    first_row = np.flatnonzero(starts)[np.cumsum(starts) - 1]
+    return totals - (totals - values)[first_row]
+
+def overs_to_balls(overs, balls_per_over):
+    """Convert overs in overs notation (e.g. 46.4 = 46 overs and 4 balls) to balls"""
+    whole = np.floor(overs)
+    return whole * balls_per_over + np.round((overs - whole) * 10)
+
+def add_ball_state(deliveries, innings=None, matches=None):
+    """Add the state of the innings after each delivery to a deliveries DataFrame, in place
+
+    - innings_runs: runs scored so far, extras included
+    - innings_wickets: wickets fallen so far (a batter retiring hurt or not out is not a wicket)
+    - innings_balls: legal balls bowled so far
+
+    Innings with a target (innings table target_runs/target_overs, i.e. chases in limited-overs
+    cricket) also get runs_required, balls_remaining and required_run_rate (runs per over, NaN
+    once no balls remain); other innings get missing values. balls_per_over comes from the
+    matches table. Deliveries must be in the order they were bowled, as the readers build them.
+    """
+    if deliveries.empty:
+        return deliveries
+    starts = innings_starts(deliveries)
+    player_out = column(deliveries, 'wicket_player_out')
+    wicket = (player_out.notna() & (player_out.astype(object) != '')
+              & ~column(deliveries, 'wicket_kind').astype(object).isin(NOT_WICKETS)).to_numpy()
+    deliveries['innings_runs'] = innings_cumsum(deliveries['runs_total'].to_numpy(), starts)
+    deliveries['innings_wickets'] = innings_cumsum(wicket, starts)
+    deliveries['innings_balls'] = innings_cumsum(legal_balls(deliveries), starts)
+
+    if innings is None or 'target_runs' not in innings.columns:
+        return deliveries
+    keys = deliveries[['match_id', 'innings_number']]
+    targets = innings[['match_id', 'innings_number', 'target_runs']].copy()
+    targets['target_overs'] = innings['target_overs'] if 'target_overs' in innings.columns else np.nan
+    if matches is not None and 'balls_per_over' in matches.columns:
+        match_overs = matches[['match_id', 'balls_per_over']].copy()
+        match_overs['overs'] = matches['overs'] if 'overs' in matches.columns else np.nan
+        targets = targets.merge(match_overs, on='match_id', how='left')
+    else:
+        targets['balls_per_over'] = 6
+        targets['overs'] = np.nan
+    # Left merge on the innings keys keeps the deliveries' order
+    state = keys.merge(targets, on=['match_id', 'innings_number'], how='left')
+
+    balls_per_over = pd.to_numeric(state['balls_per_over'], errors='coerce').fillna(6).to_numpy(dtype=float)
+    target_overs = pd.to_numeric(state['target_overs'], errors='coerce').to_numpy(dtype=float)
+    # A target without its own overs is set over the full match
+    target_overs = np.where(np.isnan(target_overs),
+                            pd.to_numeric(state['overs'], errors='coerce').to_numpy(dtype=float), target_overs)
+    target_runs = pd.to_numeric(state['target_runs'], errors='coerce').to_numpy(dtype=float)
+
+    runs_required = target_runs - deliveries['innings_runs'].to_numpy()
+    # Only innings with a target have balls remaining
+    balls_remaining = np.where(np.isnan(target_runs), np.nan,
+                               overs_to_balls(target_overs, balls_per_over) - deliveries['innings_balls'].to_numpy())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        required_run_rate = np.where(balls_remaining > 0,
+                                     np.maximum(runs_required, 0) * balls_per_over / balls_remaining, np.nan)
+    deliveries['runs_required'] = runs_required
+    deliveries['balls_remaining'] = balls_remaining
+    deliveries['required_run_rate'] = np.round(required_run_rate, 2)
+    return deliveries
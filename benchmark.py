@@ -0,0 +1,498 @@
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import pandas as pd
+from datetime import datetime, timezone
+from contextlib import redirect_stdout
+from read_test_data import TestMatchReader
+from read_odi_data import ODIMatchReader
+from read_t20_data import T20MatchReader
+from read_ipl_data import IPLMatchReader
+from columnar import DeliveryColumns
+from create_tables import iter_record_batches
+from match_reader import list_json_files, iter_zip_contents, parse_member
+from ingest import MatchIngestor, default_readers
+from summaries import add_summaries
+from dtypes import compact_dataframes
+from json_decoding import available_decoders, default_decoder
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage
+    resource = None
+
+READERS = {
+    'test': TestMatchReader,
+    'odi': ODIMatchReader,
+    't20': T20MatchReader,
+    'ipl': IPLMatchReader
+}
+
+class DeliveryRecords(list):
+    """Reference list-of-dicts delivery accumulator (the readers' former approach) for comparison"""
+
+    def append(self, match_id, innings_number, over_number, ball_number, team, delivery):
+        """Append one Cricsheet delivery as a dict record"""
+        record = {
+            'match_id': match_id,
+            'innings_number': innings_number,
+            'over_number': over_number,
+            'ball_number': ball_number,
+            'team': team,
+            'batter': delivery.get('batter', ''),
+            'bowler': delivery.get('bowler', ''),
+            'non_striker': delivery.get('non_striker', ''),
+            'runs_batter': delivery.get('runs', {}).get('batter', 0),
+            'runs_extras': delivery.get('runs', {}).get('extras', 0),
+            'runs_total': delivery.get('runs', {}).get('total', 0),
+            'extras_wides': delivery.get('extras', {}).get('wides', 0),
+            'extras_noballs': delivery.get('extras', {}).get('noballs', 0),
+            'extras_byes': delivery.get('extras', {}).get('byes', 0),
+            'extras_legbyes': delivery.get('extras', {}).get('legbyes', 0),
+            'extras_penalty': delivery.get('extras', {}).get('penalty', 0)
+        }
+        for wicket in delivery.get('wickets', [])[:1]:
+            record['wicket_player_out'] = wicket.get('player_out', '')
+            record['wicket_kind'] = wicket.get('kind', '')
+            if 'fielders' in wicket:
+                record['wicket_fielders'] = ', '.join(f.get('name', '') for f in wicket.get('fielders', []))
+        super().append(record)
+
+    def to_frame(self):
+        """Build the deliveries DataFrame from the dict records"""
+        return pd.DataFrame(self)
+
+def time_call(func, repeat=1):
+    """Run a function silently and return its best wall-clock time and last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def benchmark_workers(data_folder, formats, worker_counts, repeat=1):
+    """Time read_data per format for each worker count and report the scaling"""
+    results = []
+    for format_name in formats:
+        reader = READERS[format_name](data_folder=data_folder)
+        if not reader.find_zip():
+            print(f"No {reader.label} data ZIP file found in {data_folder}, skipping")
+            continue
+
+        baseline = None
+        for workers in worker_counts:
+            elapsed, dataframes = time_call(lambda: reader.read_data(workers=workers), repeat)
+            deliveries = len(dataframes.get(f'{format_name}_deliveries', []))
+            if baseline is None:
+                baseline = elapsed  # worker counts start at 1
+            speedup = baseline / elapsed
+            results.append({
+                'format': format_name,
+                'workers': workers,
+                'seconds': round(elapsed, 3),
+                'deliveries': deliveries,
+                'speedup': round(speedup, 2),
+                'efficiency': round(speedup / workers, 2)
+            })
+            print(f"{reader.label:>5} workers={workers:<3} {elapsed:8.2f}s  "
+                  f"{deliveries / elapsed:12,.0f} deliveries/s  speedup x{speedup:.2f}")
+    return results
+
+def benchmark_memory(data_folder, formats):
+    """Compare peak memory of read_data with the columnar and the list-of-dicts delivery builders"""
+    results = []
+    for format_name in formats:
+        reader = READERS[format_name](data_folder=data_folder)
+        if not reader.find_zip():
+            print(f"No {reader.label} data ZIP file found in {data_folder}, skipping")
+            continue
+
+        peaks = {}
+        for builder in (DeliveryRecords, DeliveryColumns):
+            reader.delivery_builder = builder
+            tracemalloc.start()
+            elapsed, dataframes = time_call(lambda: reader.read_data(workers=1))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            deliveries = dataframes.get(f'{format_name}_deliveries', pd.DataFrame())
+            frame_mb = deliveries.memory_usage(deep=True).sum() / 2**20
+            peaks[builder.__name__] = peak
+            results.append({
+                'format': format_name,
+                'builder': builder.__name__,
+                'seconds': round(elapsed, 3),
+                'deliveries': len(deliveries),
+                'peak_mb': round(peak / 2**20, 1),
+                'frame_mb': round(frame_mb, 1)
+            })
+            print(f"{reader.label:>5} {builder.__name__:<16} {elapsed:8.2f}s  peak {peak / 2**20:10.1f} MB  "
+                  f"deliveries frame {frame_mb:8.1f} MB")
+            del dataframes, deliveries
+
+        reduction = peaks['DeliveryRecords'] / max(peaks['DeliveryColumns'], 1)
+        print(f"{reader.label:>5} peak memory reduced x{reduction:.1f}")
+    return results
+
+def benchmark_export(data_folder, formats, batch_size=1000):
+    """Measure rows/sec of the insert record export for each deliveries table (no database needed)"""
+    results = []
+    for format_name in formats:
+        reader = READERS[format_name](data_folder=data_folder)
+        if not reader.find_zip():
+            print(f"No {reader.label} data ZIP file found in {data_folder}, skipping")
+            continue
+
+        _, dataframes = time_call(lambda: reader.read_data(workers=1))
+        table_name = f'{format_name}_deliveries'
+        df = dataframes[table_name]
+        elapsed, rows = time_call(lambda: sum(len(batch) for batch in iter_record_batches(df, batch_size)))
+        results.append({
+            'table': table_name,
+            'rows': rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed)
+        })
+        print(f"{table_name:>16} {rows:10,} rows {elapsed:8.2f}s  {rows / elapsed:12,.0f} rows/s")
+    return results
+
+def benchmark_decoders(data_folder, formats, decoders=None, repeat=1):
+    """Compare decode and flatten time per 1,000 matches of each JSON decoder, per format
+
+    Speedups are relative to the standard library decoder, which runs first.
+    """
+    decoders = sorted(decoders or available_decoders(), key=lambda decoder: decoder != 'json')
+    results = []
+    for format_name in formats:
+        reader = READERS[format_name](data_folder=data_folder)
+        zip_file = reader.find_zip()
+        if not zip_file:
+            print(f"No {reader.label} data ZIP file found in {data_folder}, skipping")
+            continue
+        zip_path = os.path.join(data_folder, zip_file)
+        json_files = [json_file for json_file, _ in list_json_files(zip_path)]
+
+        baseline = None
+        for decoder in decoders:
+            decode_seconds, parsed = time_call(lambda: list(iter_zip_contents(zip_path, json_files, decoder)), repeat)
+
+            def flatten():
+                containers = {reader.format_name: reader.new_containers()}
+                for json_file, match_list in parsed:
+                    parse_member([reader], json_file, match_list, containers)
+                return containers[reader.format_name]
+
+            flatten_seconds, containers = time_call(flatten, repeat)
+            matches = len(containers['matches'])
+            if not matches:
+                print(f"{reader.label:>5} {decoder:<8} no {reader.label} matches in {zip_file}")
+                continue
+            per_1000 = 1000 / matches
+            total = (decode_seconds + flatten_seconds) * per_1000
+            if baseline is None:
+                baseline = total
+            results.append({
+                'format': format_name,
+                'decoder': decoder,
+                'matches': matches,
+                'deliveries': len(containers['deliveries']),
+                'decode_seconds_per_1000': round(decode_seconds * per_1000, 3),
+                'flatten_seconds_per_1000': round(flatten_seconds * per_1000, 3),
+                'seconds_per_1000': round(total, 3),
+                'speedup': round(baseline / total, 2)
+            })
+            print(f"{reader.label:>5} {decoder:<8} per 1,000 matches: decode {decode_seconds * per_1000:7.2f}s  "
+                  f"flatten {flatten_seconds * per_1000:7.2f}s  total {total:7.2f}s  x{baseline / total:.2f}")
+            del parsed, containers
+    return results
+
+def benchmark_cache(data_folder, formats, repeat=1):
+    """Compare read_data with a cold and a warm parsed match cache against parsing, and against inflating the members
+
+    Inflating every JSON member without decoding it is the floor for any run that parses.
+    """
+    results = []
+    for format_name in formats:
+        reader = READERS[format_name](data_folder=data_folder)
+        zip_file = reader.find_zip()
+        if not zip_file:
+            print(f"No {reader.label} data ZIP file found in {data_folder}, skipping")
+            continue
+        zip_path = os.path.join(data_folder, zip_file)
+
+        def inflate():
+            with zipfile.ZipFile(zip_path) as z:
+                return sum(len(z.read(json_file)) for json_file, _ in list_json_files(zip_path))
+
+        cache_dir = tempfile.mkdtemp(prefix='cricket_cache_')
+        try:
+            inflate_seconds, _ = time_call(inflate, repeat)
+            parse_seconds, dataframes = time_call(lambda: reader.read_data(), repeat)
+            cold_seconds, _ = time_call(lambda: reader.read_data(cache_dir=cache_dir))
+            warm_seconds, _ = time_call(lambda: reader.read_data(cache_dir=cache_dir), repeat)
+            cache_bytes = sum(os.path.getsize(os.path.join(folder, f))
+                              for folder, _, files in os.walk(cache_dir) for f in files)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        results.append({
+            'format': format_name,
+            'matches': len(dataframes.get(f'{format_name}_matches', [])),
+            'inflate_seconds': round(inflate_seconds, 3),
+            'parse_seconds': round(parse_seconds, 3),
+            'cold_cache_seconds': round(cold_seconds, 3),
+            'warm_cache_seconds': round(warm_seconds, 3),
+            'cache_mb': round(cache_bytes / 2**20, 1),
+            'speedup': round(parse_seconds / warm_seconds, 2)
+        })
+        print(f"{reader.label:>5} inflate {inflate_seconds:7.2f}s  parse {parse_seconds:7.2f}s  "
+              f"cold cache {cold_seconds:7.2f}s  warm cache {warm_seconds:7.2f}s  "
+              f"x{parse_seconds / warm_seconds:.1f}  ({cache_bytes / 2**20:.1f}MB cached)")
+    return results
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process so far in MB, or None where it is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+def git_commit():
+    """Return the commit the benchmark runs on (with a -dirty suffix for uncommitted changes), or None"""
+    repo = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if status else commit
+
+def stage_record(stage, elapsed, items, unit, **extra):
+    """Build the result of one pipeline stage and print it"""
+    record = {
+        'stage': stage,
+        'seconds': round(elapsed, 3),
+        'items': items,
+        'unit': unit,
+        'items_per_sec': round(items / elapsed) if elapsed > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+        **extra
+    }
+    print(f"{stage:<8} {elapsed:8.2f}s  {items:>10,} {unit:<10} {record['items_per_sec'] or 0:>12,}/s  "
+          f"peak RSS {record['peak_rss_mb'] or 0:8.1f} MB")
+    return record
+
+def benchmark_pipeline(data_folder, load="parquet", work_folder=None, database="cricketdata_benchmark"):
+    """Time each pipeline stage on the archives of a data folder and return the results as a dict
+
+    - scan: list the JSON members of every archive
+    - parse: decompress and decode the JSON of every member
+    - flatten: route each match to its reader and accumulate the rows
+    - build: build the DataFrames, summary tables and compact dtypes, as MatchIngestor.read_data does
+    - load: store the tables with ParquetStore (under work_folder) or DatabaseHandler (the given
+      database, never the default one); load="none" skips it
+    - query: run the query catalogue on DuckDB over the stored Parquet files (or the DataFrames)
+
+    Stages run one after another in this process, so each one's time is its own. Peak RSS is the
+    process high-water mark after the stage, so a stage that raises it is where memory peaked.
+    """
+    from query_catalog import QUERIES, QueryEngine
+    readers = default_readers(data_folder)
+    work_folder = work_folder or tempfile.mkdtemp(prefix='cricket_benchmark_')
+    ingestor = MatchIngestor(data_folder, readers=readers, manifest_path=os.path.join(work_folder, 'manifest.json'))
+    zip_paths = [os.path.join(data_folder, zip_file) for zip_file in ingestor.find_zips()]
+    if not zip_paths:
+        raise FileNotFoundError(f"No Cricsheet ZIP files found in {data_folder}")
+
+    stages = []
+    elapsed, zip_members = time_call(
+        lambda: [(zip_path, [json_file for json_file, _ in list_json_files(zip_path)]) for zip_path in zip_paths])
+    files = sum(len(json_files) for _, json_files in zip_members)
+    stages.append(stage_record('scan', elapsed, files, 'files'))
+
+    json_bytes = 0
+    for zip_path in zip_paths:
+        with zipfile.ZipFile(zip_path) as z:
+            json_bytes += sum(i.file_size for i in z.infolist() if i.filename.endswith('.json'))
+    elapsed, parsed = time_call(lambda: [
+        member for zip_path, json_files in zip_members for member in iter_zip_contents(zip_path, json_files)])
+    matches = sum(len(match_list) for _, match_list in parsed)
+    stages.append(stage_record('parse', elapsed, matches, 'matches',
+                               json_mb_per_sec=round(json_bytes / 2**20 / elapsed, 1) if elapsed > 0 else None))
+
+    containers = {reader.format_name: reader.new_containers() for reader in readers}
+    elapsed, _ = time_call(lambda: [parse_member(readers, json_file, match_list, containers)
+                                    for json_file, match_list in parsed])
+    del parsed
+    deliveries = sum(len(tables['deliveries']) for tables in containers.values())
+    stages.append(stage_record('flatten', elapsed, deliveries, 'deliveries'))
+
+    def build():
+        dataframes = {}
+        for reader in readers:
+            chunk = reader.build_frames(containers[reader.format_name])
+            dataframes.update(reader.build_dataframes([chunk], verbose=False))
+        add_summaries(dataframes, readers, verbose=False)
+        compact_dataframes(dataframes, verbose=False)
+        return dataframes
+
+    elapsed, dataframes = time_call(build)
+    del containers
+    rows = sum(len(df) for df in dataframes.values())
+    stages.append(stage_record('build', elapsed, rows, 'rows', tables=len(dataframes)))
+
+    parquet_root = os.path.join(work_folder, 'parquet')
+    if load == "parquet":
+        from parquet_store import ParquetStore
+        store = ParquetStore(root=parquet_root)
+        elapsed, _ = time_call(lambda: store.process_dataframes(dataframes))
+        stages.append(stage_record('load', elapsed, rows, 'rows', backend=load))
+    elif load == "mysql":
+        from create_tables import DatabaseHandler
+        deliveries_tables = [f'{reader.format_name}_deliveries' for reader in readers]
+        with redirect_stdout(io.StringIO()):
+            handler = DatabaseHandler(database=database, bulk_load_tables=deliveries_tables)
+        if handler.pool is None:
+            print("Could not connect to MySQL, skipping the load stage")
+        else:
+            elapsed, stored = time_call(lambda: handler.process_dataframes(dataframes))
+            handler.close_connection()
+            if stored:
+                stages.append(stage_record('load', elapsed, rows, 'rows', backend=load))
+            else:
+                print("The MySQL load failed, skipping its timing")
+
+    engine = QueryEngine()
+    with redirect_stdout(io.StringIO()):
+        if load == "parquet":
+            engine.register_parquet(parquet_root)
+        else:
+            engine.register_dataframes(dataframes)
+    query_seconds = {}
+    for name in QUERIES:
+        try:
+            elapsed, _ = time_call(lambda: engine.run(name))
+        except KeyError:
+            continue  # a format the archives do not hold
+        query_seconds[name] = round(elapsed, 4)
+    engine.close()
+    stages.append(stage_record('query', sum(query_seconds.values()), len(query_seconds), 'queries',
+                               engine=engine.engine, source=load if load == "parquet" else "dataframes"))
+
+    return {
+        'commit': git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'data_folder': data_folder,
+        'archives': [os.path.basename(zip_path) for zip_path in zip_paths],
+        'matches': matches,
+        'deliveries': deliveries,
+        'json_mb': round(json_bytes / 2**20, 1),
+        'json_decoder': default_decoder(),
+        'total_seconds': round(sum(stage['seconds'] for stage in stages), 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': stages,
+        'query_seconds': query_seconds
+    }
+
+def compare_results(baseline, results):
+    """Print the change of each stage's time and peak RSS from a baseline run's results"""
+    before = {stage['stage']: stage for stage in baseline['stages']}
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('matches')} matches):")
+    if baseline.get('matches') != results['matches']:
+        print("The runs used different data, compare the items/sec in the JSON results")
+    for stage in results['stages'] + [{'stage': 'total', 'seconds': results['total_seconds']}]:
+        old = before.get(stage['stage']) or ({'seconds': baseline['total_seconds']} if stage['stage'] == 'total' else None)
+        if old is None or not old['seconds']:
+            continue
+        change = stage['seconds'] / old['seconds'] - 1
+        print(f"{stage['stage']:<8} {old['seconds']:8.2f}s -> {stage['seconds']:8.2f}s  {change:+7.1%}")
+    if baseline.get('peak_rss_mb') and results.get('peak_rss_mb'):
+        print(f"{'peak RSS':<8} {baseline['peak_rss_mb']:8.1f}MB -> {results['peak_rss_mb']:8.1f}MB")
+
+def main():
+    """Command line entry point for the parsing benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark parallel parsing of the Cricsheet archives")
+    parser.add_argument('--data-folder', default='data')
+    parser.add_argument('--formats', nargs='+', default=['odi', 'test'], choices=sorted(READERS))
+    parser.add_argument('--workers', nargs='+', type=int,
+                        default=sorted({1, 2, 4, 8, os.cpu_count() or 1}))
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--memory', action='store_true',
+                        help="compare peak memory of the columnar and list-of-dicts delivery builders")
+    parser.add_argument('--export', action='store_true',
+                        help="measure rows/sec of the database record export for the deliveries tables")
+    parser.add_argument('--decode', action='store_true',
+                        help="compare decode and flatten time per 1,000 matches of each JSON decoder")
+    parser.add_argument('--decoders', nargs='+', choices=available_decoders(),
+                        help="decoders for --decode (default: every installed one)")
+    parser.add_argument('--cache', action='store_true',
+                        help="compare read_data with a cold and a warm parsed match cache against parsing")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="time every pipeline stage (scan, parse, flatten, build, load, query) and write JSON results")
+    parser.add_argument('--generate', type=int, metavar='MATCHES',
+                        help="run the pipeline benchmark on MATCHES synthetic matches per format instead of --data-folder")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the synthetic archives")
+    parser.add_argument('--load', choices=['parquet', 'mysql', 'none'], default='parquet',
+                        help="where the pipeline benchmark stores the tables")
+    parser.add_argument('--database', default='cricketdata_benchmark', help="MySQL database for --load mysql")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file for the pipeline results")
+    parser.add_argument('--compare', metavar='JSON', help="earlier pipeline results to compare with")
+    args = parser.parse_args()
+
+    if args.pipeline or args.generate:
+        work_folder = tempfile.mkdtemp(prefix='cricket_benchmark_')
+        try:
+            data_folder = args.data_folder
+            if args.generate:
+                from synthetic_data import SyntheticArchiveGenerator
+                data_folder = os.path.join(work_folder, 'data')
+                SyntheticArchiveGenerator(data_folder, matches=args.generate, seed=args.seed).generate()
+            results = benchmark_pipeline(data_folder, args.load, work_folder, args.database)
+        finally:
+            shutil.rmtree(work_folder, ignore_errors=True)
+        if args.generate:
+            results.update(data_folder=None, synthetic={'matches_per_format': args.generate, 'seed': args.seed})
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+        print(f"Results written to {args.output}")
+        if args.compare:
+            with open(args.compare) as f:
+                compare_results(json.load(f), results)
+        return
+
+    if args.export:
+        benchmark_export(args.data_folder, args.formats)
+        return
+    if args.cache:
+        benchmark_cache(args.data_folder, args.formats, args.repeat)
+        return
+    if args.decode:
+        benchmark_decoders(args.data_folder, args.formats, args.decoders, args.repeat)
+        return
+    if args.memory:
+        benchmark_memory(args.data_folder, args.formats)
+        return
+
+    worker_counts = sorted(set(args.workers) | {1})
+    benchmark_workers(args.data_folder, args.formats, worker_counts, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+class StringPool:
+    """Class to intern repeated strings (players, teams, match IDs) as integer codes"""
+
+    def __init__(self):
+        """Initialize an empty pool"""
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        """Return the code of a string, adding it to the pool if needed"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, codes, missing=False):
+        """Map an array of codes back to an object array sharing the pooled strings
+
+        With missing=True the code -1 is decoded as NaN.
+        """
+        values = np.empty(len(self.values) + 1, dtype=object)
+        values[:-1] = self.values
+        values[-1] = np.nan
+        codes = np.frombuffer(codes, dtype=np.int32) if len(codes) else np.empty(0, dtype=np.int32)
+        return values[codes] if missing else values[:-1][codes]
+
+class DeliveryColumns:
+    """Columnar accumulator for ball-by-ball rows, one typed array per column"""
+
+    string_columns = ('match_id', 'team', 'batter', 'bowler', 'non_striker')
+    int_columns = ('innings_number', 'over_number', 'ball_number', 'runs_batter', 'runs_extras', 'runs_total',
+                   'extras_wides', 'extras_noballs', 'extras_byes', 'extras_legbyes', 'extras_penalty')
+    # Wicket columns only exist once a delivery has a wicket (-1 marks deliveries without one)
+    wicket_columns = ('wicket_player_out', 'wicket_kind', 'wicket_fielders')
+    # Output column order, matching the original per-delivery records
+    column_order = ('match_id', 'innings_number', 'over_number', 'ball_number', 'team', 'batter', 'bowler',
+                    'non_striker', 'runs_batter', 'runs_extras', 'runs_total', 'extras_wides', 'extras_noballs',
+                    'extras_byes', 'extras_legbyes', 'extras_penalty') + wicket_columns
+
+    def __init__(self):
+        """Initialize empty typed column arrays"""
+        self.strings = StringPool()
+        self.columns = {name: array('i') for name in self.string_columns + self.wicket_columns}
+        self.columns.update({name: array('q') for name in self.int_columns})
+        self.has_wickets = False
+        self.has_fielders = False
+
+    def __len__(self):
+        return len(self.columns['match_id'])
+
+    def append(self, match_id, innings_number, over_number, ball_number, team, delivery):
+        """Append one Cricsheet delivery"""
+        code = self.strings.code
+        columns = self.columns
+        runs = delivery.get('runs', {})
+        extras = delivery.get('extras', {})
+
+        columns['match_id'].append(code(match_id))
+        columns['innings_number'].append(innings_number)
+        columns['over_number'].append(over_number)
+        columns['ball_number'].append(ball_number)
+        columns['team'].append(code(team))
+        columns['batter'].append(code(delivery.get('batter', '')))
+        columns['bowler'].append(code(delivery.get('bowler', '')))
+        columns['non_striker'].append(code(delivery.get('non_striker', '')))
+        columns['runs_batter'].append(runs.get('batter', 0))
+        columns['runs_extras'].append(runs.get('extras', 0))
+        columns['runs_total'].append(runs.get('total', 0))
+        columns['extras_wides'].append(extras.get('wides', 0))
+        columns['extras_noballs'].append(extras.get('noballs', 0))
+        columns['extras_byes'].append(extras.get('byes', 0))
+        columns['extras_legbyes'].append(extras.get('legbyes', 0))
+        columns['extras_penalty'].append(extras.get('penalty', 0))
+
+        # Process wicket information - only the first wicket is stored in the delivery row
+        wickets = delivery.get('wickets')
+        if wickets:
+            wicket = wickets[0]
+            self.has_wickets = True
+            columns['wicket_player_out'].append(code(wicket.get('player_out', '')))
+            columns['wicket_kind'].append(code(wicket.get('kind', '')))
+            if 'fielders' in wicket:
+                self.has_fielders = True
+                fielders = [f.get('name', '') for f in wicket.get('fielders', [])]
+                columns['wicket_fielders'].append(code(', '.join(fielders)))
+            else:
+                columns['wicket_fielders'].append(-1)
+        else:
+            columns['wicket_player_out'].append(-1)
+            columns['wicket_kind'].append(-1)
+            columns['wicket_fielders'].append(-1)
+
+    def append_typed(self, match_id, innings_number, over_number, ball_number, team, delivery):
+        """Append one delivery decoded with the typed schema (cricsheet_schema.Delivery)
+
+        The schema has already validated the fields and filled in missing runs, so they are
+        read as attributes; absent extras and wickets are None.
+        """
+        code = self.strings.code
+        columns = self.columns
+        runs = delivery.runs
+        extras = delivery.extras
+
+        columns['match_id'].append(code(match_id))
+        columns['innings_number'].append(innings_number)
+        columns['over_number'].append(over_number)
+        columns['ball_number'].append(ball_number)
+        columns['team'].append(code(team))
+        columns['batter'].append(code(delivery.batter))
+        columns['bowler'].append(code(delivery.bowler))
+        columns['non_striker'].append(code(delivery.non_striker))
+        columns['runs_batter'].append(runs.batter)
+        columns['runs_extras'].append(runs.extras)
+        columns['runs_total'].append(runs.total)
+        if extras is None:
+            for name in ('extras_wides', 'extras_noballs', 'extras_byes', 'extras_legbyes', 'extras_penalty'):
+                columns[name].append(0)
+        else:
+            columns['extras_wides'].append(extras.wides)
+            columns['extras_noballs'].append(extras.noballs)
+            columns['extras_byes'].append(extras.byes)
+            columns['extras_legbyes'].append(extras.legbyes)
+            columns['extras_penalty'].append(extras.penalty)
+
+        wickets = delivery.wickets
+        if wickets:
+            wicket = wickets[0]
+            self.has_wickets = True
+            columns['wicket_player_out'].append(code(wicket.player_out))
+            columns['wicket_kind'].append(code(wicket.kind))
+            if wicket.fielders is not None:
+                self.has_fielders = True
+                columns['wicket_fielders'].append(code(', '.join(f.name for f in wicket.fielders)))
+            else:
+                columns['wicket_fielders'].append(-1)
+        else:
+            columns['wicket_player_out'].append(-1)
+            columns['wicket_kind'].append(-1)
+            columns['wicket_fielders'].append(-1)
+
+    def to_frame(self):
+        """Materialise the deliveries DataFrame straight from the column arrays
+
+        Each column array is released as soon as it is converted, so the builder is empty afterwards.
+        """
+        data = {}
+        for name in self.column_order:
+            column = self.columns.pop(name)
+            if name in self.wicket_columns:
+                if not self.has_wickets or (name == 'wicket_fielders' and not self.has_fielders):
+                    continue
+                data[name] = self.strings.decode(column, missing=True)
+            elif name in self.string_columns:
+                data[name] = self.strings.decode(column)
+            else:
+                data[name] = np.frombuffer(column, dtype=np.int64).copy()
+            del column
+        self.__init__()
+        return pd.DataFrame(data, copy=False)
@@ -1,22 +1,151 @@
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
 import pandas as pd
 import numpy as np
+import os
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import schema
+import instrumentation
+
+def column_values(series):
+    """Return a column as a NumPy array whose tolist() yields native Python values, plus its NaN mask"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.astype(object).to_numpy()
+    else:
+        values = series.to_numpy()
+    mask = series.isna().to_numpy()
+    return values, (mask if mask.any() else None)
+
+def iter_record_batches(df, batch_size=1000):
+    """Yield batches of row tuples with native Python values and NaN replaced by None
+
+    Columns are converted a batch at a time with vectorised tolist() calls, so the full
+    list of records is never materialised.
+    """
+    columns = [column_values(df[col]) for col in df.columns]
+    for start in range(0, len(df), batch_size):
+        stop = start + batch_size
+        batch_columns = []
+        for values, mask in columns:
+            batch_values = values[start:stop].tolist()
+            if mask is not None:
+                for idx in np.flatnonzero(mask[start:stop]):
+                    batch_values[idx] = None
+            batch_columns.append(batch_values)
+        yield list(zip(*batch_columns))
+
+def tsv_column(series):
+    """Format a column as LOAD DATA text: backslash-escaped strings, 1/0 booleans and \\N for NULL"""
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(series.dtype):
+        text = np.where(series.to_numpy(dtype=bool, na_value=False), '1', '0').astype(object)
+    elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        text = series.astype(str).to_numpy(dtype=object)
+    else:
+        text = (series.astype(object).where(~mask, '').astype(str)
+                .str.replace('\\', '\\\\', regex=False)
+                .str.replace('\t', '\\t', regex=False)
+                .str.replace('\n', '\\n', regex=False)
+                .str.replace('\r', '\\r', regex=False)
+                .to_numpy(dtype=object))
+    text[mask] = '\\N'
+    return text
+
+def write_tsv(df, path, chunk_rows=100000):
+    """Write a DataFrame as a tab separated file for LOAD DATA, building lines a chunk at a time"""
+    columns = [tsv_column(df[col]) for col in df.columns]
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for start in range(0, len(df), chunk_rows):
+            lines = columns[0][start:start + chunk_rows]
+            for column in columns[1:]:
+                lines = lines + '\t' + column[start:start + chunk_rows]
+            f.write('\n'.join(lines))
+            f.write('\n')
+
+def rollback(connection):
+    """Roll back a failed transaction; a dropped connection has nothing left to roll back"""
+    try:
+        connection.rollback()
+    except Error:
+        pass
 
 class DatabaseHandler:
     """Class to handle database operations for cricket data"""
     
-    def __init__(self, host="localhost", user="root", password="2003", database="cricketdata"):
-        """Initialize with database connection parameters"""
+    def __init__(self, host="localhost", user="root", password="2003", database="cricketdata", bulk_load_tables=(),
+                 load_workers=1, commit_every="batch", pool_size=None):
+        """Initialize with database connection parameters
+
+        Tables named in bulk_load_tables are loaded with LOAD DATA LOCAL INFILE instead of batched inserts.
+        load_workers tables are loaded in parallel, each over its own pooled connection.
+        commit_every sets the transaction granularity of inserts: "batch" (every executemany batch),
+        "table" (one transaction per table load) or a number of rows.
+        """
+        if commit_every not in ("batch", "table") and not (isinstance(commit_every, int) and commit_every > 0):
+            raise ValueError(f"commit_every must be 'batch', 'table' or a positive row count, not {commit_every!r}")
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
+        self.bulk_load_tables = set(bulk_load_tables)
+        self.load_workers = max(1, load_workers)
+        self.commit_every = commit_every
+        # One connection for the calling thread plus one per load worker
+        self.pool_size = pool_size or self.load_workers + 1
+        self.pool = None
+        # Each thread borrows its own connection from the pool
+        self.local = threading.local()
+        # Rows, seconds and rows/sec of every insert, keyed by table name
+        self.load_stats = {}
         self.connect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_connection()
+
+    @property
+    def connection(self):
+        """The calling thread's pooled connection, borrowed on first use
+
+        A connection that dropped (idle past the server's wait_timeout, or a server restart) is
+        handed back and a fresh one borrowed - the pool reconnects it. None if the server cannot
+        be reached.
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None and not connection.is_connected():
+            print("MySQL connection lost, reconnecting")
+            self.release_connection()
+            connection = None
+        if connection is None and self.pool is not None:
+            try:
+                connection = self.local.connection = self.pool.get_connection()
+            except Error as e:
+                print(f"Error getting a pooled MySQL connection: {e}")
+        return connection
+
+    def release_connection(self):
+        """Return the calling thread's connection to the pool"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            self.local.connection = None
+            try:
+                connection.close()
+            except Error:
+                pass  # a dropped connection cannot reset its session, but is still returned to the pool
     
     def connect(self):
-        """Create a connection to MySQL database"""
+        """Create a connection to MySQL database
+
+        Replaces the pool, so connections borrowed from the previous one are dropped.
+        """
+        self.release_connection()
+        self.local = threading.local()
         try:
             connection = mysql.connector.connect(
                 host=self.host,
@@ -31,54 +160,111 @@ class DatabaseHandler:
                 cursor.close()
                 connection.close()
                 
-                # Reconnect with the database specified
-                connection = mysql.connector.connect(
+                # Pool connections to the database, shared by every table load
+                self.pool = MySQLConnectionPool(
+                    pool_name=f"cricket_{self.database}",
+                    pool_size=self.pool_size,
                     host=self.host,
                     user=self.user,
                     password=self.password,
-                    database=self.database
+                    database=self.database,
+                    allow_local_infile=bool(self.bulk_load_tables)
                 )
                 
-                print(f"Connected to MySQL database '{self.database}'")
-                self.connection = connection
+                print(f"Connected to MySQL database '{self.database}' (pool of {self.pool_size} connections)")
                 return True
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
             return False
     
     def close_connection(self):
-        """Close the database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Return the calling thread's database connection to the pool"""
+        if getattr(self.local, 'connection', None) is not None:
+            self.release_connection()
             print("MySQL connection closed")
     
-    def create_table(self, table_name, df):
-        """Create a table based on DataFrame columns"""
-        if not self.connection or not self.connection.is_connected():
+    def column_type(self, dtype, col_name=None):
+        """Map a column to its declared MySQL type, or infer one from the pandas dtype"""
+        declared = schema.column_type(col_name)
+        if declared:
+            return declared
+        # pandas' dtype checks also cover extension dtypes (nullable, string, categorical)
+        if pd.api.types.is_bool_dtype(dtype):
+            return "BOOLEAN"
+        elif pd.api.types.is_integer_dtype(dtype):
+            return "INT"
+        elif pd.api.types.is_float_dtype(dtype):
+            return "FLOAT"
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            return "DATETIME"
+        return "TEXT"  # Default to TEXT for strings and other types
+
+    def read_sql(self, query, params=None, cache=None):
+        """Run a SELECT and return the result as a DataFrame, through a QueryCache if given"""
+        def run_query():
+            return pd.read_sql(query, self.connection, params=params)
+        if cache is not None:
+            return cache.fetch(query, params, run_query)
+        return run_query()
+
+    def clean_column_name(self, col_name):
+        """Clean column name (remove special characters)"""
+        return ''.join(e if e.isalnum() else '_' for e in col_name)
+
+    def table_exists(self, table_name):
+        """Check whether a table exists in the database"""
+        cursor = self.connection.cursor()
+        cursor.execute("SHOW TABLES LIKE %s", (table_name,))
+        exists = cursor.fetchone() is not None
+        cursor.close()
+        return exists
+
+    def table_columns(self, table_name):
+        """Return the column names of a table, or an empty list if it does not exist"""
+        if not self.table_exists(table_name):
+            return []
+        cursor = self.connection.cursor()
+        cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+        columns = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return columns
+
+    @instrumentation.timed('create_table', lambda self, table_name, df, truncate=True: {'table': table_name})
+    def create_table(self, table_name, df, truncate=True):
+        """Create a table based on DataFrame columns and the declared schema
+
+        Columns use the declared types, primary key and secondary indexes from schema.py where
+        available. By default the table is dropped and recreated; with truncate=False existing
+        rows are kept and columns missing from the table are added.
+        """
+        # One connection for the whole method, so a commit never lands on a replacement connection
+        connection = self.connection
+        if connection is None:
             print("Database connection is not established")
             return False
             
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
-            # Determine MySQL column types based on DataFrame dtypes
+            # Determine MySQL column types from the declared schema, or based on DataFrame dtypes
+            columns = [self.clean_column_name(col_name) for col_name in df.columns]
+            primary_key, indexes = schema.table_keys(table_name)
+            primary_key = [col for col in primary_key if col in columns]
             column_defs = []
-            for col_name, dtype in df.dtypes.items():
-                # Map pandas dtypes to MySQL types
-                if np.issubdtype(dtype, np.integer):
-                    col_type = "INT"
-                elif np.issubdtype(dtype, np.floating):
-                    col_type = "FLOAT"
-                elif np.issubdtype(dtype, np.datetime64):
-                    col_type = "DATETIME"
-                elif np.issubdtype(dtype, np.bool_):
-                    col_type = "BOOLEAN"
-                else:
-                    col_type = "TEXT"  # Default to TEXT for strings and other types
-                    
-                # Clean column name (remove special characters)
-                clean_col_name = ''.join(e if e.isalnum() else '_' for e in col_name)
-                column_defs.append(f"`{clean_col_name}` {col_type}")
+            for col_name, dtype in zip(columns, df.dtypes):
+                not_null = " NOT NULL" if col_name in primary_key else ""
+                column_defs.append(f"`{col_name}` {self.column_type(dtype, col_name)}{not_null}")
+            
+            # Keys and indexes on the columns this DataFrame has
+            if primary_key:
+                column_defs.append(f"PRIMARY KEY ({', '.join(f'`{col}`' for col in primary_key)})")
+            for index_name, index_columns in indexes.items():
+                if all(col in columns for col in index_columns):
+                    column_defs.append(f"INDEX `{index_name}` ({', '.join(f'`{col}`' for col in index_columns)})")
+            
+            if truncate:
+                # Recreate the table so the data is cleared and the declared schema applies
+                cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
             
             # Create table query
             create_table_query = f"""
@@ -90,9 +276,15 @@ class DatabaseHandler:
             cursor.execute(create_table_query)
             print(f"Table {table_name} created successfully")
             
-            # Truncate table if it exists (clear existing data)
-            cursor.execute(f"TRUNCATE TABLE {table_name}")
-            self.connection.commit()
+            if not truncate:
+                # Add columns that the existing table does not have yet
+                cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+                existing = {row[0] for row in cursor.fetchall()}
+                for col_name, dtype in zip(columns, df.dtypes):
+                    if col_name not in existing:
+                        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN `{col_name}` {self.column_type(dtype, col_name)}")
+                        print(f"Added column {col_name} to {table_name}")
+            connection.commit()
             
             cursor.close()
             return True
@@ -100,17 +292,45 @@ class DatabaseHandler:
             print(f"Error creating table {table_name}: {e}")
             return False
     
+    def delete_matches(self, table_name, match_ids):
+        """Delete the rows of the given matches from a table"""
+        connection = self.connection
+        if connection is None:
+            print("Database connection is not established")
+            return False
+        if not match_ids or not self.table_exists(table_name):
+            return True
+
+        try:
+            cursor = connection.cursor()
+            deleted = 0
+            batch_size = 1000
+            for i in range(0, len(match_ids), batch_size):
+                batch = list(match_ids[i:i+batch_size])
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f"DELETE FROM {table_name} WHERE match_id IN ({placeholders})", batch)
+                deleted += cursor.rowcount
+            connection.commit()
+            print(f"Deleted {deleted} rows of {len(match_ids)} replaced matches from {table_name}")
+            cursor.close()
+            return True
+        except Error as e:
+            print(f"Error deleting matches from {table_name}: {e}")
+            return False
+
+    @instrumentation.timed('insert', lambda self, table_name, df: {'table': table_name, 'rows': len(df)})
     def insert_dataframe(self, table_name, df):
         """Insert DataFrame data into MySQL table"""
-        if not self.connection or not self.connection.is_connected():
+        connection = self.connection
+        if connection is None:
             print("Database connection is not established")
             return False
             
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
             
             # Clean column names
-            df.columns = [''.join(e if e.isalnum() else '_' for e in col) for col in df.columns]
+            df.columns = [self.clean_column_name(col) for col in df.columns]
             
             # Prepare column names and placeholders for SQL query
             columns = ', '.join([f'`{col}`' for col in df.columns])
@@ -119,52 +339,222 @@ class DatabaseHandler:
             # Prepare insert query
             insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
             
-            # Convert DataFrame to list of tuples for insertion
-            # Replace NaN values with None for SQL compatibility
-            records = []
-            for _, row in df.iterrows():
-                record = []
-                for val in row:
-                    if pd.isna(val):
-                        record.append(None)
-                    else:
-                        record.append(val)
-                records.append(tuple(record))
-            
+            # Stream vectorised batches of native-typed tuples to the cursor (NaN becomes None)
             # Use executemany for better performance with large datasets
             batch_size = 1000  # Insert in batches to avoid memory issues
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i+batch_size]
+            total_batches = (len(df) // batch_size) + 1
+            uncommitted = 0
+            start_time = time.perf_counter()
+            for batch_idx, batch in enumerate(iter_record_batches(df, batch_size)):
                 cursor.executemany(insert_query, batch)
-                self.connection.commit()
-                print(f"Inserted batch {i//batch_size + 1}/{(len(records)//batch_size) + 1} into {table_name}")
+                uncommitted += len(batch)
+                # Commit per batch, or once enough rows are pending; "table" commits after the loop
+                if self.commit_every == "batch" or (self.commit_every != "table" and uncommitted >= self.commit_every):
+                    connection.commit()
+                    uncommitted = 0
+                print(f"Inserted batch {batch_idx + 1}/{total_batches} into {table_name}")
+            connection.commit()
+            elapsed = time.perf_counter() - start_time
             
-            print(f"Data inserted successfully into {table_name}: {len(records)} rows")
+            rows_per_sec = len(df) / elapsed if elapsed > 0 else float('inf')
+            self.record_load(table_name, len(df), elapsed)
+            print(f"Data inserted successfully into {table_name}: {len(df)} rows ({rows_per_sec:,.0f} rows/sec)")
             cursor.close()
             return True
         except Error as e:
+            rollback(connection)
             print(f"Error inserting data into {table_name}: {e}")
             return False
     
-    def process_dataframes(self, dataframes_dict):
-        """Process all DataFrames and store in MySQL tables"""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return False
+    def secondary_indexes(self, cursor, table_name):
+        """Return {index name: column list} of a table's non-unique indexes, keeping prefix lengths"""
+        cursor.execute(f"SHOW INDEX FROM {table_name}")
+        indexes = {}
+        for row in cursor.fetchall():
+            # Table, Non_unique, Key_name, Seq_in_index, Column_name, Collation, Cardinality, Sub_part, ...
+            if row[1] and row[2] != 'PRIMARY':
+                prefix = f"({row[7]})" if row[7] else ""
+                indexes.setdefault(row[2], []).append((row[3], f"`{row[4]}`{prefix}"))
+        return {name: [column for _, column in sorted(columns)] for name, columns in indexes.items()}
+
+    @instrumentation.timed('bulk_load', lambda self, table_name, df: {'table': table_name, 'rows': len(df)})
+    def bulk_load_dataframe(self, table_name, df):
+        """Bulk load DataFrame data into a MySQL table with LOAD DATA LOCAL INFILE
+
+        The rows are written to a temporary TSV file and loaded in one statement. An empty table's
+        non-unique indexes are dropped for the load and built once afterwards. LOAD DATA LOCAL
+        skips duplicate keys and truncates values with only a warning, so a load that does not
+        insert every row cleanly is rolled back and False returned (load_dataframe then falls
+        back to batched inserts, which report the offending row).
+        """
+        connection = self.connection
+        if connection is None:
+            print("Database connection is not established")
+            return False
+        
+        # Clean column names
+        df.columns = [self.clean_column_name(col) for col in df.columns]
+        columns = ', '.join([f'`{col}`' for col in df.columns])
+        
+        fd, tsv_path = tempfile.mkstemp(prefix=f"{table_name}_", suffix='.tsv')
+        os.close(fd)
+        try:
+            start_time = time.perf_counter()
+            write_tsv(df, tsv_path)
+            
+            cursor = connection.cursor()
+            # Rebuilding an index once is cheaper than maintaining it row by row, but only for a fresh table
+            cursor.execute(f"SELECT 1 FROM {table_name} LIMIT 1")
+            dropped = {} if cursor.fetchall() else self.secondary_indexes(cursor, table_name)
+            if dropped:
+                cursor.execute(f"ALTER TABLE {table_name} {', '.join(f'DROP INDEX `{name}`' for name in dropped)}")
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            try:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE '{tsv_path.replace(os.sep, '/')}' INTO TABLE {table_name} "
+                    f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                    f"LINES TERMINATED BY '\\n' ({columns})"
+                )
+                loaded = cursor.rowcount
+                cursor.execute("SHOW WARNINGS LIMIT 3")
+                warnings = cursor.fetchall()
+                # Checked before the indexes are re-added, as ALTER TABLE commits implicitly
+                if loaded != len(df) or warnings:
+                    rollback(connection)
+                    details = '; '.join(str(warning[2]) for warning in warnings)
+                    print(f"Bulk load into {table_name} inserted {loaded} of {len(df)} rows"
+                          f"{f' ({details})' if details else ''}, rolled back")
+                    return False
+                connection.commit()
+            finally:
+                cursor.execute("SET SESSION foreign_key_checks = 1")
+                if dropped:
+                    cursor.execute(f"ALTER TABLE {table_name} " + ', '.join(
+                        f"ADD INDEX `{name}` ({', '.join(index_columns)})" for name, index_columns in dropped.items()))
+                cursor.close()
+            elapsed = time.perf_counter() - start_time
+            
+            rows_per_sec = len(df) / elapsed if elapsed > 0 else float('inf')
+            self.record_load(table_name, len(df), elapsed)
+            print(f"Data bulk loaded into {table_name}: {loaded} rows ({rows_per_sec:,.0f} rows/sec)")
+            return True
+        except Error as e:
+            rollback(connection)
+            print(f"Error bulk loading data into {table_name}: {e}")
+            return False
+        finally:
+            os.remove(tsv_path)
+    
+    def record_load(self, table_name, rows, elapsed):
+        """Add a load to the table's stats - streamed tables are loaded in several batches"""
+        stats = self.load_stats.setdefault(table_name, {'rows': 0, 'seconds': 0.0, 'rows_per_sec': 0})
+        stats['rows'] += rows
+        stats['seconds'] = round(stats['seconds'] + elapsed, 3)
+        stats['rows_per_sec'] = round(stats['rows'] / stats['seconds']) if stats['seconds'] > 0 else 0
+
+    def load_dataframe(self, table_name, df):
+        """Load a DataFrame with the table's strategy, falling back to batched inserts if a bulk load fails"""
+        if table_name in self.bulk_load_tables:
+            if self.bulk_load_dataframe(table_name, df):
+                return True
+            print(f"Falling back to batched inserts for {table_name}")
+        return self.insert_dataframe(table_name, df)
+    
+    def load_table(self, table_name, df):
+        """Load one table over the calling thread's pooled connection, then return the connection"""
+        try:
+            return self.load_dataframe(table_name, df)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                self.release_connection()
+
+    def load_tables(self, dataframes_dict):
+        """Load independent tables, in parallel over separate pooled connections when load_workers > 1"""
+        if self.load_workers == 1 or len(dataframes_dict) == 1:
+            results = [self.load_dataframe(table_name, df) for table_name, df in dataframes_dict.items()]
+        else:
+            with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+                results = list(executor.map(self.load_table, dataframes_dict.keys(), dataframes_dict.values()))
+        return all(results)
+
+    def report_load_stats(self):
+        """Print the rows, seconds and rows/sec loaded per table"""
+        if not self.load_stats:
+            return
+        width = max(len(table_name) for table_name in self.load_stats)
+        print(f"{'Table':<{width}}  {'Rows':>10}  {'Seconds':>8}  {'Rows/sec':>10}")
+        for table_name, stats in sorted(self.load_stats.items(), key=lambda item: -item[1]['seconds']):
+            print(f"{table_name:<{width}}  {stats['rows']:>10,}  {stats['seconds']:>8.3f}  {stats['rows_per_sec']:>10,}")
+
+    def process_dataframes(self, dataframes_dict, stale_match_ids=None):
+        """Process all DataFrames and store in MySQL tables
+
+        By default every table is reloaded from scratch. For an incremental load pass
+        stale_match_ids ({table name: match IDs}): those rows are deleted, the rest are kept,
+        and the DataFrames are appended.
+        """
+        if self.connection is None and not self.connect():
+            return False
         
         success = True
+        incremental = stale_match_ids is not None
+        if incremental:
+            for table_name, match_ids in stale_match_ids.items():
+                if not self.delete_matches(table_name, match_ids):
+                    success = False
+        
+        # Create the tables on this thread's connection, then load them
+        ready = {}
         for table_name, df in dataframes_dict.items():
             if df.empty:
                 print(f"Skipping empty DataFrame {table_name}")
                 continue
             
             # Create table
-            if not self.create_table(table_name, df):
+            if not self.create_table(table_name, df, truncate=not incremental):
                 success = False
                 continue
-            
-            # Insert data
-            if not self.insert_dataframe(table_name, df):
-                success = False
+            ready[table_name] = df
+        
+        # Insert data
+        if ready and not self.load_tables(ready):
+            success = False
         
-        return success
\ No newline at end of file
+        self.report_load_stats()
+        return success
+
+    def process_stream(self, batches, stale_match_ids=None):
+        """Store DataFrame batches (e.g. from MatchIngestor.iter_batches) in MySQL tables as they arrive
+
+        Tables are created (or, incrementally, cleared of stale_match_ids) before their first
+        batch; later batches are appended, adding any columns the table does not have yet.
+        """
+        if self.connection is None and not self.connect():
+            return False
+
+        success = True
+        incremental = stale_match_ids is not None
+        if incremental:
+            for table_name, match_ids in stale_match_ids.items():
+                if not self.delete_matches(table_name, match_ids):
+                    success = False
+
+        created = set()
+        for dataframes_dict in batches:
+            ready = {}
+            for table_name, df in dataframes_dict.items():
+                if df.empty:
+                    continue
+
+                first_batch = table_name not in created
+                if not self.create_table(table_name, df, truncate=first_batch and not incremental):
+                    success = False
+                    continue
+                created.add(table_name)
+                ready[table_name] = df
+
+            if ready and not self.load_tables(ready):
+                success = False
+
+        self.report_load_stats()
+        return success
@@ -0,0 +1,130 @@
+from typing import Any
+import msgspec
+from msgspec import UNSET, UnsetType
+
+# Decoded matches hold no reference cycles, so the garbage collector need not track them (gc=False)
+class CricsheetStruct(msgspec.Struct, gc=False):
+    """Base of the typed Cricsheet sections, readable with the same get()/in as the decoded dicts
+
+    Fields missing from the file are UNSET (or None for optional sections), so
+    section.get(name, default) returns the default exactly as dict.get would and the
+    readers' match_record/innings_record work unchanged on either representation.
+    """
+
+    def get(self, name, default=None):
+        value = getattr(self, name, UNSET)
+        return default if value is UNSET or value is None else value
+
+    def __contains__(self, name):
+        value = getattr(self, name, UNSET)
+        return value is not UNSET and value is not None
+
+class Runs(CricsheetStruct):
+    batter: int = 0
+    extras: int = 0
+    total: int = 0
+
+class Extras(CricsheetStruct):
+    wides: int = 0
+    noballs: int = 0
+    byes: int = 0
+    legbyes: int = 0
+    penalty: int = 0
+
+class Fielder(CricsheetStruct):
+    name: str = ''
+
+class Wicket(CricsheetStruct):
+    player_out: str = ''
+    kind: str = ''
+    fielders: list[Fielder] | None = None
+
+class Delivery(CricsheetStruct):
+    batter: str = ''
+    bowler: str = ''
+    non_striker: str = ''
+    runs: Runs = msgspec.field(default_factory=Runs)
+    extras: Extras | None = None
+    wickets: list[Wicket] | None = None
+
+class Over(CricsheetStruct):
+    over: int = 0
+    deliveries: list[Delivery] = []
+
+class Target(CricsheetStruct):
+    runs: int | UnsetType = UNSET
+    overs: int | float | UnsetType = UNSET
+    revised: bool | UnsetType = UNSET
+
+class Innings(CricsheetStruct):
+    team: str | UnsetType = UNSET
+    overs: list[Over] = []
+    # from/to/type, kept as dicts since 'from' is a keyword
+    powerplays: list[dict[str, Any]] | UnsetType = UNSET
+    target: Target | UnsetType = UNSET
+    declared: bool | UnsetType = UNSET
+    forfeited: bool | UnsetType = UNSET
+    follow_on: bool | UnsetType = UNSET
+    super_over: bool | UnsetType = UNSET
+
+class Toss(CricsheetStruct):
+    decision: str | UnsetType = UNSET
+    winner: str | UnsetType = UNSET
+
+class Margin(CricsheetStruct):
+    runs: int | UnsetType = UNSET
+    wickets: int | UnsetType = UNSET
+    innings: int | UnsetType = UNSET
+
+class Outcome(CricsheetStruct):
+    winner: str | UnsetType = UNSET
+    result: str | UnsetType = UNSET
+    method: str | UnsetType = UNSET
+    by: Margin | UnsetType = UNSET
+
+class Event(CricsheetStruct):
+    name: str | UnsetType = UNSET
+    match_number: int | str | UnsetType = UNSET
+
+class Registry(CricsheetStruct):
+    people: dict[str, str] | UnsetType = UNSET
+
+class Info(CricsheetStruct):
+    balls_per_over: int | UnsetType = UNSET
+    city: str | UnsetType = UNSET
+    dates: list[str] | UnsetType = UNSET
+    event: Event | UnsetType = UNSET
+    match_type: str | UnsetType = UNSET
+    match_type_number: int | UnsetType = UNSET
+    officials: dict[str, list[str]] | UnsetType = UNSET
+    outcome: Outcome | UnsetType = UNSET
+    overs: int | UnsetType = UNSET
+    player_of_match: list[str] | UnsetType = UNSET
+    registry: Registry | UnsetType = UNSET
+    season: str | int | UnsetType = UNSET
+    team_type: str | UnsetType = UNSET
+    teams: list[str] | UnsetType = UNSET
+    toss: Toss | UnsetType = UNSET
+    venue: str | UnsetType = UNSET
+
+class Meta(CricsheetStruct):
+    data_version: str | UnsetType = UNSET
+    created: str | UnsetType = UNSET
+    revision: int | UnsetType = UNSET
+
+class Match(CricsheetStruct):
+    id: str | int | UnsetType = UNSET
+    meta: Meta | UnsetType = UNSET
+    info: Info | UnsetType = UNSET
+    innings: list[Innings] = []
+
+# A ZIP member holds one match, or (in older archives) a list of matches
+MATCH_DECODER = msgspec.json.Decoder(Match | list[Match])
+
+def decode_matches(data):
+    """Decode and validate a Cricsheet JSON document into typed matches in one pass
+
+    Raises msgspec.ValidationError when a field has an unexpected type.
+    """
+    content = MATCH_DECODER.decode(data)
+    return content if isinstance(content, list) else [content]
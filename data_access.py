@@ -0,0 +1,179 @@
+import os
+import pandas as pd
+import schema
+from dtypes import compact_series
+
+# Columns holding names from the same domain share one categorical dtype, so they compare directly
+# (e.g. df['toss_winner'] == df['winner'])
+SHARED_CATEGORIES = (
+    ('team', 'team1', 'team2', 'toss_winner', 'winner', 'outcome_winner'),
+    ('batter', 'bowler', 'non_striker', 'wicket_player_out'),
+)
+
+def date_text(value):
+    """Format a date, datetime or date string as 'YYYY-MM-DD', the format the tables store"""
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+def typed_frame(df):
+    """Convert loaded columns to their analysis types, in place
+
+    DATE columns (schema.py) become datetime64 and string columns become categoricals holding
+    only the values present; team and player columns share their categories per frame.
+    Numbers and booleans get the compact dtypes of dtypes.compact_series.
+    """
+    for col in df.columns:
+        dtype = df[col].dtype
+        if schema.column_type(col) == "DATE":
+            df[col] = pd.to_datetime(df[col].astype(object), errors='coerce')
+        elif isinstance(dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            df[col] = df[col].astype('category')
+        else:
+            df[col] = compact_series(df[col])
+
+    for group in SHARED_CATEGORIES:
+        columns = [col for col in group if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if len(columns) < 2:
+            continue
+        categories = pd.Index([])
+        for col in columns:
+            categories = categories.union(df[col].cat.categories)
+        for col in columns:
+            df[col] = df[col].cat.set_categories(categories)
+    return df
+
+class CricketData:
+    """Class to load selected columns and matches of the cricket tables from MySQL or Parquet
+
+    Only the requested columns are read, and the match filters (seasons, a date range, teams)
+    are pushed down to the storage: a WHERE clause on MySQL, partition and row group filters on
+    Parquet. Tables other than '<format>_matches' are filtered through the matches of their format.
+    """
+
+    def __init__(self, backend="mysql", parquet_root="parquet", db_handler=None, cache=None):
+        """Initialize with the storage backend: "mysql" (a DatabaseHandler) or "parquet" (a ParquetStore folder)
+
+        cache is an optional QueryCache for the MySQL queries.
+        """
+        self.backend = backend
+        self.cache = cache
+        if backend == "parquet":
+            from parquet_store import ParquetStore
+            self.store = ParquetStore(root=parquet_root)
+        elif backend == "mysql":
+            if db_handler is None:
+                from create_tables import DatabaseHandler
+                db_handler = DatabaseHandler()
+            self.store = db_handler
+        else:
+            raise ValueError(f"Unknown backend {backend!r}, expected 'mysql' or 'parquet'")
+
+    def close(self):
+        """Close the database connection"""
+        self.store.close_connection()
+
+    def table_columns(self, table_name):
+        """Return the column names of a table"""
+        if self.backend == "parquet":
+            if not os.path.isdir(self.store.table_path(table_name)):
+                return []
+            return self.store.dataset(table_name).schema.names
+        return self.store.table_columns(table_name)
+
+    def select_columns(self, table_name, columns=None):
+        """Return the requested columns the table has, in the requested order (all columns if None)
+
+        Columns a table lacks are skipped, so one list can serve every format
+        (e.g. 'winner' and Test cricket's 'outcome_winner').
+        """
+        available = self.table_columns(table_name)
+        if not available:
+            raise ValueError(f"Table {table_name} does not exist")
+        if columns is None:
+            return list(available)
+        return [col for col in columns if col in available]
+
+    def match_conditions(self, seasons=None, start_date=None, end_date=None, teams=None):
+        """Return the SQL conditions and parameters selecting matches from a matches table"""
+        conditions, params = [], []
+        if seasons is not None:
+            seasons = [str(season) for season in seasons]
+            conditions.append(f"season IN ({', '.join(['%s'] * len(seasons))})")
+            params += seasons
+        if start_date is not None:
+            conditions.append("date >= %s")
+            params.append(date_text(start_date))
+        if end_date is not None:
+            conditions.append("date <= %s")
+            params.append(date_text(end_date))
+        if teams is not None:
+            teams = list(teams)
+            placeholders = ', '.join(['%s'] * len(teams))
+            conditions.append(f"(team1 IN ({placeholders}) OR team2 IN ({placeholders}))")
+            params += teams + teams
+        return conditions, params
+
+    def sql_query(self, table_name, columns, **filters):
+        """Return the SELECT (and its parameters) reading the given columns of the selected matches"""
+        conditions, params = self.match_conditions(**filters)
+        query = f"SELECT {', '.join(f'`{col}`' for col in columns)} FROM {table_name}"
+        if conditions:
+            where = ' AND '.join(conditions)
+            if schema.table_kind(table_name) != 'matches':
+                format_name = table_name.split('_', 1)[0]
+                where = f"match_id IN (SELECT match_id FROM {format_name}_matches WHERE {where})"
+            query += f" WHERE {where}"
+        return query, params
+
+    def parquet_filter(self, table_name, seasons=None, start_date=None, end_date=None, teams=None):
+        """Return the pyarrow filter expression selecting the given matches' rows, or None
+
+        Every table is partitioned by season, so season filters skip whole folders. Date and
+        team filters are evaluated on the matches table, whose match IDs then filter the others.
+        """
+        from pyarrow import dataset as ds
+        expression = None
+        if seasons is not None:
+            expression = ds.field('season').isin([str(season) for season in seasons])
+
+        match_filter = None
+        if start_date is not None:
+            match_filter = ds.field('date') >= date_text(start_date)
+        if end_date is not None:
+            condition = ds.field('date') <= date_text(end_date)
+            match_filter = condition if match_filter is None else match_filter & condition
+        if teams is not None:
+            teams = list(teams)
+            condition = ds.field('team1').isin(teams) | ds.field('team2').isin(teams)
+            match_filter = condition if match_filter is None else match_filter & condition
+
+        if match_filter is not None and schema.table_kind(table_name) != 'matches':
+            matches_table = f"{table_name.split('_', 1)[0]}_matches"
+            match_ids = self.store.read_table(matches_table, columns=['match_id'],
+                                              filters=match_filter if expression is None else expression & match_filter)
+            match_filter = ds.field('match_id').isin(match_ids['match_id'].astype(str).tolist())
+        if match_filter is not None:
+            expression = match_filter if expression is None else expression & match_filter
+        return expression
+
+    def load(self, table_name, columns=None, seasons=None, start_date=None, end_date=None, teams=None):
+        """Load the given columns of a table's rows for the selected matches as a typed DataFrame
+
+        - seasons: season labels as stored by Cricsheet (e.g. '2019' or '2019/20')
+        - start_date / end_date: inclusive bounds on the match date
+        - teams: matches in which any of these teams played
+
+        Filters need a table with match_id; dimension tables can only be loaded whole.
+        """
+        filters = {'seasons': seasons, 'start_date': start_date, 'end_date': end_date, 'teams': teams}
+        columns = self.select_columns(table_name, columns)
+        if any(value is not None for value in filters.values()) and 'match_id' not in self.table_columns(table_name):
+            raise ValueError(f"Table {table_name} has no match_id to filter on")
+
+        if self.backend == "parquet":
+            df = self.store.read_table(table_name, columns=columns, filters=self.parquet_filter(table_name, **filters))
+        else:
+            query, params = self.sql_query(table_name, columns, **filters)
+            df = self.store.read_sql(query, params=params or None, cache=self.cache)
+        return typed_frame(df)
@@ -0,0 +1,143 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Fact table columns replaced by '<column>_key' integer surrogate keys
+PLAYER_COLUMNS = ('batter', 'bowler', 'non_striker', 'wicket_player_out')
+TEAM_COLUMNS = ('team', 'team1', 'team2', 'toss_winner', 'winner', 'outcome_winner')
+# Joined official name columns, replaced by the '<format>_match_officials' bridge table
+OFFICIAL_COLUMNS = ('match_referee', 'umpires', 'tv_umpire', 'reserve_umpire')
+
+class DimensionRegistry:
+    """Class to assign stable integer surrogate keys to players, teams, venues and officials
+
+    Players and officials are identified by their Cricsheet registry ID (info.registry.people)
+    where the match has one, and by name otherwise. Keys are persisted so that incremental
+    runs keep them stable; only rows added since the registry was loaded are emitted.
+    """
+
+    # Dimension table columns after the key column
+    dimensions = {
+        'players': ('name', 'cricsheet_id'),
+        'teams': ('name',),
+        'venues': ('venue', 'city'),
+        'officials': ('name', 'cricsheet_id'),
+    }
+
+    def __init__(self, path=None):
+        """Initialize with the registry file path and load any existing keys"""
+        self.path = path
+        self.reset()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            for dimension, rows in saved.items():
+                for natural_key, *values in rows:
+                    self.add(dimension, natural_key, values)
+        self.mark_saved()
+
+    def reset(self):
+        """Forget every key (used for full reloads)"""
+        self.keys = {dimension: {} for dimension in self.dimensions}
+        self.rows = {dimension: [] for dimension in self.dimensions}
+        self.saved_counts = {dimension: 0 for dimension in self.dimensions}
+
+    def mark_saved(self):
+        """Treat every current row as already emitted"""
+        self.saved_counts = {dimension: len(rows) for dimension, rows in self.rows.items()}
+
+    def add(self, dimension, natural_key, values):
+        """Return the key of a natural key, adding a dimension row if it is new"""
+        key = self.keys[dimension].get(natural_key)
+        if key is None:
+            key = self.keys[dimension][natural_key] = len(self.rows[dimension]) + 1
+            self.rows[dimension].append((natural_key, *values))
+        return key
+
+    def person_key(self, dimension, name, cricsheet_id):
+        """Return the key of a player or official"""
+        natural_key = f"id:{cricsheet_id}" if cricsheet_id else f"name:{name}"
+        return self.add(dimension, natural_key, (name, cricsheet_id or ''))
+
+    def map_people(self, dimension, match_ids, names, people):
+        """Vectorised key lookup for (match_id, name) pairs using each match's registry IDs"""
+        codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([match_ids, names]))
+        unique_keys = np.array([
+            0 if pd.isna(name) or name == '' else self.person_key(dimension, name, people.get((match_id, name)))
+            for match_id, name in uniques
+        ] + [0], dtype=np.int64)
+        return self.to_keys(unique_keys[codes])
+
+    def map_values(self, dimension, columns):
+        """Vectorised key lookup for the rows of one or more natural value columns"""
+        if len(columns) == 1:
+            codes, uniques = pd.factorize(columns[0])
+            uniques = [(value,) for value in uniques]
+        else:
+            codes, uniques = pd.factorize(pd.MultiIndex.from_arrays(columns))
+        unique_keys = np.array([
+            0 if pd.isna(values[0]) or values[0] == '' else self.add(dimension, '|'.join(map(str, values)), values)
+            for values in uniques
+        ] + [0], dtype=np.int64)
+        return self.to_keys(unique_keys[codes])
+
+    def to_keys(self, keys):
+        """Return a key column, nullable only when some rows have no key"""
+        if (keys == 0).any():
+            return pd.array(np.where(keys == 0, None, keys), dtype='Int64')
+        return keys
+
+    def normalise(self, dataframes, format_names):
+        """Replace name columns of every format's fact tables with surrogate keys, in place
+
+        Adds the dimension tables (new rows only) and a '<format>_match_officials' bridge table.
+        """
+        for format_name in format_names:
+            people_df = dataframes.pop(f'{format_name}_people', None)
+            people = {}
+            if people_df is not None:
+                people = dict(zip(zip(people_df['match_id'], people_df['name']), people_df['cricsheet_id']))
+
+            for table_name in [t for t in dataframes if t.startswith(f'{format_name}_')]:
+                df = dataframes[table_name]
+                for col in PLAYER_COLUMNS:
+                    if col in df.columns:
+                        df.insert(df.columns.get_loc(col), f'{col}_key',
+                                  self.map_people('players', df['match_id'], df[col], people))
+                        df.drop(columns=col, inplace=True)
+                for col in TEAM_COLUMNS:
+                    if col in df.columns:
+                        df.insert(df.columns.get_loc(col), f'{col}_key', self.map_values('teams', [df[col]]))
+                        df.drop(columns=col, inplace=True)
+                if 'venue' in df.columns:
+                    city = df['city'] if 'city' in df.columns else pd.Series('', index=df.index)
+                    df.insert(df.columns.get_loc('venue'), 'venue_key', self.map_values('venues', [df['venue'], city]))
+                    df.drop(columns=[c for c in ('venue', 'city') if c in df.columns], inplace=True)
+                df.drop(columns=[c for c in OFFICIAL_COLUMNS if c in df.columns], inplace=True)
+
+            officials_table = f'{format_name}_match_officials'
+            if officials_table in dataframes:
+                df = dataframes[officials_table]
+                df.insert(1, 'official_key', self.map_people('officials', df['match_id'], df['name'], people))
+                df.drop(columns='name', inplace=True)
+
+        for dimension, columns in self.dimensions.items():
+            new_rows = self.rows[dimension][self.saved_counts[dimension]:]
+            if new_rows:
+                start_key = self.saved_counts[dimension] + 1
+                df = pd.DataFrame([values for _, *values in new_rows], columns=list(columns))
+                df.insert(0, f'{dimension[:-1]}_key', np.arange(start_key, start_key + len(new_rows)))
+                dataframes[dimension] = df
+                print(f"Created {dimension} dimension DataFrame: {len(new_rows)} new {dimension}")
+
+    def save(self):
+        """Write the registry atomically next to the data files"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({dimension: [list(row) for row in rows] for dimension, rows in self.rows.items()}, f)
+        os.replace(tmp_path, self.path)
+        self.mark_saved()
+        print(f"Saved dimension registry to {self.path}")
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import schema
+
+# String columns with at most this share of distinct values are stored as categoricals
+CATEGORY_RATIO = 0.5
+
+# Integer dtype per declared MySQL type, so every batch of a table gets the same dtypes
+INTEGER_DTYPES = {
+    'TINYINT': 'int8',
+    'SMALLINT': 'int16',
+    'INT': 'int32',
+}
+
+def declared_integer_dtype(column, values):
+    """Return the integer dtype declared for a column (schema.py) if its values fit, else None"""
+    declared = schema.column_type(column)
+    dtype = INTEGER_DTYPES.get(declared.split()[0]) if declared else None
+    if dtype is None:
+        return None
+    present = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+    if len(present) and (present.min() < np.iinfo(dtype).min or present.max() > np.iinfo(dtype).max):
+        return None
+    return dtype
+
+def compact_series(series):
+    """Return a column in its most compact dtype, or the column itself if nothing smaller fits
+
+    - strings that repeat (players, teams, wicket kinds, ...) become categoricals
+    - integers become int8/int16/int32 as declared in schema.py (TINYINT/SMALLINT/INT), or the
+      smallest that holds their range for undeclared columns
+    - floats holding only whole numbers and NaN (e.g. win_by_runs) become nullable Int8/Int16/...,
+      except columns declared FLOAT (e.g. target_overs) - another batch may hold 46.4
+    - BOOLEAN columns (schema.py) become nullable booleans
+
+    Sums and cumulative sums of small integers are computed in int64, but elementwise arithmetic
+    keeps the small dtype - cast with .astype('int64') before adding columns that could overflow.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if schema.column_type(series.name) == "BOOLEAN" and not pd.api.types.is_string_dtype(dtype):
+        return series.astype('boolean')
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        declared = declared_integer_dtype(series.name, series.to_numpy())
+        if declared:
+            return series.astype(declared.capitalize() if series.hasnans else declared)
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(dtype):
+        if schema.column_type(series.name) == "FLOAT":
+            return series
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        present = values[~np.isnan(values)]
+        if len(present) and np.array_equal(present, np.round(present)) and np.abs(present).max() < 2 ** 31:
+            declared = declared_integer_dtype(series.name, values)
+            if declared:
+                return series.astype(declared.capitalize())
+            return pd.to_numeric(series.astype('Int64'), downcast='integer')
+        return series
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if len(series) and series.nunique(dropna=True) <= CATEGORY_RATIO * len(series):
+            return series.astype('category')
+    return series
+
+def compact_frame(df):
+    """Return a copy of a DataFrame with every column in its most compact dtype"""
+    return pd.DataFrame({col: compact_series(df[col]) for col in df.columns}, index=df.index)
+
+def memory_mb(df):
+    """Return the memory used by a DataFrame in MB, including the strings it holds"""
+    return df.memory_usage(deep=True).sum() / 1e6
+
+def compact_dataframes(dataframes, verbose=True):
+    """Compact every DataFrame of a dict in place, reporting the memory of each table before and after"""
+    rows = []
+    for table_name, df in dataframes.items():
+        before = memory_mb(df)
+        dataframes[table_name] = compact_frame(df)
+        rows.append((table_name, before, memory_mb(dataframes[table_name])))
+
+    if verbose and rows:
+        print(f"\n{'Table':<28}{'Before MB':>12}{'After MB':>12}{'Saved':>8}")
+        for table_name, before, after in rows:
+            saved = 1 - after / before if before else 0.0
+            print(f"{table_name:<28}{before:>12.2f}{after:>12.2f}{saved:>8.0%}")
+        before_total = sum(row[1] for row in rows)
+        after_total = sum(row[2] for row in rows)
+        print(f"{'Total':<28}{before_total:>12.2f}{after_total:>12.2f}"
+              f"{1 - after_total / before_total if before_total else 0.0:>8.0%}")
+    return dataframes
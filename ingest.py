@@ -0,0 +1,237 @@
+import os
+import hashlib
+from match_reader import list_json_files, parse_cached, iter_match_batches, prefetch
+from manifest import IngestManifest
+from match_cache import CACHE_FOLDER, open_cache
+from dimensions import DimensionRegistry
+from summaries import SUMMARY_TABLES, add_summaries
+from dtypes import compact_dataframes
+from read_test_data import TestMatchReader
+from read_odi_data import ODIMatchReader
+from read_t20_data import T20MatchReader
+from read_ipl_data import IPLMatchReader
+
+# League competitions routed by event name ahead of the generic T20 reader.
+# Adding a competition is a new entry here, e.g.
+# {'format_name': 'bbl', 'label': 'BBL', 'zip_keyword': 'bbl', 'event_name': 'Big Bash League'}
+# Its matches table has an event_match_number column; 'column_names' renames columns (the IPL
+# keeps ipl_match_number) and 'team_type' fills in matches without one.
+COMPETITIONS = [
+    {'format_name': 'ipl', 'label': 'IPL', 'zip_keyword': 'ipl', 'event_name': 'Indian Premier League',
+     'column_names': {'event_match_number': 'ipl_match_number'}, 'team_type': 'club'},
+]
+
+MANIFEST_FILE = 'ingest_manifest.json'
+DIMENSIONS_FILE = 'dimensions.json'
+
+def default_readers(data_folder="data", normalise=False):
+    """Create the readers for every supported format, in routing order"""
+    readers = [TestMatchReader(data_folder, normalise=normalise), ODIMatchReader(data_folder, normalise=normalise)]
+    readers += [IPLMatchReader(data_folder, normalise=normalise, **competition) for competition in COMPETITIONS]
+    readers.append(T20MatchReader(data_folder, normalise=normalise))
+    return readers
+
+class MatchIngestor:
+    """Class to read every cricket format from the Cricsheet ZIP files in a single pass"""
+
+    def __init__(self, data_folder="data", readers=None, manifest_path=None, normalise=False, summaries=False,
+                 compact=True, cache_dir=None, cache=True):
+        """Initialize with the folder containing ZIP files, the format readers to route to and the manifest file
+
+        With normalise=True player, team, venue and official names in the fact tables are
+        replaced by integer keys into players/teams/venues/officials dimension tables.
+        With summaries=True every format also gets the pre-aggregated tables of summaries.py.
+        compact converts the finished DataFrames to categoricals, small integers and nullable
+        booleans (dtypes.py), reporting each table's memory before and after.
+        With cache=True read_data keeps the flattened rows of every match file in a ParsedMatchCache
+        (cache_dir, by default data/parsed_cache), so unchanged files are never parsed twice.
+        """
+        self.data_folder = data_folder
+        self.readers = readers if readers is not None else default_readers(data_folder, normalise)
+        self.manifest = IngestManifest(manifest_path or os.path.join(data_folder, MANIFEST_FILE))
+        self.dimensions = DimensionRegistry(os.path.join(data_folder, DIMENSIONS_FILE)) if normalise else None
+        self.summaries = summaries
+        self.compact = compact
+        # Match IDs to delete per table before loading an incremental run (None for a full reload)
+        self.stale_match_ids = None
+        self.member_crcs = {}
+        # Every match file name in the archives, as of the last plan_members
+        self.archive_files = set()
+        self.cache = open_cache(cache_dir or os.path.join(data_folder, CACHE_FOLDER), self.readers) if cache else None
+
+    def find_zips(self):
+        """Find every ZIP file used by at least one reader"""
+        return sorted(
+            f for f in os.listdir(self.data_folder)
+            if f.endswith('.zip') and any(r.zip_keyword in f.lower() for r in self.readers)
+        )
+
+    def plan_members(self, zip_files, incremental=False):
+        """List the JSON members to parse per archive and the match files no longer in any archive
+
+        Files already seen in an earlier archive are skipped, and so are files whose CRC matches
+        the manifest when running incrementally.
+        """
+        # The same match file can ship in more than one archive - only parse it once
+        seen_files = self.archive_files = set()
+        zip_members = []
+        self.member_crcs = {}
+        for zip_file in zip_files:
+            zip_path = os.path.join(self.data_folder, zip_file)
+            members = []
+            for json_file, crc in list_json_files(zip_path):
+                file_name = os.path.basename(json_file)
+                if file_name in seen_files:
+                    continue
+                seen_files.add(file_name)
+                if incremental and self.manifest.is_current(file_name, crc):
+                    continue
+                self.member_crcs[file_name] = (zip_file, crc)
+                members.append(json_file)
+            print(f"Found {len(members)} {'new or changed ' if incremental else ''}JSON files to process in {zip_file}")
+            zip_members.append((zip_path, members))
+
+        removed_files = [f for f in self.manifest.entries if f not in seen_files] if incremental else []
+        return zip_members, removed_files
+
+    def archive_version(self):
+        """Return a digest of every match file in the archives and its CRC, read from the central directories
+
+        Computed like IngestManifest.version, so it equals the manifest's version once the
+        archives have been ingested, but needs no ingest run - e.g. to version results computed
+        straight from the archives.
+        """
+        self.plan_members(self.find_zips())
+        digest = hashlib.sha1()
+        for file_name in sorted(self.member_crcs):
+            digest.update(f"{file_name}:{self.member_crcs[file_name][1]}\n".encode())
+        return digest.hexdigest()
+
+    def stale_tables(self, file_names):
+        """Return {table name: sorted match IDs} previously loaded from the given match files"""
+        stale = {}
+        for file_name in file_names:
+            format_name, match_ids = self.manifest.match_ids(file_name)
+            stale.setdefault(format_name, set()).update(match_ids)
+        return {
+            f'{reader.format_name}_{table}': sorted(stale[reader.format_name])
+            for reader in self.readers if stale.get(reader.format_name)
+            for table in self.table_kinds(reader)
+        }
+
+    def table_kinds(self, reader):
+        """Return the kinds of table stored for a reader's format"""
+        return reader.tables + (SUMMARY_TABLES if self.summaries else ())
+
+    def record_members(self, member_info):
+        """Record parsed match files in the manifest"""
+        for json_file, info in member_info.items():
+            file_name = os.path.basename(json_file)
+            archive, crc = self.member_crcs[file_name]
+            self.manifest.record(file_name, archive, crc, info['format'], info['match_ids'],
+                                 info['revision'], info['created'])
+
+    def update_manifest(self, results, removed_files, incremental):
+        """Record the parsed match files in the manifest and collect the match IDs they replace"""
+        stale = None
+        if incremental:
+            parsed_files = [os.path.basename(json_file) for _, member_info in results for json_file in member_info]
+            stale = self.stale_tables(removed_files + parsed_files)
+        else:
+            self.manifest.entries = {}
+
+        for file_name in removed_files:
+            self.manifest.forget(file_name)
+        for _, member_info in results:
+            self.record_members(member_info)
+        return stale
+
+    def read_data(self, workers=1, incremental=False):
+        """Reads all ZIP archives once and returns the DataFrames of every format.
+
+        With workers > 1 (or None for one per CPU) the ZIP members are parsed in a process pool.
+        With incremental=True only match files that are new or changed since the last saved
+        manifest are parsed, and stale_match_ids lists the rows they replace. Match files held
+        by the parsed match cache are read from it instead of being parsed.
+        """
+        zip_files = self.find_zips()
+        if not zip_files:
+            print("No cricket data ZIP files found in the data folder.")
+            return {}
+
+        if incremental and not len(self.manifest):
+            print("No ingest manifest found, running a full load")
+            incremental = False
+
+        zip_members, removed_files = self.plan_members(zip_files, incremental)
+        results = parse_cached(self.readers, zip_members, workers, self.cache, archive_files=self.archive_files)
+        self.stale_match_ids = self.update_manifest(results, removed_files, incremental)
+
+        dataframes = {}
+        for reader in self.readers:
+            dataframes.update(reader.build_dataframes([chunks[reader.format_name] for chunks, _ in results]))
+
+        # Summaries aggregate the named tables, so they are normalised along with the fact tables
+        if self.summaries:
+            add_summaries(dataframes, self.readers)
+        if self.dimensions is not None:
+            if not incremental:
+                self.dimensions.reset()
+            self.dimensions.normalise(dataframes, [reader.format_name for reader in self.readers])
+        if self.compact:
+            compact_dataframes(dataframes)
+        return dataframes
+
+    def iter_batches(self, batch_matches=500, incremental=False, prefetch_batches=2):
+        """Reads all ZIP archives once and returns a generator of DataFrame batches.
+
+        Each batch holds every table for about batch_matches matches, so memory stays flat;
+        parsing runs in a background thread up to prefetch_batches batches ahead of the consumer.
+        The archives are planned up front, so stale_match_ids is set before the first batch.
+        """
+        zip_files = self.find_zips()
+        if not zip_files:
+            print("No cricket data ZIP files found in the data folder.")
+            self.member_crcs = {}
+            return iter(())
+
+        if incremental and not len(self.manifest):
+            print("No ingest manifest found, running a full load")
+            incremental = False
+
+        zip_members, removed_files = self.plan_members(zip_files, incremental)
+        planned_files = [os.path.basename(json_file) for _, members in zip_members for json_file in members]
+        self.stale_match_ids = self.stale_tables(removed_files + planned_files) if incremental else None
+        if not incremental:
+            self.manifest.entries = {}
+        for file_name in removed_files:
+            self.manifest.forget(file_name)
+        if self.dimensions is not None and not incremental:
+            self.dimensions.reset()
+        return self.stream_batches(zip_members, batch_matches, prefetch_batches)
+
+    def stream_batches(self, zip_members, batch_matches, prefetch_batches):
+        """Yield the named DataFrames of each parsed batch, recording its members in the manifest"""
+        batches = iter_match_batches(self.readers, zip_members, batch_matches)
+        for batch_idx, (chunks, member_info) in enumerate(prefetch(batches, prefetch_batches)):
+            self.record_members(member_info)
+            dataframes = {}
+            for reader in self.readers:
+                dataframes.update(reader.build_dataframes([chunks[reader.format_name]], verbose=False))
+            if self.summaries:
+                add_summaries(dataframes, self.readers, verbose=False)
+            if self.dimensions is not None:
+                self.dimensions.normalise(dataframes, [reader.format_name for reader in self.readers])
+                # Later batches only emit the dimension rows they add
+                self.dimensions.mark_saved()
+            if self.compact:
+                compact_dataframes(dataframes, verbose=False)
+            rows = sum(len(df) for df in dataframes.values())
+            print(f"Parsed batch {batch_idx + 1}: {len(member_info)} match files, {rows} rows")
+            yield dataframes
+
+    def save_manifest(self):
+        """Persist the manifest (and dimension keys) - call once the DataFrames have been stored"""
+        self.manifest.save()
+        if self.dimensions is not None:
+            self.dimensions.save()
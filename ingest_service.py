@@ -0,0 +1,338 @@
+import os
+import json
+import time
+import signal
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import instrumentation
+from ingest import MatchIngestor
+from manifest import IngestManifest
+from web_scraping import JSONDownloader
+from app import create_store
+
+def merge_match_ids(*stale):
+    """Merge {table name: match IDs} dicts into one with sorted, distinct IDs per table"""
+    merged = {}
+    for match_ids in stale:
+        for table_name, ids in match_ids.items():
+            merged.setdefault(table_name, set()).update(ids)
+    return {table_name: sorted(ids) for table_name, ids in merged.items()}
+
+class IngestService:
+    """Long-running asyncio service that ingests new or changed Cricsheet archives as they appear
+
+    A watcher polls the data folder; once an archive's size and modification time hold still for
+    one poll it requests an ingest run, and optionally the downloader refreshes the archives from
+    cricsheet.org every download_interval seconds. Each run parses the new or changed match files
+    (MatchIngestor.read_data, incremental) on the parse executor and stores them on the load
+    executor, so the next run parses while the previous one loads. Backpressure:
+    - requests made while one is already pending are merged into it - every run picks up all
+      changes since the last one
+    - at most max_parsed parsed runs wait for the loader; parsing stops until the loader catches up
+    The manifest is saved with each run's state only once that run is stored. A failed load
+    drops the runs parsed after it and retries from the saved manifest after retry_delay seconds;
+    the rows it may have stored in part are replaced by the retry. Each load borrows its database
+    connection on the load thread and returns it afterwards, so the service holds no connection
+    while idle and a connection the server dropped in the meantime is replaced.
+    GET /status on the local HTTP port returns the queue depths and the last ingest's latency
+    as JSON, and GET /metrics the instrumentation totals in the Prometheus text format.
+    """
+
+    def __init__(self, data_folder="data", backend="mysql", poll_interval=1.0, download_interval=None, workers=1,
+                 max_parsed=1, host="127.0.0.1", port=8765, summaries=True, bulk_load=True, parquet_root="parquet",
+                 retry_delay=30.0):
+        """Initialize with the data folder to watch, the storage backend and the status endpoint's address
+
+        workers sets the parsing processes of each run (None for one per CPU); download_interval
+        (seconds, None to only watch the folder) polls cricsheet.org with JSONDownloader.
+        """
+        self.data_folder = data_folder
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.download_interval = download_interval
+        self.workers = workers
+        self.max_parsed = max_parsed
+        self.host = host
+        self.port = port
+        self.bulk_load = bulk_load
+        self.parquet_root = parquet_root
+        self.retry_delay = retry_delay
+        self.ingestor = MatchIngestor(data_folder=data_folder, summaries=summaries)
+        self.store = None
+        # One run parses while the previous one loads; downloads get their own thread
+        self.parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingest-parse')
+        self.load_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingest-load')
+        self.download_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingest-download')
+        # Bumped by a failed load: runs parsed before it assumed the failed run was stored
+        self.generation = 0
+        # {table name: match IDs} of failed loads, which may have stored part of their rows
+        self.unstored_match_ids = {}
+        self.started = time.time()
+        self.status = {
+            'parse_state': 'idle',
+            'load_state': 'idle',
+            'requests': 0,
+            'merged_requests': 0,
+            'runs': 0,
+            'failed_runs': 0,
+            'matches': 0,
+            'rows': 0,
+            'last_ingest': None,
+            'last_error': None,
+            'last_download': None,
+        }
+
+    def archive_state(self):
+        """Return {archive: (size, modification time)} of the archives the readers use"""
+        state = {}
+        for zip_file in self.ingestor.find_zips():
+            try:
+                stat = os.stat(os.path.join(self.data_folder, zip_file))
+            except FileNotFoundError:
+                continue  # replaced between the listing and the stat
+            state[zip_file] = (stat.st_size, stat.st_mtime_ns)
+        return state
+
+    def request_ingest(self, reason, changed=None):
+        """Ask for an ingest run, merging the request into one that is already pending
+
+        changed is when the newest changed archive was written, to report the latency from it.
+        """
+        self.status['requests'] += 1
+        try:
+            self.requests.put_nowait({'reason': reason, 'requested': time.time(), 'changed': changed})
+        except asyncio.QueueFull:
+            self.status['merged_requests'] += 1
+
+    async def watch(self):
+        """Poll the data folder, requesting a run once changed archives have settled"""
+        ingested_state = None
+        previous_state = None
+        while True:
+            state = self.archive_state()
+            # An archive still being copied changes between polls; wait for it to settle
+            if state != ingested_state and state == previous_state:
+                changed = sorted(f for f in state if (ingested_state or {}).get(f) != state[f])
+                if ingested_state is None:
+                    self.request_ingest('startup')
+                elif changed:
+                    self.request_ingest(f"changed: {', '.join(changed)}", max(state[f][1] for f in changed) / 1e9)
+                else:
+                    self.request_ingest('archive removed')
+                ingested_state = state
+            previous_state = state
+            await asyncio.sleep(self.poll_interval)
+
+    async def download(self):
+        """Refresh the archives from cricsheet.org every download_interval seconds; the watcher sees the changes"""
+        loop = asyncio.get_running_loop()
+        downloader = JSONDownloader(download_dir=self.data_folder)
+        while True:
+            try:
+                await loop.run_in_executor(self.download_executor, downloader.scrape_and_download)
+                self.status['last_download'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            except Exception as e:  # a failed poll is retried at the next interval
+                self.status['last_error'] = f"download: {type(e).__name__}: {e}"
+            await asyncio.sleep(self.download_interval)
+
+    def parse_run(self, request):
+        """Parse the match files changed since the last run - runs on the parse executor"""
+        generation = self.generation
+        with instrumentation.stage('service_parse') as timer:
+            dataframes = self.ingestor.read_data(workers=self.workers, incremental=True)
+            stale_match_ids = self.ingestor.stale_match_ids
+            timer['rows'] = sum(len(df) for df in dataframes.values())
+        if not dataframes and not stale_match_ids:
+            return None
+        return {
+            'request': request,
+            'generation': generation,
+            'dataframes': dataframes,
+            'stale_match_ids': stale_match_ids,
+            # The manifest as of this run, saved once the run is stored
+            'manifest': dict(self.ingestor.manifest.entries),
+            'matches': sum(len(df) for name, df in dataframes.items() if name.endswith('_matches')),
+            'rows': timer['rows'],
+        }
+
+    def load_run(self, run):
+        """Store a parsed run and save the manifest it was parsed with - runs on the load executor"""
+        if self.store is None:
+            self.store = create_store(self.backend, self.ingestor.readers, self.bulk_load, parquet_root=self.parquet_root)
+        stale_match_ids = run['stale_match_ids']
+        if stale_match_ids is not None:
+            # A full reload (None) replaces every table anyway
+            stale_match_ids = merge_match_ids(stale_match_ids, self.unstored_match_ids)
+        stored = False
+        try:
+            with instrumentation.stage('service_load', backend=self.backend) as timer:
+                stored = self.store.process_dataframes(run['dataframes'], stale_match_ids=stale_match_ids)
+                timer['error'] = not stored
+        finally:
+            # Return this thread's connection to the pool until the next run
+            self.store.close_connection()
+            if not stored:
+                run_match_ids = {table_name: df['match_id'].astype(object).unique()
+                                 for table_name, df in run['dataframes'].items() if 'match_id' in df.columns}
+                self.unstored_match_ids = merge_match_ids(self.unstored_match_ids, run_match_ids)
+        if stored:
+            self.unstored_match_ids = {}
+            manifest = IngestManifest(self.ingestor.manifest.path)
+            manifest.entries = run['manifest']
+            manifest.save()
+        return stored
+
+    def reset_manifest(self):
+        """Reload the last saved manifest, forgetting runs that were parsed but not stored - runs on the parse executor"""
+        self.generation += 1
+        self.ingestor.manifest = IngestManifest(self.ingestor.manifest.path)
+
+    async def parse_loop(self):
+        """Parse a run for every request, waiting while max_parsed runs are queued for the loader"""
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self.requests.get()
+            self.status['parse_state'] = 'parsing'
+            try:
+                run = await loop.run_in_executor(self.parse_executor, self.parse_run, request)
+            except Exception as e:  # e.g. a corrupt archive - retried when it changes again
+                self.status['last_error'] = f"parse: {type(e).__name__}: {e}"
+                run = None
+            self.status['parse_state'] = 'waiting for loader' if self.parsed.full() else 'idle'
+            if run is not None:
+                await self.parsed.put(run)
+            self.status['parse_state'] = 'idle'
+
+    async def load_loop(self):
+        """Store parsed runs in order, recording the latency from the request to the stored data"""
+        loop = asyncio.get_running_loop()
+        while True:
+            run = await self.parsed.get()
+            if run['generation'] != self.generation:
+                continue  # parsed on top of a run that failed to load
+            self.status['load_state'] = 'loading'
+            try:
+                stored = await loop.run_in_executor(self.load_executor, self.load_run, run)
+            except Exception as e:
+                self.status['last_error'] = f"load: {type(e).__name__}: {e}"
+                stored = False
+            self.status['load_state'] = 'idle'
+            finished = time.time()
+            if stored:
+                request = run['request']
+                self.status['runs'] += 1
+                self.status['matches'] += run['matches']
+                self.status['rows'] += run['rows']
+                self.status['last_ingest'] = {
+                    'reason': request['reason'],
+                    'finished': datetime.fromtimestamp(finished, timezone.utc).isoformat(timespec='seconds'),
+                    'latency_seconds': round(finished - request['requested'], 3),
+                    'seconds_since_archive_changed': round(finished - request['changed'], 3) if request['changed'] else None,
+                    'matches': run['matches'],
+                    'rows': run['rows'],
+                }
+                print(f"Ingested {run['matches']} matches ({run['rows']} rows) "
+                      f"{finished - run['request']['requested']:.2f}s after the request ({run['request']['reason']})")
+                continue
+
+            self.status['failed_runs'] += 1
+            print(f"Storing the run failed, retrying in {self.retry_delay:.0f}s")
+            while not self.parsed.empty():
+                self.parsed.get_nowait()
+            await loop.run_in_executor(self.parse_executor, self.reset_manifest)
+            loop.call_later(self.retry_delay, self.request_ingest, 'retry')
+
+    def status_report(self):
+        """Return the service status served on /status"""
+        return {
+            **self.status,
+            'data_folder': self.data_folder,
+            'backend': self.backend,
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'pending_requests': self.requests.qsize(),
+            'parsed_runs_waiting': self.parsed.qsize(),
+            'max_parsed': self.max_parsed,
+            'stages': instrumentation.current().stage_totals(),
+        }
+
+    async def handle_http(self, reader, writer):
+        """Serve GET /status (JSON) and GET /metrics (Prometheus text) - one request per connection"""
+        try:
+            request_line = (await asyncio.wait_for(reader.readline(), 5)).decode('latin-1').split()
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b'\r\n', b'\n', b''):
+                pass  # the headers are not needed
+            method, path = (request_line + ['', ''])[:2]
+            if method != 'GET':
+                status, content_type, body = '405 Method Not Allowed', 'text/plain', 'GET only\n'
+            elif path.split('?')[0] == '/status':
+                status, content_type = '200 OK', 'application/json'
+                body = json.dumps(self.status_report(), indent=1, default=str) + '\n'
+            elif path.split('?')[0] == '/metrics':
+                status, content_type, body = '200 OK', 'text/plain; version=0.0.4', instrumentation.current().prometheus_text()
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', 'Try /status or /metrics\n'
+            payload = body.encode()
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + payload)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, stop_event=None):
+        """Run until stop_event is set (or SIGINT/SIGTERM), then finish the runs in progress and close the store"""
+        loop = asyncio.get_running_loop()
+        stop_event = stop_event or asyncio.Event()
+        self.requests = asyncio.Queue(maxsize=1)
+        self.parsed = asyncio.Queue(maxsize=self.max_parsed)
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # not available on this platform or outside the main thread
+
+        server = await asyncio.start_server(self.handle_http, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"Watching {self.data_folder} - status on http://{self.host}:{self.port}/status")
+        tasks = [asyncio.create_task(coroutine) for coroutine in (self.watch(), self.parse_loop(), self.load_loop())]
+        if self.download_interval:
+            tasks.append(asyncio.create_task(self.download()))
+        try:
+            await stop_event.wait()
+        finally:
+            print("Stopping the ingest service")
+            server.close()
+            await server.wait_closed()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A parse or load in progress runs to completion, so a stored run always gets its manifest;
+            # each load returns its connection itself
+            for executor in (self.parse_executor, self.load_executor, self.download_executor):
+                await loop.run_in_executor(None, executor.shutdown)
+
+def main():
+    """Command line entry point for the ingest service"""
+    parser = argparse.ArgumentParser(description="Ingest new or changed Cricsheet archives as they appear")
+    parser.add_argument('--data-folder', default='data')
+    parser.add_argument('--backend', choices=['mysql', 'parquet'], default='mysql')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="seconds between scans of the data folder")
+    parser.add_argument('--download-interval', type=float,
+                        help="seconds between downloads from cricsheet.org (default: only watch the folder)")
+    parser.add_argument('--workers', type=int, default=1, help="parsing processes per run")
+    parser.add_argument('--max-parsed', type=int, default=1, help="parsed runs that may wait for the loader")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="port of the HTTP status endpoint (0 for any)")
+    parser.add_argument('--metrics-log', help="JSON lines file for the stage timings ('-' for stderr)")
+    args = parser.parse_args()
+
+    instrumentation.configure(log_path=args.metrics_log)
+    service = IngestService(args.data_folder, args.backend, args.poll_interval, args.download_interval, args.workers,
+                            args.max_parsed, args.host, args.port)
+    asyncio.run(service.run())
+
+if __name__ == "__main__":
+    main()
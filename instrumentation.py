@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Prefix of every metric in the Prometheus file
+METRIC_PREFIX = 'cricket'
+
+def label_key(labels):
+    """Return a hashable, ordered key for a dict of labels"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def escape_label(value):
+    """Escape backslashes, quotes and newlines in a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_labels(key):
+    """Format a label key as a Prometheus label set"""
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in key) + '}'
+
+class Instrumentation:
+    """Class to time the pipeline's stages and count what they process
+
+    Each finished stage (a download, a shard of parsed matches, a DataFrame build, a table
+    created or loaded, ...) is written as one JSON log line, and totals per stage and labels
+    can be written as a Prometheus text file, e.g. for node_exporter's textfile collector.
+    Stages named in profile_stages run under cProfile (one .prof file per call in profile_dir)
+    and those in trace_memory_stages under tracemalloc; '*' selects every stage.
+    """
+
+    def __init__(self, log_path=None, prometheus_path=None, profile_stages=(), trace_memory_stages=(),
+                 profile_dir="profiles", buffer_events=False):
+        """Initialize with the JSON log file ('-' for stderr, None for no log) and the Prometheus file
+
+        With buffer_events=True the log lines are kept for export() instead of written - worker
+        processes hand them to the parent, which writes them to its log.
+        """
+        self.log_path = log_path
+        self.prometheus_path = prometheus_path
+        self.profile_stages = set(profile_stages)
+        self.trace_memory_stages = set(trace_memory_stages)
+        self.profile_dir = profile_dir
+        self.buffer_events = buffer_events
+        self.events = []
+        # Calls, errors, total and longest seconds per (stage, labels)
+        self.stages = {}
+        # Totals per (counter name, labels)
+        self.counters = {}
+        self.lock = threading.Lock()
+        # cProfile allows one active profiler, tracemalloc is process wide
+        self.profile_lock = threading.Lock()
+        self.traced_stages = 0
+        self.profiles = 0
+
+    def worker_settings(self):
+        """Return the settings a worker process's Instrumentation needs to report back to this one"""
+        return {
+            'profile_stages': tuple(self.profile_stages),
+            'trace_memory_stages': tuple(self.trace_memory_stages),
+            'profile_dir': self.profile_dir,
+            'buffer_events': True,
+        }
+
+    def selected(self, stage, names):
+        """Check whether a stage is in a set of stage names"""
+        return stage in names or '*' in names
+
+    def emit(self, event):
+        """Write one JSON log line, or keep it when buffering"""
+        if self.buffer_events:
+            with self.lock:
+                self.events.append(event)
+            return
+        if self.log_path is None:
+            return
+        line = json.dumps(event, default=str) + '\n'
+        with self.lock:
+            if self.log_path == '-':
+                sys.stderr.write(line)
+            else:
+                with open(self.log_path, 'a') as f:
+                    f.write(line)
+
+    def count(self, name, value=1, **labels):
+        """Add value to a counter, e.g. count('download_bytes', size, file=filename)"""
+        key = (name, label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def record(self, stage, seconds, error=False, details=None, **fields):
+        """Record a stage timed by the caller
+
+        String fields label the stage (table, format, file, ...); integer fields are counted
+        per stage and labels (rows, matches, bytes, ...). Every field, and the details dict
+        (e.g. a profile file), goes into the log line.
+        """
+        labels = {name: value for name, value in fields.items() if isinstance(value, str)}
+        counts = {name: value for name, value in fields.items() if isinstance(value, int) and not isinstance(value, bool)}
+        key = (stage, label_key(labels))
+        with self.lock:
+            stats = self.stages.setdefault(key, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            stats['calls'] += 1
+            stats['errors'] += bool(error)
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+        for name, value in counts.items():
+            self.count(name, value, stage=stage, **labels)
+
+        event = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'event': 'stage',
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'pid': os.getpid(),
+            **fields,
+            **(details or {})
+        }
+        if error:
+            event['error'] = error if isinstance(error, str) else True
+        self.emit(event)
+
+    @contextmanager
+    def stage(self, stage, **fields):
+        """Time a block as a stage; the yielded dict takes more fields, e.g. timer['rows'] = len(df)
+
+        An exception escaping the block, or an 'error' field, counts the call as an error.
+        """
+        fields = dict(fields)
+        details = {}
+        profiler = None
+        if self.selected(stage, self.profile_stages) and self.profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        traced = self.selected(stage, self.trace_memory_stages)
+        if traced:
+            with self.lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                # The peak is process wide: a stage traced inside another reports the outer stage's peak so far
+                if not self.traced_stages:
+                    tracemalloc.reset_peak()
+                self.traced_stages += 1
+
+        start_time = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start_time
+            if traced:
+                with self.lock:
+                    details['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+                    self.traced_stages -= 1
+                    if not self.traced_stages:
+                        tracemalloc.stop()
+            if profiler is not None:
+                profiler.disable()
+                details['profile'] = self.save_profile(stage, profiler)
+                self.profile_lock.release()
+            error = fields.pop('error', False)
+            self.record(stage, elapsed, error=error, details=details, **fields)
+
+    def save_profile(self, stage, profiler):
+        """Write a stage's cProfile stats (readable with pstats or snakeviz) and return the file path"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        with self.lock:
+            self.profiles += 1
+            number = self.profiles
+        path = os.path.join(self.profile_dir, f"{stage}-{os.getpid()}-{number}.prof")
+        profiler.dump_stats(path)
+        return path
+
+    def export(self):
+        """Return the recorded stats (and buffered log lines) for merge() in another process"""
+        with self.lock:
+            return {'stages': dict(self.stages), 'counters': dict(self.counters), 'events': list(self.events)}
+
+    def merge(self, exported):
+        """Add the stats exported by another Instrumentation, e.g. a worker process's"""
+        with self.lock:
+            for key, stats in exported['stages'].items():
+                total = self.stages.setdefault(key, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                total['calls'] += stats['calls']
+                total['errors'] += stats['errors']
+                total['seconds'] += stats['seconds']
+                total['max_seconds'] = max(total['max_seconds'], stats['max_seconds'])
+            for key, value in exported['counters'].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+        for event in exported['events']:
+            self.emit(event)
+
+    def stage_totals(self):
+        """Return calls, errors and seconds per stage, summed over the labels"""
+        totals = {}
+        with self.lock:
+            for (stage, _), stats in self.stages.items():
+                total = totals.setdefault(stage, {'calls': 0, 'errors': 0, 'seconds': 0.0})
+                total['calls'] += stats['calls']
+                total['errors'] += stats['errors']
+                total['seconds'] += stats['seconds']
+        return totals
+
+    def report(self):
+        """Print the calls, errors and seconds of every stage, slowest first"""
+        totals = self.stage_totals()
+        if not totals:
+            return
+        width = max(len(stage) for stage in totals)
+        print(f"{'Stage':<{width}}  {'Calls':>8}  {'Errors':>6}  {'Seconds':>10}")
+        for stage, total in sorted(totals.items(), key=lambda item: -item[1]['seconds']):
+            print(f"{stage:<{width}}  {total['calls']:>8,}  {total['errors']:>6,}  {total['seconds']:>10.3f}")
+
+    def prometheus_text(self):
+        """Return every stage and counter in the Prometheus text exposition format"""
+        with self.lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+        lines = []
+        for metric, field, kind, description in (
+                ('stage_calls_total', 'calls', 'counter', 'Calls of each pipeline stage'),
+                ('stage_errors_total', 'errors', 'counter', 'Failed calls of each pipeline stage'),
+                ('stage_seconds_total', 'seconds', 'counter', 'Seconds spent in each pipeline stage'),
+                ('stage_max_seconds', 'max_seconds', 'gauge', 'Longest call of each pipeline stage')):
+            lines += [f"# HELP {METRIC_PREFIX}_{metric} {description}", f"# TYPE {METRIC_PREFIX}_{metric} {kind}"]
+            for (stage, labels), stats in stages:
+                value = round(stats[field], 6)
+                lines.append(f"{METRIC_PREFIX}_{metric}{prometheus_labels((('stage', stage),) + labels)} {value}")
+
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+            lines += [f"{METRIC_PREFIX}_{name}_total{prometheus_labels(labels)} {value}"
+                      for (counter, labels), value in counters if counter == name]
+        lines += [f"# TYPE {METRIC_PREFIX}_last_update_timestamp_seconds gauge",
+                  f"{METRIC_PREFIX}_last_update_timestamp_seconds {time.time():.3f}"]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path=None):
+        """Write the Prometheus text file atomically, so a collector never reads half a file"""
+        path = path or self.prometheus_path
+        if not path:
+            return None
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+        return path
+
+# The process's instrumentation; collects stats from the start, writes nothing until configured
+active = Instrumentation()
+
+def configure(**settings):
+    """Replace the process's instrumentation with one built from Instrumentation's settings and return it"""
+    global active
+    active = Instrumentation(**settings)
+    return active
+
+def current():
+    """Return the process's instrumentation"""
+    return active
+
+def stage(name, **fields):
+    """Time a block as a stage of the process's instrumentation (see Instrumentation.stage)"""
+    return active.stage(name, **fields)
+
+def count(name, value=1, **labels):
+    """Add to a counter of the process's instrumentation"""
+    active.count(name, value, **labels)
+
+def timed(stage_name, fields=None):
+    """Decorator timing every call of a function as a stage
+
+    fields(*args, **kwargs) returns the stage fields of a call, e.g. its table and rows. A call
+    returning False or None - how the pipeline's methods report errors they handled - is an error.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with active.stage(stage_name, **(fields(*args, **kwargs) if fields else {})) as timer:
+                result = func(*args, **kwargs)
+                if result is None or result is False:
+                    timer['error'] = True
+                return result
+        return wrapper
+    return decorator
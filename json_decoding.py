@@ -0,0 +1,57 @@
+import os
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, a faster decoder to plain dicts
+    orjson = None
+
+try:
+    import msgspec
+    import cricsheet_schema
+except ImportError:  # optional, typed decoding needs msgspec
+    msgspec = cricsheet_schema = None
+
+# Decoders, fastest first; 'json' (the standard library) is always available
+DECODERS = ('msgspec', 'orjson', 'json')
+# Environment variable naming the decoder to use, e.g. to compare them in production runs
+DECODER_VARIABLE = 'CRICKET_JSON_DECODER'
+
+def available_decoders():
+    """Return the installed decoders, fastest first"""
+    installed = {'msgspec': cricsheet_schema is not None, 'orjson': orjson is not None, 'json': True}
+    return [name for name in DECODERS if installed[name]]
+
+def default_decoder():
+    """Return the decoder named by CRICKET_JSON_DECODER, or the fastest one installed"""
+    name = os.environ.get(DECODER_VARIABLE)
+    if name:
+        if name not in available_decoders():
+            raise ValueError(f"{DECODER_VARIABLE}={name!r} is not an installed decoder: {', '.join(available_decoders())}")
+        return name
+    return available_decoders()[0]
+
+def decode_untyped(data, decoder="json"):
+    """Decode JSON bytes into plain dicts and lists with orjson or the standard library"""
+    if decoder != "json" and orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def decode_matches(data, decoder=None, name=''):
+    """Decode the JSON bytes of a ZIP member into a list of matches
+
+    - msgspec: typed, validated matches (cricsheet_schema) whose deliveries are read as attributes;
+      a member that does not fit the schema is decoded as plain dicts instead
+    - orjson / json: plain dicts
+    Invalid JSON raises json.JSONDecodeError whichever decoder is used.
+    """
+    decoder = decoder or default_decoder()
+    if decoder == "msgspec":
+        try:
+            return cricsheet_schema.decode_matches(data)
+        except msgspec.ValidationError as e:
+            print(f"{name} does not match the Cricsheet schema ({e}), decoding it untyped")
+        except msgspec.DecodeError:
+            pass  # invalid JSON, reported by the untyped decoder below
+    content = decode_untyped(data, decoder)
+    return content if isinstance(content, list) else [content]
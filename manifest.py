@@ -0,0 +1,60 @@
+import os
+import json
+import hashlib
+
+class IngestManifest:
+    """Class to persist which Cricsheet match files have been ingested, and in which state"""
+
+    def __init__(self, path):
+        """Initialize with the manifest file path and load any existing entries"""
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, file_name):
+        return file_name in self.entries
+
+    def is_current(self, file_name, crc):
+        """Check whether a match file was already ingested with the same content"""
+        entry = self.entries.get(file_name)
+        return entry is not None and entry['crc'] == crc
+
+    def match_ids(self, file_name):
+        """Return the (format name, match IDs) previously ingested from a match file"""
+        entry = self.entries.get(file_name, {})
+        return entry.get('format'), entry.get('match_ids', [])
+
+    def record(self, file_name, archive, crc, format_name=None, match_ids=(), revision=None, created=''):
+        """Record the state of an ingested match file"""
+        self.entries[file_name] = {
+            'archive': archive,
+            'crc': crc,
+            'revision': revision,
+            'created': created,
+            'format': format_name,
+            'match_ids': list(match_ids)
+        }
+
+    def forget(self, file_name):
+        """Drop a match file that is no longer in any archive"""
+        self.entries.pop(file_name, None)
+
+    def version(self):
+        """Return a digest of every ingested match file and its CRC - changes whenever the data does"""
+        digest = hashlib.sha1()
+        for file_name in sorted(self.entries):
+            digest.update(f"{file_name}:{self.entries[file_name]['crc']}\n".encode())
+        return digest.hexdigest()
+
+    def save(self):
+        """Write the manifest atomically next to the data files"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        print(f"Saved ingest manifest with {len(self.entries)} match files to {self.path}")
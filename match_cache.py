@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is only needed for the parsed match cache
+    pa = None
+
+CACHE_FOLDER = 'parsed_cache'
+INDEX_FILE = 'index.json'
+# Bump when the flattened rows change shape, so rows cached by older code are not reused
+CACHE_VERSION = 1
+# Schema metadata keys: each column's pandas dtype, and the mixed-type columns stored as JSON text
+DTYPES_KEY = b'cricket_dtypes'
+JSON_COLUMNS_KEY = b'cricket_json_columns'
+
+def reader_layout(readers):
+    """Describe the readers whose rows a cache holds - routing and tables decide what each member produces"""
+    return [CACHE_VERSION] + [
+        [type(reader).__name__, reader.format_name, list(reader.tables), getattr(reader, 'event_name', None)]
+        for reader in readers
+    ]
+
+def arrow_column(series):
+    """Convert a column to its most compact Arrow array, returning (array, stored as JSON text)
+
+    Strings are dictionary encoded and integers take the smallest width holding their range;
+    object columns mixing types (e.g. a season given as 2019 or '2019/20') are kept as JSON text.
+    """
+    if pd.api.types.is_integer_dtype(series.dtype) and len(series):
+        return pa.array(pd.to_numeric(series, downcast='integer').to_numpy()), False
+    if pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+        try:
+            return pa.array(series, from_pandas=True).dictionary_encode(), False
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            text = series.map(lambda value: json.dumps(value, default=str), na_action='ignore')
+            return pa.array(text, type=pa.string(), from_pandas=True).dictionary_encode(), True
+    return pa.array(series, from_pandas=True), False
+
+def frame_to_arrow(df):
+    """Convert a DataFrame chunk to an Arrow table that records the pandas dtypes to restore"""
+    arrays = []
+    json_columns = []
+    for column in df.columns:
+        array, as_json = arrow_column(df[column])
+        arrays.append(array)
+        if as_json:
+            json_columns.append(column)
+    metadata = {
+        DTYPES_KEY: json.dumps({column: str(dtype) for column, dtype in df.dtypes.items()}),
+        JSON_COLUMNS_KEY: json.dumps(json_columns),
+    }
+    return pa.Table.from_arrays(arrays, names=[str(column) for column in df.columns], metadata=metadata)
+
+def restored_schema(schema):
+    """Return the schema a cached table is cast to before conversion - plain strings and the original integer widths"""
+    dtypes = json.loads((schema.metadata or {}).get(DTYPES_KEY, b'{}'))
+    fields = []
+    for field in schema:
+        field_type = field.type
+        if pa.types.is_dictionary(field_type):
+            field_type = field_type.value_type
+        elif pa.types.is_integer(field_type) and dtypes.get(field.name, '').startswith(('int', 'uint')):
+            field_type = pa.from_numpy_dtype(np.dtype(dtypes[field.name]))
+        fields.append(pa.field(field.name, field_type))
+    return pa.schema(fields, metadata=schema.metadata)
+
+def arrow_to_frame(table, schema=None):
+    """Convert a cached Arrow table (or slice) back to the DataFrame chunk it was written from
+
+    schema is the table's restored_schema, computed here when not given.
+    """
+    schema = schema or restored_schema(table.schema)
+    dtypes = json.loads(schema.metadata.get(DTYPES_KEY, b'{}'))
+    # One cast and one conversion for the whole table; pandas' str dtype wraps the Arrow strings
+    df = table.cast(schema).to_pandas()
+    for name in json.loads(schema.metadata.get(JSON_COLUMNS_KEY, b'[]')):
+        df[name] = df[name].astype(object).map(json.loads, na_action='ignore')
+    converted = df.dtypes
+    for name, dtype in dtypes.items():
+        if str(converted[name]) != dtype:
+            df[name] = df[name].astype(dtype)
+    return df
+
+class ParsedMatchCache:
+    """Class to keep the flattened rows of parsed match files on disk, so unchanged files are not re-parsed
+
+    Each parsed shard of match files is written as a segment folder holding one Arrow IPC file per
+    format and table (e.g. odi_deliveries.arrow), with strings dictionary encoded. The index maps
+    every match file name to its CRC32 from the ZIP central directory, its segment, what the file
+    produced (format, match IDs, revision) and its row range in each table. Cached files are read
+    by memory-mapping their segments and slicing out the row ranges, so re-reading an unchanged
+    archive costs little more than the I/O. A file whose CRC changed is parsed again and its old
+    rows are dropped; segments with no file left in the index are deleted when the index is saved.
+    """
+
+    def __init__(self, cache_dir, readers):
+        """Initialize with the cache folder and the readers producing the rows
+
+        Every distinct reader set (routing order, tables, league event names) gets its own
+        subfolder, since the same match file flattens differently under each.
+        """
+        if pa is None:
+            raise ImportError("The parsed match cache requires pyarrow (pip install pyarrow)")
+        self.readers = readers
+        layout = json.dumps(reader_layout(readers))
+        self.cache_dir = os.path.join(cache_dir, hashlib.sha1(layout.encode()).hexdigest()[:12])
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.entries = json.load(f)
+        self.segment_present = {}
+        self.changed = False
+        # Memory-mapped tables, keyed by (segment, table file)
+        self.open_tables = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_current(self, file_name, crc):
+        """Check whether a match file's rows are cached for its current content"""
+        entry = self.entries.get(file_name)
+        if entry is None or entry['crc'] != crc:
+            return False
+        # A segment deleted by hand is treated as a miss rather than failing the read
+        present = self.segment_present.get(entry['segment'])
+        if present is None:
+            present = self.segment_present[entry['segment']] = os.path.isdir(os.path.join(self.cache_dir, entry['segment']))
+        return present
+
+    def plan(self, zip_members, crcs):
+        """Split (zip path, members) pairs into runs of consecutive members that are cached or need parsing
+
+        crcs maps each member to its CRC32. Returns the cached runs and the runs to parse, both as
+        (zip path, members) pairs.
+        """
+        cached_runs = []
+        parse_runs = []
+        for zip_path, json_files in zip_members:
+            run_cached = None
+            for json_file in json_files:
+                cached = self.is_current(os.path.basename(json_file), crcs.get(json_file))
+                runs = cached_runs if cached else parse_runs
+                if cached != run_cached:
+                    runs.append((zip_path, []))
+                    run_cached = cached
+                runs[-1][1].append(json_file)
+                if cached:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return cached_runs, parse_runs
+
+    def table_path(self, segment, table_name):
+        """Return the Arrow IPC file of a table in a segment"""
+        return os.path.join(self.cache_dir, segment, f"{table_name}.arrow")
+
+    def open_table(self, segment, table_name):
+        """Memory-map a segment's table, returning it with its restored_schema
+
+        Slices of the table share the mapped pages instead of copying them.
+        """
+        key = (segment, table_name)
+        opened = self.open_tables.get(key)
+        if opened is None:
+            with pa.memory_map(self.table_path(segment, table_name)) as source:
+                table = pa.ipc.open_file(source).read_all()
+            opened = self.open_tables[key] = (table, restored_schema(table.schema))
+        return opened
+
+    def read_rows(self, segment, table_name, start, stop):
+        """Return rows start:stop of a segment's table as a DataFrame"""
+        table, schema = self.open_table(segment, table_name)
+        return arrow_to_frame(table.slice(start, stop - start), schema)
+
+    def load(self, json_files):
+        """Return the (chunks, member info) of cached match files, like match_reader.parse_shard"""
+        slices = {}
+        member_info = {}
+        for json_file in json_files:
+            entry = self.entries[os.path.basename(json_file)]
+            member_info[json_file] = {name: entry[name] for name in ('format', 'match_ids', 'revision', 'created')}
+            for table_name, (start, stop) in entry['rows'].items():
+                ranges = slices.setdefault((entry['format'], table_name), [])
+                # Files parsed together sit next to each other in their segment, so their ranges merge
+                if ranges and ranges[-1][0] == entry['segment'] and ranges[-1][2] == start:
+                    ranges[-1][2] = stop
+                else:
+                    ranges.append([entry['segment'], start, stop])
+
+        chunks = {reader.format_name: {} for reader in self.readers}
+        for (format_name, table_name), ranges in slices.items():
+            frames = [self.read_rows(segment, table_name, start, stop) for segment, start, stop in ranges]
+            table = table_name[len(format_name) + 1:]
+            chunks[format_name][table] = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True, sort=False)
+        return chunks, member_info
+
+    def store(self, result, crcs):
+        """Write the chunks of a parsed shard as a new segment and index its match files (crcs as in plan)"""
+        chunks, member_info = result
+        if not member_info:
+            return None
+        segment = f"segment-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(os.path.join(self.cache_dir, segment), exist_ok=True)
+
+        # Row range of every match in every table - a match's rows are contiguous
+        match_rows = {}
+        for format_name, frames in chunks.items():
+            for table, df in frames.items():
+                table_name = f"{format_name}_{table}"
+                codes, match_ids = pd.factorize(df['match_id'].astype(object))
+                bounds = np.flatnonzero(np.diff(codes, prepend=-2, append=-2))
+                for start, stop in zip(bounds[:-1], bounds[1:]):
+                    match_rows[(table_name, match_ids[codes[start]])] = (int(start), int(stop))
+                tmp_path = f"{self.table_path(segment, table_name)}.tmp"
+                with pa.OSFile(tmp_path, 'wb') as sink:
+                    table_data = frame_to_arrow(df)
+                    with pa.ipc.new_file(sink, table_data.schema) as writer:
+                        writer.write_table(table_data)
+                os.replace(tmp_path, self.table_path(segment, table_name))
+
+        for json_file, info in member_info.items():
+            rows = {}
+            for table in chunks.get(info['format'], {}):
+                table_name = f"{info['format']}_{table}"
+                ranges = [match_rows[(table_name, match_id)] for match_id in info['match_ids']
+                          if (table_name, match_id) in match_rows]
+                if ranges:
+                    rows[table_name] = [min(start for start, _ in ranges), max(stop for _, stop in ranges)]
+            self.entries[os.path.basename(json_file)] = {
+                'crc': crcs.get(json_file),
+                'segment': segment,
+                'format': info['format'],
+                'match_ids': list(info['match_ids']),
+                'revision': info['revision'],
+                'created': info['created'],
+                'rows': rows,
+            }
+        self.changed = True
+        return segment
+
+    def retain(self, file_names):
+        """Forget every cached match file not in file_names, e.g. files dropped from the archives"""
+        file_names = set(file_names)
+        for file_name in [f for f in self.entries if f not in file_names]:
+            del self.entries[file_name]
+            self.changed = True
+
+    def save(self):
+        """Write the index atomically and delete segments no cached match file points to"""
+        self.open_tables = {}
+        if not self.changed:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self.changed = False
+
+        live_segments = {entry['segment'] for entry in self.entries.values()}
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('segment-') and name not in live_segments:
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def clear(self):
+        """Drop every cached match file"""
+        self.open_tables = {}
+        self.entries = {}
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def stats(self):
+        """Return the cached match files, the size of the cache and this run's hits and misses"""
+        size = 0
+        for folder, _, files in os.walk(self.cache_dir):
+            size += sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+        return {'files': len(self.entries), 'bytes': size, 'hits': self.hits, 'misses': self.misses}
+
+def open_cache(cache_dir, readers):
+    """Return a ParsedMatchCache, or None when pyarrow is not installed (every file is then parsed)"""
+    if pa is None:
+        print("pyarrow is not installed, parsing every match file without the parsed match cache")
+        return None
+    return ParsedMatchCache(cache_dir, readers)
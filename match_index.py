@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import argparse
+from ingest import MatchIngestor, default_readers
+from match_cache import CACHE_FOLDER, ParsedMatchCache
+from match_reader import parse_cached
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # the parsed match cache needs pyarrow, ParsedMatchCache reports it
+    pa = pc = None
+
+INDEX_FILE = 'match_index.json'
+
+class MatchIndex:
+    """Class to fetch single matches by match_id from the parsed match cache, without a scan or a database
+
+    The index maps every match_id to its format, date, teams and the row ranges of its rows in the
+    cache's memory-mapped Arrow segments (match_cache.py). It is saved as match_index.json next to
+    the cache index and rebuilt whenever the cache changes. get_match() slices the mapped tables,
+    so a lookup reads only the pages holding that match: as Arrow tables a lookup takes tens of
+    microseconds, and converting them to DataFrames adds about a millisecond per table.
+    """
+
+    def __init__(self, data_folder="data", readers=None, cache_dir=None):
+        """Initialize with the folder containing ZIP files, the readers and the cache folder - as MatchIngestor's"""
+        self.data_folder = data_folder
+        self.readers = readers if readers is not None else default_readers(data_folder)
+        self.cache = ParsedMatchCache(cache_dir or os.path.join(data_folder, CACHE_FOLDER), self.readers)
+        self.index_path = os.path.join(self.cache.cache_dir, INDEX_FILE)
+        self.matches = {}
+        self.load()
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __contains__(self, match_id):
+        return str(match_id) in self.matches
+
+    def cache_state(self):
+        """Return the size and modification time of the cache index, which change whenever the cache does"""
+        try:
+            stat = os.stat(self.cache.index_path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load(self):
+        """Load the saved index, rebuilding it if the cache changed since it was saved"""
+        state = self.cache_state()
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                saved = json.load(f)
+            if saved.get('cache_state') == state:
+                self.matches = saved['matches']
+                return
+        if state is not None:
+            self.build()
+
+    def build(self):
+        """Index every match of the cached match files and save the index atomically"""
+        matches = {}
+        for file_name, entry in self.cache.entries.items():
+            format_name = entry['format']
+            if format_name is None or not entry['match_ids']:
+                continue
+            details = self.match_details(entry['segment'], f"{format_name}_matches", entry['rows'].get(f"{format_name}_matches"))
+            for match_id in entry['match_ids']:
+                date, teams = details.get(match_id, ('', []))
+                matches[str(match_id)] = {
+                    'match_id': match_id,
+                    'format': format_name,
+                    'date': date,
+                    'teams': teams,
+                    'file': file_name,
+                    'segment': entry['segment'],
+                    'rows': entry['rows'],
+                    # A file holding several matches shares its row ranges, which are filtered by match_id
+                    'shared': len(entry['match_ids']) > 1,
+                }
+        self.matches = matches
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'cache_state': self.cache_state(), 'matches': matches}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        print(f"Indexed {len(matches)} matches from the parsed match cache")
+
+    def match_details(self, segment, table_name, rows):
+        """Return {match_id: (date, [team1, team2])} for the matches rows of a cached match file"""
+        if rows is None:
+            return {}
+        df = self.cache.read_rows(segment, table_name, *rows)
+        dates = df['date'] if 'date' in df.columns else [''] * len(df)
+        teams = zip(df['team1'], df['team2']) if {'team1', 'team2'} <= set(df.columns) else [()] * len(df)
+        return {
+            match_id: (date if isinstance(date, str) else '', [team for team in match_teams if isinstance(team, str) and team])
+            for match_id, date, match_teams in zip(df['match_id'], dates, teams)
+        }
+
+    def update(self, workers=1):
+        """Parse the new or changed match files of the archives into the cache, then rebuild the index"""
+        ingestor = MatchIngestor(self.data_folder, readers=self.readers, cache=False)
+        zip_files = ingestor.find_zips()
+        if not zip_files:
+            print("No cricket data ZIP files found in the data folder.")
+            return self
+        zip_members, _ = ingestor.plan_members(zip_files)
+        parse_cached(self.readers, zip_members, workers, self.cache, complete=True)
+        self.build()
+        return self
+
+    def find(self, date=None, team=None, format_name=None):
+        """Return the index entries of the matches played on a date (or dates starting with it, e.g. '2019'),
+        by a team and/or in a format, ordered by date"""
+        found = [
+            entry for entry in self.matches.values()
+            if (date is None or entry['date'].startswith(date))
+            and (team is None or team in entry['teams'])
+            and (format_name is None or entry['format'] == format_name)
+        ]
+        return sorted(found, key=lambda entry: (entry['date'], str(entry['match_id'])))
+
+    def get_match(self, match_id, tables=None, as_arrow=False):
+        """Return {table: DataFrame} of one match - matches, innings, overs, deliveries, ... - or None if unknown
+
+        tables restricts the result to some table kinds, e.g. ('innings', 'deliveries').
+        as_arrow returns the zero-copy Arrow slices of the mapped tables instead, as cached:
+        strings dictionary encoded and integers narrowed (DataFrames get the ingested dtypes).
+        """
+        entry = self.matches.get(str(match_id))
+        if entry is None:
+            return None
+        prefix = f"{entry['format']}_"
+        frames = {}
+        for table_name, (start, stop) in entry['rows'].items():
+            table = table_name[len(prefix):]
+            if tables is not None and table not in tables:
+                continue
+            if as_arrow:
+                rows = self.cache.open_table(entry['segment'], table_name)[0].slice(start, stop - start)
+                if entry['shared']:
+                    match_ids = rows['match_id'].cast(pa.large_string())
+                    rows = rows.filter(pc.equal(match_ids, str(entry['match_id'])))
+            else:
+                rows = self.cache.read_rows(entry['segment'], table_name, start, stop)
+                if entry['shared']:
+                    rows = rows[rows['match_id'] == entry['match_id']].reset_index(drop=True)
+            frames[table] = rows
+        return frames
+
+def get_match(match_id, data_folder="data", tables=None, as_arrow=False):
+    """Return {table: DataFrame} of one match from the data folder's parsed match cache (see MatchIndex)
+
+    Opens the index on every call - keep a MatchIndex for repeated lookups.
+    """
+    return MatchIndex(data_folder).get_match(match_id, tables, as_arrow)
+
+def main():
+    """Command line entry point: update the cache and index, then look up matches"""
+    parser = argparse.ArgumentParser(description="Index the parsed match cache and fetch single matches")
+    parser.add_argument('--data-folder', default='data')
+    parser.add_argument('--update', action='store_true', help="parse new or changed match files and rebuild the index")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--date', help="list the matches on a date, or in a year or month (e.g. 2019-06)")
+    parser.add_argument('--team', help="list the matches of a team")
+    parser.add_argument('match_ids', nargs='*', help="matches to fetch and summarise")
+    args = parser.parse_args()
+
+    index = MatchIndex(args.data_folder)
+    if args.update or not len(index):
+        index.update(args.workers)
+    if args.date or args.team:
+        for entry in index.find(args.date, args.team):
+            print(f"{entry['match_id']:<12} {entry['format']:<5} {entry['date']:<11} {' v '.join(entry['teams'])}")
+    for match_id in args.match_ids:
+        start_time = time.perf_counter()
+        frames = index.get_match(match_id)
+        elapsed = time.perf_counter() - start_time
+        if frames is None:
+            print(f"Match {match_id} is not in the index")
+            continue
+        sizes = ', '.join(f"{len(df)} {table}" for table, df in frames.items())
+        print(f"Match {match_id}: {sizes} in {elapsed * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
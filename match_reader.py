@@ -0,0 +1,396 @@
+import os
+import json
+import pandas as pd
+import zipfile
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import time
+import instrumentation
+from json_decoding import decode_matches, default_decoder
+from columnar import DeliveryColumns
+from match_cache import ParsedMatchCache
+from ball_state import add_ball_state
+
+def list_json_files(zip_path):
+    """List the JSON members of a ZIP archive with their CRC32 from the central directory"""
+    with zipfile.ZipFile(zip_path) as z:
+        return [(i.filename, i.CRC) for i in z.infolist() if i.filename.endswith('.json')]
+
+def iter_zip_contents(zip_path, json_files, decoder=None):
+    """Yield (member name, list of matches) for the given JSON files of a ZIP archive
+
+    decoder is one of json_decoding.DECODERS, by default the fastest installed ('msgspec'
+    decodes straight into typed matches, 'orjson' and 'json' into dicts).
+    """
+    decoder = decoder or default_decoder()
+    with zipfile.ZipFile(zip_path) as z:
+        for json_file in json_files:
+            try:
+                # A file holds a list of matches or a single match
+                matches = decode_matches(z.read(json_file), decoder, json_file)
+            except json.JSONDecodeError:
+                print(f"Error decoding {json_file}, skipping...")
+                continue
+            yield json_file, matches
+
+def route_match(readers, match, containers, match_id=None):
+    """Hand a parsed match to the first reader that accepts it"""
+    for reader in readers:
+        if reader.process_match(match, containers[reader.format_name], match_id):
+            return reader
+    return None
+
+def parse_member(readers, json_file, match_list, containers):
+    """Flatten the matches of one ZIP member into the containers
+
+    Returns the format, match IDs and Cricsheet revision the member produced.
+    """
+    # Cricsheet names each match file after its match ID
+    file_id = os.path.splitext(os.path.basename(json_file))[0] if len(match_list) == 1 else None
+    info = {'format': None, 'match_ids': [], 'revision': None, 'created': ''}
+    for match in match_list:
+        reader = route_match(readers, match, containers, file_id)
+        if reader:
+            meta_info = match.get('meta', {})
+            info['format'] = reader.format_name
+            info['match_ids'].append(containers[reader.format_name]['matches'][-1]['match_id'])
+            info['revision'] = meta_info.get('revision')
+            info['created'] = meta_info.get('created', '')
+    return info
+
+def parse_shard(readers, zip_path, json_files):
+    """Flatten a shard of ZIP members into per-format DataFrame chunks - runs in worker processes
+
+    Returns the chunks and, per member, the format, match IDs and Cricsheet revision it produced.
+    """
+    containers = {reader.format_name: reader.new_containers() for reader in readers}
+    member_info = {}
+    with instrumentation.stage('parse', archive=os.path.basename(zip_path)) as timer:
+        for json_file, match_list in iter_zip_contents(zip_path, json_files):
+            member_info[json_file] = parse_member(readers, json_file, match_list, containers)
+        timer['files'] = len(member_info)
+        timer['matches'] = sum(len(info['match_ids']) for info in member_info.values())
+    chunks = {reader.format_name: reader.build_frames(containers[reader.format_name]) for reader in readers}
+    return chunks, member_info
+
+def parse_shard_worker(settings, readers, zip_path, json_files):
+    """Run parse_shard in a worker process, returning its result and the instrumentation it recorded"""
+    recorder = instrumentation.configure(**settings)
+    return parse_shard(readers, zip_path, json_files), recorder.export()
+
+def iter_match_batches(readers, zip_members, batch_matches=500):
+    """Yield (chunks, member info) results, like parse_shard, every batch_matches parsed matches
+
+    Batches end on member boundaries and only one batch of rows is held at a time,
+    so memory stays flat however large the archives are.
+    """
+    containers = {reader.format_name: reader.new_containers() for reader in readers}
+    member_info = {}
+    matches = 0
+    # Parse time of the batch, leaving out the time the consumer holds each yielded batch
+    parse_seconds = 0.0
+    for zip_path, json_files in zip_members:
+        start_time = time.perf_counter()
+        for json_file, match_list in iter_zip_contents(zip_path, json_files):
+            info = member_info[json_file] = parse_member(readers, json_file, match_list, containers)
+            matches += len(info['match_ids'])
+            if matches >= batch_matches:
+                parse_seconds += time.perf_counter() - start_time
+                instrumentation.current().record('parse', parse_seconds, files=len(member_info), matches=matches)
+                yield {reader.format_name: reader.build_frames(containers[reader.format_name]) for reader in readers}, member_info
+                containers = {reader.format_name: reader.new_containers() for reader in readers}
+                member_info = {}
+                matches = 0
+                parse_seconds = 0.0
+                start_time = time.perf_counter()
+        parse_seconds += time.perf_counter() - start_time
+    if member_info:
+        instrumentation.current().record('parse', parse_seconds, files=len(member_info), matches=matches)
+        yield {reader.format_name: reader.build_frames(containers[reader.format_name]) for reader in readers}, member_info
+
+def prefetch(iterable, depth=2):
+    """Run an iterator in a background thread, at most depth items ahead of the consumer
+
+    Lets parsing overlap with the (I/O bound) database load of the previous batch.
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put((item, None))
+        except BaseException as e:  # re-raised in the consumer
+            items.put((None, e))
+        items.put((done, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item, error = items.get()
+        if error is not None:
+            raise error
+        if item is done:
+            return
+        yield item
+
+def make_shards(zip_members, workers):
+    """Split (zip path, members) pairs into contiguous shards, several per worker for load balancing"""
+    total = sum(len(members) for _, members in zip_members)
+    shard_size = max(1, -(-total // (workers * 4)))
+    shards = []
+    for zip_path, members in zip_members:
+        for start in range(0, len(members), shard_size):
+            shards.append((zip_path, members[start:start + shard_size]))
+    return shards
+
+def parse_shards(readers, zip_members, workers=1):
+    """Parse (zip path, members) pairs, in a process pool when workers > 1, keeping member order
+
+    Returns a list of (chunks, member info) results, one per shard.
+    """
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        return [parse_shard(readers, zip_path, members) for zip_path, members in zip_members]
+
+    shards = make_shards(zip_members, workers)
+    print(f"Parsing {len(shards)} shards with {workers} worker processes")
+    recorder = instrumentation.current()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields results in submission order, so the merge is deterministic
+        for result, recorded in executor.map(parse_shard_worker, [recorder.worker_settings()] * len(shards),
+                                             [readers] * len(shards),
+                                             [zip_path for zip_path, _ in shards],
+                                             [members for _, members in shards]):
+            recorder.merge(recorded)
+            results.append(result)
+    return results
+
+def parse_cached(readers, zip_members, workers=1, cache=None, complete=False, archive_files=None):
+    """Parse (zip path, members) pairs like parse_shards, reading unchanged members from a ParsedMatchCache
+
+    Only members whose CRC is not cached are decompressed and parsed; their rows are added to
+    the cache. Results come back in archive order. Cached files no longer in the archives are
+    dropped from the cache: with complete=True zip_members lists every member of the archives,
+    otherwise archive_files names every match file they hold (e.g. when an incremental run
+    only lists the changed members).
+    """
+    if cache is None:
+        return parse_shards(readers, zip_members, workers)
+    crcs = {}
+    for zip_path, json_files in zip_members:
+        archive_crcs = dict(list_json_files(zip_path))
+        crcs.update((json_file, archive_crcs[json_file]) for json_file in json_files)
+    cached_runs, parse_runs = cache.plan(zip_members, crcs)
+
+    cached_files = sum(len(json_files) for _, json_files in cached_runs)
+    if crcs:
+        print(f"Reading {cached_files} of {len(crcs)} match files from the parsed match cache")
+    with instrumentation.stage('cache_read', files=cached_files):
+        results = [cache.load(json_files) for _, json_files in cached_runs]
+    if parse_runs:
+        parsed = parse_shards(readers, parse_runs, workers)
+        with instrumentation.stage('cache_write', files=sum(len(member_info) for _, member_info in parsed)):
+            for result in parsed:
+                cache.store(result, crcs)
+        results += parsed
+    if complete:
+        archive_files = [os.path.basename(json_file) for json_file in crcs]
+    if archive_files is not None:
+        cache.retain(archive_files)
+    cache.save()
+
+    # Runs are contiguous, so ordering results by their first member restores the archive order
+    positions = {json_file: position for position, json_file in enumerate(crcs)}
+    results = [result for result in results if result[1]]
+    results.sort(key=lambda result: positions[next(iter(result[1]))])
+    return results
+
+class MatchReader:
+    """Base class to read and process one cricket format from Cricsheet ZIP files"""
+
+    # Table prefix, display label and ZIP filename keyword - set by each format
+    format_name = ''
+    label = ''
+    zip_keyword = ''
+    # Tables emitted by the reader, in output order
+    tables = ('matches', 'innings', 'overs', 'deliveries')
+    # Accumulator for the ball-by-ball rows
+    delivery_builder = DeliveryColumns
+    # First over (0-based) of the middle and death phases in the summary tables, None for no phases
+    phase_overs = None
+
+    def __init__(self, data_folder="data", format_name=None, label=None, zip_keyword=None, normalise=False):
+        """Initialize with the folder containing ZIP files and optional naming overrides
+
+        With normalise=True the reader also emits each match's registry people and officials,
+        which DimensionRegistry.normalise turns into surrogate keys.
+        """
+        self.data_folder = data_folder
+        if normalise:
+            self.tables = self.tables + ('people', 'match_officials')
+        if format_name:
+            self.format_name = format_name
+        if label:
+            self.label = label
+        if zip_keyword:
+            self.zip_keyword = zip_keyword
+
+    def accepts(self, info):
+        """Check whether a match (given its info section) belongs to this format"""
+        raise NotImplementedError
+
+    def match_record(self, match_id, meta_info, info):
+        """Build the flattened match record - format specific fields"""
+        raise NotImplementedError
+
+    def innings_record(self, match_id, innings_number, inning):
+        """Build the innings record - format specific fields"""
+        raise NotImplementedError
+
+    def find_zip(self):
+        """Find the ZIP file for this format in the data folder"""
+        for f in os.listdir(self.data_folder):
+            if f.endswith('.zip') and (self.zip_keyword in f.lower()):
+                return f
+        return None
+
+    def new_containers(self):
+        """Create empty data containers - a columnar builder for deliveries, a list of records otherwise"""
+        return {table: self.delivery_builder() if table == 'deliveries' else [] for table in self.tables}
+
+    def process_match(self, match, containers, match_id=None):
+        """Flatten a single match into the data containers if it belongs to this format
+
+        match_id is used when the match has no 'id' of its own (Cricsheet's file name ID).
+        """
+        info = match.get('info', {})
+        if not self.accepts(info):
+            return False
+
+        # Generate a unique match ID if not present
+        match_id = match.get('id', '') or match_id
+        if not match_id:
+            # Create a pseudo ID based on teams and date
+            teams = info.get('teams', [])
+            date = info.get('dates', [''])[0] if info.get('dates') else ''
+            match_id = f"{'-'.join(teams)}-{date}" if teams and date else f"match-{len(containers['matches'])}"
+
+        meta_info = match.get('meta', {})
+        innings = match.get('innings', [])
+
+        containers['matches'].append(self.match_record(match_id, meta_info, info))
+        if 'people' in containers:
+            for name, cricsheet_id in info.get('registry', {}).get('people', {}).items():
+                containers['people'].append({'match_id': match_id, 'name': name, 'cricsheet_id': cricsheet_id})
+            for role, names in info.get('officials', {}).items():
+                for name in names:
+                    containers['match_officials'].append({'match_id': match_id, 'name': name, 'role': role})
+        deliveries = containers['deliveries']
+        # Typed matches (json_decoding's msgspec path) have their delivery fields read as attributes
+        append_delivery = deliveries.append
+        if not isinstance(match, dict) and hasattr(deliveries, 'append_typed'):
+            append_delivery = deliveries.append_typed
+
+        # Process innings data
+        for inning_idx, inning in enumerate(innings):
+            innings_number = inning_idx + 1
+            team = inning.get('team', '')
+            containers['innings'].append(self.innings_record(match_id, innings_number, inning))
+
+            # Process powerplay information
+            if 'powerplays' in containers:
+                for powerplay in inning.get('powerplays', []):
+                    powerplay_record = {
+                        'match_id': match_id,
+                        'innings_number': innings_number,
+                        'team': team,
+                        'powerplay_from': powerplay.get('from', ''),
+                        'powerplay_to': powerplay.get('to', ''),
+                        'powerplay_type': powerplay.get('type', '')
+                    }
+                    containers['powerplays'].append(powerplay_record)
+
+            # Process overs data
+            for over in inning.get('overs', []):
+                over_num = over.get('over', 0)
+                over_record = {
+                    'match_id': match_id,
+                    'innings_number': innings_number,
+                    'over_number': over_num,
+                    'team': team
+                }
+                containers['overs'].append(over_record)
+
+                # Process deliveries data
+                for delivery_idx, delivery in enumerate(over.get('deliveries', [])):
+                    append_delivery(match_id, innings_number, over_num, delivery_idx + 1, team, delivery)
+
+        return True
+
+    def build_frames(self, containers):
+        """Create one DataFrame chunk per non-empty table from the data containers
+
+        The deliveries get the running innings score, wickets and balls (and the chase state)
+        of ball_state.add_ball_state, computed while each chunk holds whole matches.
+        """
+        with instrumentation.stage('build_frames', format=self.format_name) as timer:
+            frames = {
+                table: records.to_frame() if table == 'deliveries' else pd.DataFrame(records)
+                for table, records in containers.items() if len(records)
+            }
+            if 'deliveries' in frames:
+                add_ball_state(frames['deliveries'], frames.get('innings'), frames.get('matches'))
+            timer['rows'] = sum(len(df) for df in frames.values())
+        return frames
+
+    def build_dataframes(self, chunks, verbose=True):
+        """Merge DataFrame chunks (in order) into the final named DataFrames"""
+        dataframes = {}
+        with instrumentation.stage('build_dataframes', format=self.format_name) as timer:
+            for table in self.tables:
+                frames = [chunk[table] for chunk in chunks if table in chunk]
+                if not frames:
+                    continue
+                df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True, sort=False)
+                dataframes[f'{self.format_name}_{table}'] = df
+                if verbose:
+                    print(f"Created {self.label} {table} DataFrame: {len(df)} {table}")
+            timer['rows'] = sum(len(df) for df in dataframes.values())
+        return dataframes
+
+    def read_data(self, workers=1, cache_dir=None):
+        """Reads JSON files of this format from ZIP archives and returns structured DataFrames.
+
+        With workers > 1 (or None for one per CPU) the ZIP members are parsed in a process pool.
+        With cache_dir the flattened rows are kept in a ParsedMatchCache there, so a re-run only
+        parses new or changed match files.
+        """
+        zip_file = self.find_zip()
+        if not zip_file:
+            print(f"No {self.label} data ZIP file found in the data folder.")
+            return {}
+
+        print(f"Processing {self.label} data from {zip_file}")
+
+        zip_path = os.path.join(self.data_folder, zip_file)
+        json_files = [json_file for json_file, _ in list_json_files(zip_path)]
+        print(f"Found {len(json_files)} JSON files in the ZIP archive")
+
+        cache = ParsedMatchCache(cache_dir, [self]) if cache_dir else None
+        results = parse_cached([self], [(zip_path, json_files)], workers, cache, complete=True)
+        return self.build_dataframes([chunks[self.format_name] for chunks, _ in results])
+
+    def iter_batches(self, batch_matches=500):
+        """Reads this format's ZIP archive and yields DataFrames every batch_matches matches."""
+        zip_file = self.find_zip()
+        if not zip_file:
+            print(f"No {self.label} data ZIP file found in the data folder.")
+            return
+
+        zip_path = os.path.join(self.data_folder, zip_file)
+        json_files = [json_file for json_file, _ in list_json_files(zip_path)]
+        for chunks, _ in iter_match_batches([self], [(zip_path, json_files)], batch_matches):
+            yield self.build_dataframes([chunks[self.format_name]], verbose=False)
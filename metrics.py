@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+
+# Dismissals not credited to the bowler - shared by metrics, the summary tables and the bundled queries
+NON_BOWLER_WICKETS = ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field',
+                      'handled the ball', 'timed out', 'hit the ball twice')
+
+# Columns that put deliveries in the order they were bowled
+DELIVERY_ORDER = ['match_id', 'innings_number', 'over_number', 'ball_number']
+
+def column(deliveries, name):
+    """Return a deliveries column, or an all-missing one for a column the table does not have
+
+    Tables built from matches without any wickets have no wicket_* columns.
+    """
+    if name in deliveries.columns:
+        return deliveries[name]
+    return pd.Series(np.nan, index=deliveries.index, dtype=object)
+
+def wicket_fell(deliveries):
+    """Return a boolean array marking the deliveries on which a batter was out"""
+    player_out = column(deliveries, 'wicket_player_out')
+    return (player_out.notna() & (player_out.astype(object) != '')).to_numpy()
+
+def legal_balls(deliveries):
+    """Return a boolean array marking legal deliveries - wides and no-balls are bowled again"""
+    return ((deliveries['extras_wides'].to_numpy() == 0) & (deliveries['extras_noballs'].to_numpy() == 0))
+
+def balls_faced(deliveries):
+    """Return a boolean array marking the deliveries a batter faced - every ball except wides"""
+    return deliveries['extras_wides'].to_numpy() == 0
+
+def bowler_runs(deliveries):
+    """Return the runs charged to the bowler on each delivery: all runs except byes, leg byes and penalties"""
+    return (deliveries['runs_total'].to_numpy(dtype=np.int64)
+            - deliveries['extras_byes'].to_numpy(dtype=np.int64)
+            - deliveries['extras_legbyes'].to_numpy(dtype=np.int64)
+            - deliveries['extras_penalty'].to_numpy(dtype=np.int64))
+
+def bowler_wickets(deliveries):
+    """Return a boolean array marking the wickets credited to the bowler"""
+    kind = column(deliveries, 'wicket_kind').astype(object)
+    return wicket_fell(deliveries) & ~kind.isin(NON_BOWLER_WICKETS).to_numpy()
+
+def ratio(numerator, denominator, scale=1.0):
+    """Divide two columns, giving NaN where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, scale * numerator / denominator, np.nan)
+
+def overs_notation(balls, balls_per_over=6):
+    """Express legal balls in overs notation, e.g. 57 balls -> 9.3"""
+    balls = np.asarray(balls, dtype=np.int64)
+    return balls // balls_per_over + (balls % balls_per_over) / 10
+
+def group_sums(keys, **values):
+    """Sum value arrays per key combination, keeping first-seen order
+
+    Keys are passed as a dict of arrays/Series; only combinations that occur are returned,
+    so categorical keys do not expand into every combination of categories.
+    """
+    keys = {name: key.array if isinstance(key, pd.Series) else np.asarray(key) for name, key in keys.items()}
+    frame = pd.DataFrame({**keys, **values})
+    return frame.groupby(list(keys), sort=False, observed=True, dropna=False).sum().reset_index()
+
+def batting_stats(deliveries, min_balls=0):
+    """Career batting per batter: innings, runs, balls faced, dismissals, average, strike rate, 4s and 6s
+
+    A dismissal counts against the batter who was out, including a non-striker run out.
+    Averages are runs per dismissal (NaN without dismissals), strike rates runs per 100 balls faced.
+    """
+    runs = deliveries['runs_batter'].to_numpy(dtype=np.int64)
+    innings = group_sums(
+        {'match_id': deliveries['match_id'], 'innings_number': deliveries['innings_number'],
+         'batter': deliveries['batter']},
+        runs=runs, balls_faced=balls_faced(deliveries).astype(np.int64),
+        fours=(runs == 4).astype(np.int64), sixes=(runs == 6).astype(np.int64),
+        dismissals=np.zeros(len(deliveries), dtype=np.int64))
+
+    out = wicket_fell(deliveries)
+    zeros = np.zeros(int(out.sum()), dtype=np.int64)
+    dismissals = group_sums(
+        {'match_id': deliveries['match_id'].to_numpy()[out], 'innings_number': deliveries['innings_number'].to_numpy()[out],
+         'batter': column(deliveries, 'wicket_player_out').to_numpy()[out]},
+        runs=zeros, balls_faced=zeros, fours=zeros, sixes=zeros, dismissals=zeros + 1)
+
+    # A batter run out without facing a ball still batted in that innings
+    innings = (pd.concat([innings, dismissals], ignore_index=True)
+               .groupby(['match_id', 'innings_number', 'batter'], sort=False, observed=True).sum().reset_index())
+    stats = innings.groupby('batter', sort=False, observed=True).agg(
+        innings=('innings_number', 'size'), runs=('runs', 'sum'), balls_faced=('balls_faced', 'sum'),
+        dismissals=('dismissals', 'sum'), fours=('fours', 'sum'), sixes=('sixes', 'sum')).reset_index()
+    stats['not_outs'] = stats['innings'] - stats['dismissals']
+    stats['average'] = ratio(stats['runs'], stats['dismissals'])
+    stats['strike_rate'] = ratio(stats['runs'], stats['balls_faced'], 100)
+    stats = stats[stats['balls_faced'] >= min_balls]
+    return stats.sort_values('runs', ascending=False, kind='stable').reset_index(drop=True)
+
+def bowling_stats(deliveries, balls_per_over=6, min_balls=0):
+    """Career bowling per bowler: overs, runs conceded, wickets, economy, average and strike rate
+
+    Only legal balls count towards overs; wides and no-balls are charged to the bowler, byes
+    and leg byes are not; run outs and other non-bowler dismissals are not the bowler's wickets.
+    """
+    stats = group_sums(
+        {'bowler': deliveries['bowler']},
+        legal_balls=legal_balls(deliveries).astype(np.int64), runs_conceded=bowler_runs(deliveries),
+        wickets=bowler_wickets(deliveries).astype(np.int64),
+        wides=(deliveries['extras_wides'].to_numpy() > 0).astype(np.int64),
+        noballs=(deliveries['extras_noballs'].to_numpy() > 0).astype(np.int64))
+    stats.insert(1, 'overs', overs_notation(stats['legal_balls'], balls_per_over))
+    stats['economy'] = ratio(stats['runs_conceded'], stats['legal_balls'], balls_per_over)
+    stats['average'] = ratio(stats['runs_conceded'], stats['wickets'])
+    stats['strike_rate'] = ratio(stats['legal_balls'], stats['wickets'])
+    stats = stats[stats['legal_balls'] >= min_balls]
+    return stats.sort_values(['wickets', 'runs_conceded'], ascending=[False, True], kind='stable').reset_index(drop=True)
+
+def bowling_figures(deliveries, balls_per_over=6):
+    """Bowling figures per bowler innings, best first: overs, maidens, runs, wickets and 'wickets/runs'
+
+    A maiden is a completed over in which the bowler conceded no runs.
+    """
+    keys = {'match_id': deliveries['match_id'], 'innings_number': deliveries['innings_number'],
+            'bowler': deliveries['bowler']}
+    overs = group_sums(
+        {**keys, 'over_number': deliveries['over_number']},
+        legal_balls=legal_balls(deliveries).astype(np.int64), runs_conceded=bowler_runs(deliveries),
+        wickets=bowler_wickets(deliveries).astype(np.int64))
+    overs['maidens'] = ((overs['legal_balls'] >= balls_per_over) & (overs['runs_conceded'] == 0)).astype(np.int64)
+
+    figures = (overs.groupby(list(keys), sort=False, observed=True)
+               [['legal_balls', 'maidens', 'runs_conceded', 'wickets']].sum().reset_index())
+    figures.insert(3, 'overs', overs_notation(figures['legal_balls'], balls_per_over))
+    figures['economy'] = ratio(figures['runs_conceded'], figures['legal_balls'], balls_per_over)
+    figures['figures'] = figures['wickets'].astype(str) + '/' + figures['runs_conceded'].astype(str)
+    return figures.sort_values(['wickets', 'runs_conceded'], ascending=[False, True], kind='stable').reset_index(drop=True)
+
+def partnerships(deliveries):
+    """Every partnership: the batting pair, runs (extras included), balls faced and each batter's runs
+
+    A partnership lasts while the same two batters are at the crease, whichever of them is on
+    strike, and ends when the pair changes (a wicket, or a batter retiring) or the innings ends.
+    'wicket' numbers the partnerships of an innings (1 for the opening stand) and 'unbroken'
+    marks those still going when the innings ended.
+    """
+    # Put the deliveries in the order they were bowled, keeping the order of the matches
+    match_codes = pd.factorize(deliveries['match_id'])[0]
+    order = np.lexsort((deliveries['ball_number'].to_numpy(), deliveries['over_number'].to_numpy(),
+                        deliveries['innings_number'].to_numpy(), match_codes))
+    if not np.array_equal(order, np.arange(len(order))):
+        deliveries = deliveries.iloc[order]
+        match_codes = match_codes[order]
+
+    # Order each pair the same way whoever is on strike, using codes into one sorted name list
+    players = pd.Index(deliveries['batter'].unique()).union(pd.Index(deliveries['non_striker'].unique()))
+    batter_codes = pd.Categorical(deliveries['batter'], categories=players).codes
+    non_striker_codes = pd.Categorical(deliveries['non_striker'], categories=players).codes
+    first = np.minimum(batter_codes, non_striker_codes)
+    second = np.maximum(batter_codes, non_striker_codes)
+
+    innings_number = deliveries['innings_number'].to_numpy()
+    new_innings = np.ones(len(deliveries), dtype=bool)
+    new_innings[1:] = (match_codes[1:] != match_codes[:-1]) | (innings_number[1:] != innings_number[:-1])
+    new_pair = new_innings.copy()
+    new_pair[1:] |= (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+    partnership_id = np.cumsum(new_pair) - 1
+
+    # Partnership number within its innings: 1 + partnerships started earlier in the innings
+    innings_start = np.maximum.accumulate(np.where(new_innings, partnership_id, 0))
+    runs_batter = deliveries['runs_batter'].to_numpy(dtype=np.int64)
+    starts = np.flatnonzero(new_pair)
+    ends = np.append(starts[1:], len(deliveries)) - 1
+
+    result = group_sums(
+        {'partnership': partnership_id},
+        runs=deliveries['runs_total'].to_numpy(dtype=np.int64),
+        balls=balls_faced(deliveries).astype(np.int64),
+        batter_1_runs=np.where(batter_codes == first, runs_batter, 0),
+        batter_2_runs=np.where(batter_codes == second, runs_batter, 0))
+    result.insert(0, 'match_id', deliveries['match_id'].to_numpy()[starts])
+    result.insert(1, 'innings_number', innings_number[starts])
+    result.insert(2, 'team', deliveries['team'].to_numpy()[starts])
+    result.insert(3, 'wicket', (partnership_id - innings_start + 1)[starts])
+    result.insert(4, 'batter_1', players[first[starts]])
+    result.insert(5, 'batter_2', players[second[starts]])
+    last_of_innings = np.append(new_innings[1:], True)[ends]
+    result['unbroken'] = last_of_innings & ~wicket_fell(deliveries)[ends]
+    return result.drop(columns='partnership')
+
+def win_method(matches, other=np.nan):
+    """Label each match 'Runs' or 'Wickets' by how it was won, and other for ties, draws and no results
+
+    Works on the limited-overs (win_by_*) and Test (outcome_by_*) matches tables.
+    """
+    prefix = 'win_by' if 'win_by_runs' in matches.columns or 'win_by_wickets' in matches.columns else 'outcome_by'
+
+    def margin(name):
+        values = matches[name] if name in matches.columns else pd.Series(0, index=matches.index)
+        return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy() > 0
+
+    labels = pd.Series(other, index=matches.index, dtype=object)
+    labels[margin(f'{prefix}_wickets')] = 'Wickets'
+    labels[margin(f'{prefix}_runs')] = 'Runs'
+    return labels
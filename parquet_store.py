@@ -0,0 +1,193 @@
+import os
+import glob
+import time
+import uuid
+import shutil
+import pandas as pd
+import instrumentation
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for the Parquet backend
+    pa = ds = pq = None
+
+class ParquetStore:
+    """Class to store cricket data as partitioned Parquet files - an alternative to DatabaseHandler
+
+    Each table is a directory under the root folder, partitioned by season (hive style,
+    e.g. parquet/odi_deliveries/season=2019/part-....parquet). Tables without a season, such as
+    the dimension tables, are written unpartitioned. String columns are dictionary encoded.
+    """
+
+    def __init__(self, root="parquet", row_group_size=1_000_000):
+        """Initialize with the folder to write the Parquet datasets to"""
+        if pq is None:
+            raise ImportError("The Parquet backend requires pyarrow (pip install pyarrow)")
+        self.root = root
+        self.row_group_size = row_group_size
+        # Rows, seconds and rows/sec of every write, keyed by table name
+        self.load_stats = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def close_connection(self):
+        """Nothing to close - kept for interface parity with DatabaseHandler"""
+        pass
+
+    def table_path(self, table_name):
+        """Return the dataset folder of a table"""
+        return os.path.join(self.root, table_name)
+
+    def prepare_frame(self, df, seasons=None):
+        """Add the season partition column and dictionary-encode string columns"""
+        df = df.copy()
+        if 'season' not in df.columns and seasons is not None and 'match_id' in df.columns:
+            df['season'] = df['match_id'].map(seasons)
+        if 'season' in df.columns:
+            df['season'] = df['season'].astype(object).fillna('').astype(str).replace('', 'unknown')
+        for col in df.columns:
+            if col != 'season' and (pd.api.types.is_object_dtype(df[col].dtype) or pd.api.types.is_string_dtype(df[col].dtype)):
+                df[col] = df[col].astype('category')
+        return df
+
+    def delete_matches(self, table_name, match_ids):
+        """Rewrite the Parquet files of a table that contain any of the given matches"""
+        if not match_ids:
+            return True
+        match_ids = set(match_ids)
+        deleted = 0
+        for path in glob.glob(os.path.join(self.table_path(table_name), '**', '*.parquet'), recursive=True):
+            file_match_ids = pq.read_table(path, columns=['match_id']).column('match_id').to_pandas()
+            stale = file_match_ids.isin(match_ids)
+            if not stale.any():
+                continue
+            deleted += int(stale.sum())
+            if stale.all():
+                os.remove(path)
+            else:
+                table = pq.read_table(path)
+                pq.write_table(table.filter(pa.array(~stale.to_numpy())), path, row_group_size=self.row_group_size)
+        print(f"Deleted {deleted} rows of {len(match_ids)} replaced matches from {table_name}")
+        return True
+
+    @instrumentation.timed('parquet_write', lambda self, table_name, df, *args, **kwargs: {'table': table_name, 'rows': len(df)})
+    def write_dataframe(self, table_name, df, seasons=None, truncate=True):
+        """Write a DataFrame as a (season partitioned) Parquet dataset"""
+        path = self.table_path(table_name)
+        if truncate and os.path.exists(path):
+            shutil.rmtree(path)
+
+        start_time = time.perf_counter()
+        df = self.prepare_frame(df, seasons)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Unique file names, so appended batches never overwrite earlier ones - also across
+        # stores and processes writing to the same root
+        run_id = uuid.uuid4().hex
+        if 'season' in df.columns:
+            pq.write_to_dataset(table, path, partition_cols=['season'], row_group_size=self.row_group_size,
+                                basename_template=f"part-{run_id}-{{i}}.parquet")
+        else:
+            os.makedirs(path, exist_ok=True)
+            pq.write_table(table, os.path.join(path, f"part-{run_id}-0.parquet"), row_group_size=self.row_group_size)
+        elapsed = time.perf_counter() - start_time
+
+        rows_per_sec = len(df) / elapsed if elapsed > 0 else float('inf')
+        stats = self.load_stats.setdefault(table_name, {'rows': 0, 'seconds': 0.0, 'rows_per_sec': 0})
+        stats['rows'] += len(df)
+        stats['seconds'] = round(stats['seconds'] + elapsed, 3)
+        stats['rows_per_sec'] = round(stats['rows'] / stats['seconds']) if stats['seconds'] > 0 else 0
+        print(f"Data written to Parquet dataset {path}: {len(df)} rows ({rows_per_sec:,.0f} rows/sec)")
+        return True
+
+    def process_dataframes(self, dataframes_dict, stale_match_ids=None):
+        """Process all DataFrames and store them as Parquet datasets
+
+        Takes the same arguments as DatabaseHandler.process_dataframes: by default every table
+        is rewritten; with stale_match_ids the replaced matches are removed and rows appended.
+        """
+        incremental = stale_match_ids is not None
+        if incremental:
+            for table_name, match_ids in stale_match_ids.items():
+                self.delete_matches(table_name, match_ids)
+
+        return self.write_batch(dataframes_dict, truncate_tables=set() if incremental else set(dataframes_dict))
+
+    def write_batch(self, dataframes_dict, truncate_tables=()):
+        """Write a dict of DataFrames, replacing the datasets named in truncate_tables and appending to the rest"""
+        # Season of every match, per format, to partition the tables that have no season column
+        seasons = {
+            table_name[:-len('_matches')]: df.set_index('match_id')['season']
+            for table_name, df in dataframes_dict.items()
+            if table_name.endswith('_matches') and 'season' in df.columns
+        }
+
+        success = True
+        for table_name, df in dataframes_dict.items():
+            if df.empty:
+                print(f"Skipping empty DataFrame {table_name}")
+                continue
+            try:
+                self.write_dataframe(table_name, df, seasons.get(table_name.split('_', 1)[0]),
+                                     truncate=table_name in truncate_tables)
+            except (OSError, pa.ArrowException) as e:
+                print(f"Error writing Parquet dataset {table_name}: {e}")
+                success = False
+        return success
+
+    def process_stream(self, batches, stale_match_ids=None):
+        """Store DataFrame batches (e.g. from MatchIngestor.iter_batches) as they arrive
+
+        Each dataset is replaced by its first batch on a full load and appended to afterwards.
+        """
+        incremental = stale_match_ids is not None
+        if incremental:
+            for table_name, match_ids in stale_match_ids.items():
+                self.delete_matches(table_name, match_ids)
+
+        success = True
+        written = set()
+        for dataframes_dict in batches:
+            truncate_tables = set() if incremental else set(dataframes_dict) - written
+            if not self.write_batch(dataframes_dict, truncate_tables):
+                success = False
+            written.update(dataframes_dict)
+        return success
+
+    def dataset(self, table_name):
+        """Open a table as a pyarrow dataset, with the season partition read as a string
+
+        Each write chooses its own dictionary index width and appended batches may add columns,
+        so the dataset schema is the union of every file's columns with 32-bit dictionary indices
+        and the widest integer type any file uses. A column written as integers by one batch and
+        floats by another (whole numbers only, then fractions) is read as float64.
+        """
+        path = self.table_path(table_name)
+        fields = {}
+        for file_path in sorted(glob.glob(os.path.join(path, '**', '*.parquet'), recursive=True)):
+            for field in pq.read_schema(file_path):
+                if pa.types.is_dictionary(field.type):
+                    field = pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+                seen = fields.get(field.name)
+                if seen is None or seen.type == field.type:
+                    fields.setdefault(field.name, field)
+                elif pa.types.is_integer(seen.type) and pa.types.is_integer(field.type):
+                    if field.type.bit_width > seen.type.bit_width:
+                        fields[field.name] = field
+                elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (seen.type, field.type)):
+                    fields[field.name] = pa.field(field.name, pa.float64())
+        partitioning = ds.partitioning(pa.schema([('season', pa.string())]), flavor='hive')
+        if any(name.startswith('season=') for name in os.listdir(path)):
+            fields['season'] = pa.field('season', pa.string())
+        return ds.dataset(path, format='parquet', partitioning=partitioning, schema=pa.schema(list(fields.values())))
+
+    def read_table(self, table_name, columns=None, filters=None):
+        """Read a table back into pandas, optionally selecting columns and filtering rows
+
+        filters is a pyarrow expression (e.g. ds.field('season') == '2019') or a pd.read_parquet
+        style list of tuples; conditions on the season partition skip whole folders and the
+        rest use the row group statistics.
+        """
+        if isinstance(filters, list):
+            filters = pq.filters_to_expression(filters)
+        return self.dataset(table_name).to_table(columns=columns, filter=filters).to_pandas()
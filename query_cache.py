@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import hashlib
+import pandas as pd
+from manifest import IngestManifest
+
+INDEX_FILE = 'index.json'
+
+class QueryCache:
+    """Class to cache query results on disk, keyed on query text, parameters and dataset version
+
+    The dataset version is the digest of the ingest manifest, which is only saved after an
+    ingest run has stored its matches - so results cached before new or revised matches were
+    loaded stop matching and are dropped. Entries are evicted least recently used first once
+    the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir="cache", max_bytes=256 * 1024 * 1024, manifest_path=os.path.join("data", "ingest_manifest.json"),
+                 version=None):
+        """Initialize with the cache folder, its size limit and the ingest manifest that versions the data
+
+        version fixes the dataset version instead, for results not computed from ingested data -
+        e.g. MatchIngestor.archive_version() for queries run on DataFrames read from the archives.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.manifest_path = manifest_path
+        self.version = version
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        self.entries = {}
+        # Cumulative across runs: hits, misses and query seconds saved by hits
+        self.counters = {'hits': 0, 'misses': 0, 'seconds_saved': 0.0}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                saved = json.load(f)
+            self.entries = saved.get('entries', {})
+            self.counters.update(saved.get('counters', {}))
+        self.manifest_state = None
+        self.current_version = None
+
+    def dataset_version(self):
+        """Return the version of the ingested data, re-reading the manifest only when its file changes"""
+        if self.version is not None:
+            return self.version
+        try:
+            stat = os.stat(self.manifest_path)
+            state = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            state = None
+        if state != self.manifest_state or self.current_version is None:
+            self.manifest_state = state
+            self.current_version = IngestManifest(self.manifest_path).version() if state else 'empty'
+        return self.current_version
+
+    def key(self, query, params=None):
+        """Return the cache key of a query - whitespace in the query text does not matter"""
+        params = sorted(params.items()) if isinstance(params, dict) else list(params or ())
+        payload = json.dumps([' '.join(query.split()), params, self.dataset_version()], default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key):
+        """Return the file holding a cached result"""
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def save_index(self):
+        """Write the index atomically"""
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'entries': self.entries, 'counters': self.counters}, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def remove(self, key):
+        """Drop a cached result"""
+        self.entries.pop(key, None)
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def purge_stale(self):
+        """Drop results cached for other versions of the data"""
+        version = self.dataset_version()
+        stale = [key for key, entry in self.entries.items() if entry['version'] != version]
+        for key in stale:
+            self.remove(key)
+        if stale:
+            print(f"Dropped {len(stale)} cached query results from an earlier ingest")
+        return len(stale)
+
+    def evict(self):
+        """Drop least recently used results until the cache fits in max_bytes"""
+        total = sum(entry['bytes'] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[key]['bytes']
+            self.remove(key)
+
+    def get(self, query, params=None):
+        """Return the cached result of a query, or None"""
+        key = self.key(query, params)
+        entry = self.entries.get(key)
+        if entry is None or not os.path.exists(self.path(key)):
+            self.entries.pop(key, None)
+            return None
+        start_time = time.perf_counter()
+        result = pd.read_pickle(self.path(key))
+        entry['last_used'] = time.time()
+        entry['hits'] += 1
+        self.counters['hits'] += 1
+        self.counters['seconds_saved'] += max(0.0, entry['seconds'] - (time.perf_counter() - start_time))
+        self.save_index()
+        return result
+
+    def put(self, query, params, result, seconds):
+        """Cache a query result that took the given seconds to compute"""
+        self.purge_stale()
+        key = self.key(query, params)
+        result.to_pickle(self.path(key))
+        self.entries[key] = {
+            'version': self.dataset_version(),
+            'query': ' '.join(query.split())[:200],
+            'bytes': os.path.getsize(self.path(key)),
+            'seconds': seconds,
+            'last_used': time.time(),
+            'hits': 0,
+        }
+        self.evict()
+        self.save_index()
+
+    def fetch(self, query, params, compute):
+        """Return the cached result of a query, or compute it with compute() and cache it"""
+        result = self.get(query, params)
+        if result is not None:
+            return result
+        self.counters['misses'] += 1
+        start_time = time.perf_counter()
+        result = compute()
+        self.put(query, params, result, time.perf_counter() - start_time)
+        return result
+
+    def clear(self):
+        """Drop every cached result and reset the counters"""
+        for key in list(self.entries):
+            self.remove(key)
+        self.counters = {'hits': 0, 'misses': 0, 'seconds_saved': 0.0}
+        self.save_index()
+
+    def stats(self):
+        """Return the hit ratio, seconds saved and size of the cache"""
+        lookups = self.counters['hits'] + self.counters['misses']
+        return {
+            'hits': self.counters['hits'],
+            'misses': self.counters['misses'],
+            'hit_ratio': round(self.counters['hits'] / lookups, 3) if lookups else 0.0,
+            'seconds_saved': round(self.counters['seconds_saved'], 3),
+            'entries': len(self.entries),
+            'bytes': sum(entry['bytes'] for entry in self.entries.values()),
+        }
@@ -0,0 +1,903 @@
+import os
+import re
+import glob
+import time
+import sqlite3
+import argparse
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # fall back to SQLite when DuckDB is not installed
+    duckdb = None
+
+# The analytics of queries.txt as named, parameterised queries for an embedded engine.
+# The SQL runs on both DuckDB and SQLite: parameters are written $name, divisions are made
+# floating point explicitly and strings are joined with ||. An entry's 'summary_sql' is used
+# instead of 'sql' when the summary tables of summaries.py are registered.
+QUERIES = {
+    'test_batting_averages': {
+        'title': "Highest batting averages in Test cricket",
+        'params': {'min_innings': 20, 'limit': 10},
+        'sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                COUNT(*) AS innings,
+                SUM(runs_batter) AS runs,
+                SUM(CASE WHEN wicket_player_out = batter THEN 1 ELSE 0 END) AS dismissals,
+                ROUND(1.0 * SUM(runs_batter) / NULLIF(SUM(CASE WHEN wicket_player_out = batter THEN 1 ELSE 0 END), 0), 2) AS average
+            FROM test_deliveries
+            GROUP BY batter
+            HAVING innings >= $min_innings AND batter != '' AND average IS NOT NULL
+            ORDER BY average DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(deliveries) AS innings,
+                SUM(runs) AS runs,
+                SUM(dismissed) AS dismissals,
+                ROUND(1.0 * SUM(runs) / NULLIF(SUM(dismissed), 0), 2) AS average
+            FROM test_batting_innings
+            GROUP BY batter
+            HAVING innings >= $min_innings AND batter != '' AND average IS NOT NULL
+            ORDER BY average DESC
+            LIMIT $limit
+        """,
+    },
+    'test_best_bowling_figures': {
+        'title': "Best bowling figures in an innings in Test cricket",
+        'params': {'min_wickets': 5, 'limit': 10},
+        'sql': """
+            SELECT
+                match_id,
+                bowler,
+                innings_number,
+                SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END) AS wickets,
+                SUM(runs_batter) AS runs_conceded,
+                CAST(SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END) AS VARCHAR)
+                    || '/' || CAST(SUM(runs_batter) AS VARCHAR) AS bowling_figures
+            FROM test_deliveries
+            GROUP BY match_id, bowler, innings_number
+            HAVING wickets >= $min_wickets
+            ORDER BY wickets DESC, runs_conceded ASC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                match_id,
+                bowler,
+                innings_number,
+                wickets,
+                runs_off_bat AS runs_conceded,
+                CAST(wickets AS VARCHAR) || '/' || CAST(runs_off_bat AS VARCHAR) AS bowling_figures
+            FROM test_bowling_innings
+            WHERE wickets >= $min_wickets
+            ORDER BY wickets DESC, runs_conceded ASC
+            LIMIT $limit
+        """,
+    },
+    'test_venue_draws': {
+        'title': "Most draws in Test cricket by venue",
+        'params': {'min_matches': 5, 'limit': 10},
+        'sql': """
+            SELECT
+                venue,
+                COUNT(*) AS total_matches,
+                SUM(CASE WHEN outcome_result = 'draw' THEN 1 ELSE 0 END) AS draws,
+                ROUND(100.0 * SUM(CASE WHEN outcome_result = 'draw' THEN 1 ELSE 0 END) / COUNT(*), 2) AS draw_percentage
+            FROM test_matches
+            GROUP BY venue
+            HAVING total_matches >= $min_matches
+            ORDER BY draw_percentage DESC, total_matches DESC
+            LIMIT $limit
+        """,
+    },
+    'test_declarations': {
+        'title': "Declared innings analysis in Test cricket",
+        'params': {'limit': 10},
+        'sql': """
+            SELECT
+                tm.team1,
+                tm.team2,
+                ti.team AS batting_team,
+                ti.declared,
+                tm.outcome_winner,
+                CASE
+                    WHEN tm.outcome_winner = ti.team THEN 'Won'
+                    WHEN tm.outcome_winner != '' AND tm.outcome_winner != ti.team THEN 'Lost'
+                    ELSE 'Draw'
+                END AS result_after_declaration
+            FROM test_innings ti
+            JOIN test_matches tm ON ti.match_id = tm.match_id
+            WHERE ti.declared = 1
+            ORDER BY tm.date DESC
+            LIMIT $limit
+        """,
+    },
+    'test_partnerships': {
+        'title': "Longest partnerships in Test cricket",
+        'params': {'min_balls': 60, 'limit': 10},
+        'sql': """
+            WITH ball_count AS (
+                SELECT
+                    match_id,
+                    innings_number,
+                    batter,
+                    non_striker,
+                    COUNT(*) AS balls_faced,
+                    SUM(runs_batter) AS runs_scored
+                FROM test_deliveries
+                GROUP BY match_id, innings_number, batter, non_striker
+                HAVING balls_faced >= $min_balls
+            )
+            SELECT
+                bc.match_id,
+                tm.team1,
+                tm.team2,
+                bc.innings_number,
+                bc.batter,
+                bc.non_striker,
+                bc.balls_faced,
+                bc.runs_scored,
+                ROUND(100.0 * bc.runs_scored / bc.balls_faced, 2) AS strike_rate
+            FROM ball_count bc
+            JOIN test_matches tm ON bc.match_id = tm.match_id
+            ORDER BY bc.balls_faced DESC, bc.runs_scored DESC
+            LIMIT $limit
+        """,
+    },
+    'odi_highest_totals': {
+        'title': "Highest team totals in ODI cricket",
+        'params': {'limit': 10},
+        'sql': """
+            WITH innings_runs AS (
+                SELECT match_id, innings_number, team, SUM(runs_total) AS total_runs
+                FROM odi_deliveries
+                GROUP BY match_id, innings_number, team
+            )
+            SELECT
+                ir.match_id,
+                om.date,
+                om.team1,
+                om.team2,
+                ir.team AS batting_team,
+                ir.total_runs AS team_total,
+                ir.innings_number,
+                om.winner
+            FROM innings_runs ir
+            JOIN odi_matches om ON ir.match_id = om.match_id
+            ORDER BY ir.total_runs DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                tt.match_id,
+                om.date,
+                om.team1,
+                om.team2,
+                tt.team AS batting_team,
+                tt.runs AS team_total,
+                tt.innings_number,
+                om.winner
+            FROM odi_team_totals tt
+            JOIN odi_matches om ON tt.match_id = om.match_id
+            ORDER BY tt.runs DESC
+            LIMIT $limit
+        """,
+    },
+    'odi_strike_rates': {
+        'title': "Highest strike rates in ODI cricket",
+        'params': {'min_runs': 500, 'limit': 10},
+        'sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(runs_batter) AS runs,
+                COUNT(*) AS balls_faced,
+                ROUND(100.0 * SUM(runs_batter) / COUNT(*), 2) AS strike_rate
+            FROM odi_deliveries
+            GROUP BY batter
+            HAVING runs >= $min_runs AND batter != ''
+            ORDER BY strike_rate DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(runs) AS runs,
+                SUM(deliveries) AS balls_faced,
+                ROUND(100.0 * SUM(runs) / SUM(deliveries), 2) AS strike_rate
+            FROM odi_batting_innings
+            GROUP BY batter
+            HAVING SUM(runs) >= $min_runs AND batter != ''
+            ORDER BY strike_rate DESC
+            LIMIT $limit
+        """,
+    },
+    'odi_death_bowlers': {
+        'title': "Best death bowlers in ODI cricket (economy rate in the last 10 overs)",
+        'params': {'min_balls': 120, 'limit': 10},
+        'sql': """
+            SELECT
+                bowler,
+                COUNT(DISTINCT match_id) AS matches,
+                COUNT(*) AS balls_bowled,
+                SUM(runs_total) AS runs_conceded,
+                ROUND(SUM(runs_total) / (COUNT(*) / 6.0), 2) AS economy_rate,
+                SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END) AS wickets
+            FROM odi_deliveries
+            WHERE over_number >= 40 AND bowler != ''
+            GROUP BY bowler
+            HAVING balls_bowled >= $min_balls
+            ORDER BY economy_rate ASC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                bowler,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(deliveries) AS balls_bowled,
+                SUM(total_runs) AS runs_conceded,
+                ROUND(SUM(total_runs) / (SUM(deliveries) / 6.0), 2) AS economy_rate,
+                SUM(wickets) AS wickets
+            FROM odi_bowling_innings
+            WHERE phase = 'death' AND bowler != ''
+            GROUP BY bowler
+            HAVING balls_bowled >= $min_balls
+            ORDER BY economy_rate ASC
+            LIMIT $limit
+        """,
+    },
+    'odi_toss_impact': {
+        'title': "Impact of winning the toss on match results in ODI cricket",
+        'params': {},
+        'sql': """
+            SELECT
+                toss_decision,
+                COUNT(*) AS total_matches,
+                SUM(CASE WHEN toss_winner = winner THEN 1 ELSE 0 END) AS toss_winner_won,
+                ROUND(100.0 * SUM(CASE WHEN toss_winner = winner THEN 1 ELSE 0 END) / COUNT(*), 2) AS win_percentage
+            FROM odi_matches
+            WHERE toss_winner != '' AND winner != '' AND result != 'no result' AND result != 'tie'
+            GROUP BY toss_decision
+            ORDER BY win_percentage DESC
+        """,
+    },
+    'odi_dls_by_season': {
+        'title': "Matches decided by the DLS method in ODI cricket",
+        'params': {'min_matches': 5, 'limit': 15},
+        'sql': """
+            SELECT
+                season,
+                COUNT(*) AS total_matches,
+                SUM(CASE WHEN method = 'D/L' OR method = 'DLS' THEN 1 ELSE 0 END) AS dls_matches,
+                ROUND(100.0 * SUM(CASE WHEN method = 'D/L' OR method = 'DLS' THEN 1 ELSE 0 END) / COUNT(*), 2) AS dls_percentage
+            FROM odi_matches
+            GROUP BY season
+            HAVING season != '' AND total_matches >= $min_matches
+            ORDER BY season DESC
+            LIMIT $limit
+        """,
+    },
+    't20_powerplay_run_rates': {
+        'title': "Highest powerplay run rates in T20 cricket (first 6 overs)",
+        'params': {'min_balls': 30, 'limit': 10},
+        'sql': """
+            SELECT
+                d.match_id,
+                d.team,
+                m.date,
+                m.venue,
+                COUNT(*) AS balls,
+                SUM(d.runs_total) AS runs,
+                ROUND(SUM(d.runs_total) / (COUNT(*) / 6.0), 2) AS run_rate
+            FROM t20_deliveries d
+            JOIN t20_matches m ON d.match_id = m.match_id
+            WHERE d.over_number < 6
+            GROUP BY d.match_id, d.team, m.date, m.venue
+            HAVING balls >= $min_balls
+            ORDER BY run_rate DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                p.match_id,
+                p.team,
+                m.date,
+                m.venue,
+                SUM(p.deliveries) AS balls,
+                SUM(p.runs) AS runs,
+                ROUND(SUM(p.runs) / (SUM(p.deliveries) / 6.0), 2) AS run_rate
+            FROM t20_innings_phases p
+            JOIN t20_matches m ON p.match_id = m.match_id
+            WHERE p.phase = 'powerplay'
+            GROUP BY p.match_id, p.team, m.date, m.venue
+            HAVING balls >= $min_balls
+            ORDER BY run_rate DESC
+            LIMIT $limit
+        """,
+    },
+    't20_most_boundaries': {
+        'title': "Most boundaries in T20 cricket",
+        'params': {'min_matches': 10, 'limit': 10},
+        'sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END) AS fours,
+                SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END) AS sixes,
+                SUM(CASE WHEN runs_batter = 4 OR runs_batter = 6 THEN 1 ELSE 0 END) AS total_boundaries,
+                ROUND(1.0 * SUM(CASE WHEN runs_batter = 4 OR runs_batter = 6 THEN 1 ELSE 0 END) / COUNT(DISTINCT match_id), 2) AS boundaries_per_match
+            FROM t20_deliveries
+            WHERE batter != ''
+            GROUP BY batter
+            HAVING matches >= $min_matches
+            ORDER BY total_boundaries DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(fours) AS fours,
+                SUM(sixes) AS sixes,
+                SUM(fours + sixes) AS total_boundaries,
+                ROUND(1.0 * SUM(fours + sixes) / COUNT(DISTINCT match_id), 2) AS boundaries_per_match
+            FROM t20_batting_innings
+            WHERE batter != ''
+            GROUP BY batter
+            HAVING matches >= $min_matches
+            ORDER BY total_boundaries DESC
+            LIMIT $limit
+        """,
+    },
+    't20_super_overs': {
+        'title': "Super over analysis in T20 cricket",
+        'params': {},
+        'sql': """
+            SELECT
+                i.match_id,
+                m.date,
+                m.team1,
+                m.team2,
+                i.team AS batting_team,
+                SUM(d.runs_total) AS super_over_runs,
+                SUM(CASE WHEN d.wicket_player_out != '' THEN 1 ELSE 0 END) AS wickets_lost,
+                m.winner
+            FROM t20_innings i
+            JOIN t20_deliveries d ON i.match_id = d.match_id AND i.innings_number = d.innings_number
+            JOIN t20_matches m ON i.match_id = m.match_id
+            WHERE i.super_over = 1
+            GROUP BY i.match_id, m.date, m.team1, m.team2, i.team, m.winner
+            ORDER BY super_over_runs DESC
+        """,
+        'summary_sql': """
+            SELECT
+                i.match_id,
+                m.date,
+                m.team1,
+                m.team2,
+                i.team AS batting_team,
+                SUM(t.runs) AS super_over_runs,
+                SUM(t.wickets) AS wickets_lost,
+                m.winner
+            FROM t20_innings i
+            JOIN t20_team_totals t ON i.match_id = t.match_id AND i.innings_number = t.innings_number
+            JOIN t20_matches m ON i.match_id = m.match_id
+            WHERE i.super_over = 1
+            GROUP BY i.match_id, m.date, m.team1, m.team2, i.team, m.winner
+            ORDER BY super_over_runs DESC
+        """,
+    },
+    't20_scoring_venues': {
+        'title': "Best venues for scoring in T20 cricket",
+        'params': {'min_matches': 5, 'limit': 10},
+        'sql': """
+            WITH match_totals AS (
+                SELECT d.match_id, m.venue, SUM(d.runs_total) AS match_runs
+                FROM t20_deliveries d
+                JOIN t20_matches m ON d.match_id = m.match_id
+                GROUP BY d.match_id, m.venue
+            )
+            SELECT
+                venue,
+                COUNT(DISTINCT match_id) AS matches,
+                ROUND(AVG(match_runs), 2) AS avg_match_runs,
+                MAX(match_runs) AS highest_match_total
+            FROM match_totals
+            GROUP BY venue
+            HAVING matches >= $min_matches
+            ORDER BY avg_match_runs DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            WITH match_totals AS (
+                SELECT t.match_id, m.venue, SUM(t.runs) AS match_runs
+                FROM t20_team_totals t
+                JOIN t20_matches m ON t.match_id = m.match_id
+                GROUP BY t.match_id, m.venue
+            )
+            SELECT
+                venue,
+                COUNT(DISTINCT match_id) AS matches,
+                ROUND(AVG(match_runs), 2) AS avg_match_runs,
+                MAX(match_runs) AS highest_match_total
+            FROM match_totals
+            GROUP BY venue
+            HAVING matches >= $min_matches
+            ORDER BY avg_match_runs DESC
+            LIMIT $limit
+        """,
+    },
+    't20_death_bowlers': {
+        'title': "Best death bowlers in T20 cricket (last 5 overs)",
+        'params': {'min_balls': 60, 'min_wickets': 10, 'limit': 10},
+        'sql': """
+            SELECT
+                bowler,
+                COUNT(DISTINCT match_id) AS matches,
+                COUNT(*) AS balls_bowled,
+                SUM(runs_total) AS runs_conceded,
+                ROUND(SUM(runs_total) / (COUNT(*) / 6.0), 2) AS economy_rate,
+                SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END) AS wickets,
+                ROUND(1.0 * COUNT(*) / SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END), 2) AS strike_rate
+            FROM t20_deliveries
+            WHERE over_number >= 15 AND bowler != ''
+            GROUP BY bowler
+            HAVING balls_bowled >= $min_balls AND wickets >= $min_wickets
+            ORDER BY economy_rate ASC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            SELECT
+                bowler,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(deliveries) AS balls_bowled,
+                SUM(total_runs) AS runs_conceded,
+                ROUND(SUM(total_runs) / (SUM(deliveries) / 6.0), 2) AS economy_rate,
+                SUM(wickets) AS wickets,
+                ROUND(1.0 * SUM(deliveries) / SUM(wickets), 2) AS strike_rate
+            FROM t20_bowling_innings
+            WHERE phase = 'death' AND bowler != ''
+            GROUP BY bowler
+            HAVING balls_bowled >= $min_balls AND SUM(wickets) >= $min_wickets
+            ORDER BY economy_rate ASC
+            LIMIT $limit
+        """,
+    },
+    'ipl_most_valuable_players': {
+        'title': "Most valuable IPL players (batting and bowling combined)",
+        'params': {'min_matches': 10, 'limit': 15},
+        'sql': """
+            WITH batting_stats AS (
+                SELECT
+                    batter AS player,
+                    COUNT(DISTINCT match_id) AS matches,
+                    SUM(runs_batter) AS runs,
+                    ROUND(1.0 * SUM(runs_batter) / COUNT(DISTINCT match_id), 2) AS batting_avg
+                FROM ipl_deliveries
+                WHERE batter != ''
+                GROUP BY batter
+                HAVING matches >= $min_matches
+            ),
+            bowling_stats AS (
+                SELECT
+                    bowler AS player,
+                    COUNT(DISTINCT match_id) AS matches,
+                    SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END) AS wickets,
+                    ROUND(1.0 * SUM(CASE WHEN wicket_player_out != '' AND wicket_kind NOT IN ('run out', 'retired hurt', 'retired out', 'retired not out', 'obstructing the field', 'handled the ball', 'timed out', 'hit the ball twice') THEN 1 ELSE 0 END) / COUNT(DISTINCT match_id), 2) AS bowling_avg
+                FROM ipl_deliveries
+                WHERE bowler != ''
+                GROUP BY bowler
+                HAVING matches >= $min_matches
+            ),
+            combined_players AS (
+                SELECT player FROM batting_stats
+                UNION
+                SELECT player FROM bowling_stats
+            )
+            SELECT
+                cp.player,
+                COALESCE(bat.matches, 0) AS batting_matches,
+                COALESCE(bat.runs, 0) AS total_runs,
+                COALESCE(bat.batting_avg, 0) AS runs_per_match,
+                COALESCE(bowl.matches, 0) AS bowling_matches,
+                COALESCE(bowl.wickets, 0) AS total_wickets,
+                COALESCE(bowl.bowling_avg, 0) AS wickets_per_match,
+                COALESCE(bat.batting_avg, 0) + COALESCE(bowl.bowling_avg * 15, 0) AS value_index
+            FROM combined_players cp
+            LEFT JOIN batting_stats bat ON cp.player = bat.player
+            LEFT JOIN bowling_stats bowl ON cp.player = bowl.player
+            WHERE COALESCE(bat.runs, 0) > 0 OR COALESCE(bowl.wickets, 0) > 0
+            ORDER BY value_index DESC
+            LIMIT $limit
+        """,
+        'summary_sql': """
+            WITH batting_stats AS (
+                SELECT
+                    batter AS player,
+                    COUNT(DISTINCT match_id) AS matches,
+                    SUM(runs) AS runs,
+                    ROUND(1.0 * SUM(runs) / COUNT(DISTINCT match_id), 2) AS batting_avg
+                FROM ipl_batting_innings
+                WHERE batter != ''
+                GROUP BY batter
+                HAVING matches >= $min_matches
+            ),
+            bowling_stats AS (
+                SELECT
+                    bowler AS player,
+                    COUNT(DISTINCT match_id) AS matches,
+                    SUM(wickets) AS wickets,
+                    ROUND(1.0 * SUM(wickets) / COUNT(DISTINCT match_id), 2) AS bowling_avg
+                FROM ipl_bowling_innings
+                WHERE bowler != ''
+                GROUP BY bowler
+                HAVING matches >= $min_matches
+            ),
+            combined_players AS (
+                SELECT player FROM batting_stats
+                UNION
+                SELECT player FROM bowling_stats
+            )
+            SELECT
+                cp.player,
+                COALESCE(bat.matches, 0) AS batting_matches,
+                COALESCE(bat.runs, 0) AS total_runs,
+                COALESCE(bat.batting_avg, 0) AS runs_per_match,
+                COALESCE(bowl.matches, 0) AS bowling_matches,
+                COALESCE(bowl.wickets, 0) AS total_wickets,
+                COALESCE(bowl.bowling_avg, 0) AS wickets_per_match,
+                COALESCE(bat.batting_avg, 0) + COALESCE(bowl.bowling_avg * 15, 0) AS value_index
+            FROM combined_players cp
+            LEFT JOIN batting_stats bat ON cp.player = bat.player
+            LEFT JOIN bowling_stats bowl ON cp.player = bowl.player
+            WHERE COALESCE(bat.runs, 0) > 0 OR COALESCE(bowl.wickets, 0) > 0
+            ORDER BY value_index DESC
+            LIMIT $limit
+        """,
+    },
+    'ipl_team_performance': {
+        'title': "IPL team performance by season",
+        'params': {'min_matches': 5},
+        'sql': """
+            SELECT
+                season,
+                team1 AS team,
+                COUNT(*) AS matches,
+                SUM(CASE WHEN team1 = winner THEN 1 ELSE 0 END) AS wins,
+                ROUND(100.0 * SUM(CASE WHEN team1 = winner THEN 1 ELSE 0 END) / COUNT(*), 2) AS win_percentage
+            FROM ipl_matches
+            GROUP BY season, team1
+            HAVING matches >= $min_matches
+            UNION
+            SELECT
+                season,
+                team2 AS team,
+                COUNT(*) AS matches,
+                SUM(CASE WHEN team2 = winner THEN 1 ELSE 0 END) AS wins,
+                ROUND(100.0 * SUM(CASE WHEN team2 = winner THEN 1 ELSE 0 END) / COUNT(*), 2) AS win_percentage
+            FROM ipl_matches
+            GROUP BY season, team2
+            HAVING matches >= $min_matches
+            ORDER BY season, win_percentage DESC
+        """,
+    },
+    'ipl_powerplay_teams': {
+        'title': "Powerplay analysis in IPL - best teams during the powerplay",
+        'params': {'min_matches': 5},
+        'sql': """
+            WITH powerplay_batting AS (
+                SELECT
+                    d.match_id,
+                    i.team,
+                    m.season,
+                    SUM(d.runs_total) AS powerplay_runs,
+                    SUM(CASE WHEN d.wicket_player_out != '' THEN 1 ELSE 0 END) AS powerplay_wickets
+                FROM ipl_deliveries d
+                JOIN ipl_innings i ON d.match_id = i.match_id AND d.innings_number = i.innings_number
+                JOIN ipl_matches m ON d.match_id = m.match_id
+                JOIN ipl_powerplays p ON d.match_id = p.match_id AND d.innings_number = p.innings_number
+                WHERE p.powerplay_type = 'mandatory' AND d.over_number < 6
+                GROUP BY d.match_id, i.team, m.season
+            )
+            SELECT
+                team,
+                season,
+                COUNT(*) AS matches,
+                ROUND(AVG(powerplay_runs), 2) AS avg_powerplay_runs,
+                ROUND(AVG(powerplay_wickets), 2) AS avg_powerplay_wickets,
+                ROUND(AVG(powerplay_runs) / 6, 2) AS run_rate
+            FROM powerplay_batting
+            GROUP BY team, season
+            HAVING matches >= $min_matches
+            ORDER BY season DESC, run_rate DESC
+        """,
+        'summary_sql': """
+            WITH powerplay_batting AS (
+                SELECT
+                    p.match_id,
+                    i.team,
+                    m.season,
+                    SUM(p.runs) AS powerplay_runs,
+                    SUM(p.wickets) AS powerplay_wickets
+                FROM ipl_innings_phases p
+                JOIN ipl_innings i ON p.match_id = i.match_id AND p.innings_number = i.innings_number
+                JOIN ipl_matches m ON p.match_id = m.match_id
+                JOIN ipl_powerplays pp ON p.match_id = pp.match_id AND p.innings_number = pp.innings_number
+                WHERE pp.powerplay_type = 'mandatory' AND p.phase = 'powerplay'
+                GROUP BY p.match_id, i.team, m.season
+            )
+            SELECT
+                team,
+                season,
+                COUNT(*) AS matches,
+                ROUND(AVG(powerplay_runs), 2) AS avg_powerplay_runs,
+                ROUND(AVG(powerplay_wickets), 2) AS avg_powerplay_wickets,
+                ROUND(AVG(powerplay_runs) / 6, 2) AS run_rate
+            FROM powerplay_batting
+            GROUP BY team, season
+            HAVING matches >= $min_matches
+            ORDER BY season DESC, run_rate DESC
+        """,
+    },
+    'ipl_finishers': {
+        'title': "Best IPL finishers (batting in the last overs)",
+        'params': {'from_over': 16, 'min_balls': 50, 'min_matches': 10, 'limit': 10},
+        'sql': """
+            SELECT
+                batter,
+                COUNT(DISTINCT match_id) AS matches,
+                SUM(runs_batter) AS runs,
+                COUNT(*) AS balls_faced,
+                ROUND(100.0 * SUM(runs_batter) / COUNT(*), 2) AS strike_rate,
+                SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END) AS fours,
+                SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END) AS sixes
+            FROM ipl_deliveries
+            WHERE over_number >= $from_over AND batter != ''
+            GROUP BY batter
+            HAVING balls_faced >= $min_balls AND matches >= $min_matches
+            ORDER BY strike_rate DESC
+            LIMIT $limit
+        """,
+    },
+    'ipl_toss_impact': {
+        'title': "Impact of toss decisions in IPL",
+        'params': {'min_matches': 5},
+        'sql': """
+            SELECT
+                season,
+                toss_decision,
+                COUNT(*) AS matches,
+                SUM(CASE WHEN toss_winner = winner THEN 1 ELSE 0 END) AS toss_winner_won,
+                ROUND(100.0 * SUM(CASE WHEN toss_winner = winner THEN 1 ELSE 0 END) / COUNT(*), 2) AS win_percentage
+            FROM ipl_matches
+            WHERE toss_winner != '' AND winner != '' AND result != 'no result' AND result != 'tie'
+            GROUP BY season, toss_decision
+            HAVING matches >= $min_matches
+            ORDER BY season DESC, win_percentage DESC
+        """,
+    },
+    'ipl_chase_pressure': {
+        'title': "IPL chases by required run rate after a given number of overs",
+        'params': {'overs': 10, 'limit': 10},
+        # The ball state columns give the score of every chase at one legal ball, no window needed
+        'sql': """
+            SELECT
+                d.match_id,
+                m.season,
+                d.team AS chasing_team,
+                d.innings_runs AS runs,
+                d.innings_wickets AS wickets,
+                d.runs_required,
+                d.balls_remaining,
+                d.required_run_rate,
+                CASE WHEN m.winner = d.team THEN 1 ELSE 0 END AS won
+            FROM ipl_deliveries d
+            JOIN ipl_matches m ON d.match_id = m.match_id
+            WHERE d.innings_number = 2
+                AND d.innings_balls = $overs * 6
+                AND d.extras_wides = 0 AND d.extras_noballs = 0
+            ORDER BY d.required_run_rate DESC
+            LIMIT $limit
+        """,
+    },
+}
+
+def query_tables(sql):
+    """Return the table names a query reads, leaving out its common table expressions"""
+    ctes = set(re.findall(r'(\w+)\s+AS\s*\(', sql))
+    return set(re.findall(r'\b(?:FROM|JOIN)\s+(\w+)', sql)) - ctes
+
+class QueryEngine:
+    """Class to run the query catalogue against an embedded DuckDB (or SQLite) database
+
+    Tables are registered from reader DataFrames or from the Parquet datasets written by
+    ParquetStore. DuckDB queries DataFrames and Parquet files in place; SQLite copies them.
+    """
+
+    def __init__(self, engine=None, database=":memory:", cache=None):
+        """Initialize with the engine ("duckdb", "sqlite" or None for DuckDB when installed)
+
+        With a QueryCache, results are served from disk until the next ingest changes the data.
+        """
+        self.engine = engine or ("duckdb" if duckdb is not None else "sqlite")
+        if self.engine == "duckdb":
+            if duckdb is None:
+                raise ImportError("The DuckDB engine requires duckdb (pip install duckdb)")
+            self.connection = duckdb.connect(database)
+        elif self.engine == "sqlite":
+            self.connection = sqlite3.connect(database)
+        else:
+            raise ValueError(f"Unknown engine {self.engine!r}, expected 'duckdb' or 'sqlite'")
+        self.tables = set()
+        self.cache = cache
+
+    def close(self):
+        """Close the embedded database"""
+        self.connection.close()
+
+    def register_dataframe(self, table_name, df):
+        """Make a DataFrame queryable as a table"""
+        if self.engine == "duckdb":
+            self.connection.register(table_name, df)
+        else:
+            df.to_sql(table_name, self.connection, if_exists='replace', index=False)
+        self.tables.add(table_name)
+
+    def register_dataframes(self, dataframes):
+        """Register every DataFrame of a {table name: DataFrame} dict, e.g. from MatchIngestor.read_data"""
+        for table_name, df in dataframes.items():
+            self.register_dataframe(table_name, df)
+        print(f"Registered {len(dataframes)} tables with {self.engine}")
+
+    def register_parquet(self, root="parquet"):
+        """Register every Parquet dataset under root (one folder per table, as written by ParquetStore)"""
+        table_names = sorted(
+            name for name in os.listdir(root)
+            if glob.glob(os.path.join(root, name, '**', '*.parquet'), recursive=True)
+        )
+        for table_name in table_names:
+            path = os.path.join(root, table_name)
+            if self.engine == "duckdb":
+                pattern = os.path.join(path, '**', '*.parquet').replace(os.sep, '/')
+                self.connection.execute(
+                    f"CREATE OR REPLACE VIEW {table_name} AS "
+                    # Keep the season partition a string, as it is in the DataFrames
+                    f"SELECT * FROM read_parquet('{pattern}', hive_partitioning = true, "
+                    f"hive_types_autocast = false, union_by_name = true)"
+                )
+                self.tables.add(table_name)
+            else:
+                self.register_dataframe(table_name, pd.read_parquet(path))
+        print(f"Registered {len(table_names)} Parquet tables from {root} with {self.engine}")
+
+    def cache_params(self, params):
+        """Return the parameters a result is cached under - each engine has its own dtypes and rounding"""
+        return {**params, 'engine': self.engine}
+
+    def sql(self, query, params=None):
+        """Run SQL with $name parameters and return the result as a DataFrame"""
+        params = params or {}
+        if self.cache is not None:
+            return self.cache.fetch(query, self.cache_params(params), lambda: self.execute(query, params))
+        return self.execute(query, params)
+
+    def execute(self, query, params):
+        """Run SQL on the embedded database, bypassing the cache"""
+        if self.engine == "duckdb":
+            # DuckDB rejects parameters the statement does not use
+            used = set(re.findall(r'\$(\w+)', query))
+            return self.connection.execute(query, {k: v for k, v in params.items() if k in used}).df()
+        return pd.read_sql_query(query, self.connection, params=params)
+
+    def query_sql(self, name, use_summaries=True):
+        """Return the SQL a catalogue query runs with the registered tables"""
+        if name not in QUERIES:
+            raise KeyError(f"Unknown query {name!r}, see list_queries()")
+        entry = QUERIES[name]
+        summary_sql = entry.get('summary_sql')
+        if use_summaries and summary_sql and query_tables(summary_sql) <= self.tables:
+            return summary_sql
+        return entry['sql']
+
+    def run(self, name, use_summaries=True, **params):
+        """Run a catalogue query, overriding any of its default parameters
+
+        The summary table version of the query is used when its tables are registered.
+        """
+        query = self.query_sql(name, use_summaries)
+        missing = query_tables(query) - self.tables
+        if missing:
+            raise KeyError(f"Query {name!r} needs tables that are not registered: {', '.join(sorted(missing))}")
+        unknown = set(params) - set(QUERIES[name]['params'])
+        if unknown:
+            raise TypeError(f"Query {name!r} has no parameters {', '.join(sorted(unknown))}")
+        return self.sql(query, {**QUERIES[name]['params'], **params})
+
+def list_queries():
+    """Return the catalogue as a DataFrame of query names, titles and default parameters"""
+    return pd.DataFrame(
+        [(name, entry['title'], entry['params'], 'summary_sql' in entry) for name, entry in QUERIES.items()],
+        columns=['name', 'title', 'params', 'has_summary_version']
+    )
+
+def parse_param(text):
+    """Parse a NAME=VALUE command line parameter, converting numeric values"""
+    name, _, value = text.partition('=')
+    for convert in (int, float):
+        try:
+            return name, convert(value)
+        except ValueError:
+            pass
+    return name, value
+
+def main():
+    """Command line entry point for the query catalogue"""
+    parser = argparse.ArgumentParser(description="Run the bundled cricket queries on an embedded database")
+    parser.add_argument('queries', nargs='*', help="query names to run (default: list the catalogue)")
+    parser.add_argument('--all', action='store_true', help="run every catalogue query")
+    parser.add_argument('--parquet', help="folder of Parquet datasets written by ParquetStore")
+    parser.add_argument('--data-folder', default='data', help="read the Cricsheet archives when --parquet is not given")
+    parser.add_argument('--engine', choices=['duckdb', 'sqlite'])
+    parser.add_argument('--param', action='append', default=[], type=parse_param, metavar='NAME=VALUE')
+    parser.add_argument('--no-summaries', action='store_true', help="always query the raw delivery tables")
+    parser.add_argument('--cache', metavar='DIR', help="cache results in DIR until the next ingest")
+    args = parser.parse_args()
+
+    names = list(QUERIES) if args.all else args.queries
+    if not names:
+        print(list_queries().to_string(index=False))
+        return
+
+    ingestor = None
+    cache = None
+    if not args.parquet:
+        from ingest import MatchIngestor
+        ingestor = MatchIngestor(data_folder=args.data_folder, summaries=True)
+    if args.cache:
+        from query_cache import QueryCache
+        if ingestor is not None:
+            # The DataFrames come straight from the archives, so their match files version the results
+            cache = QueryCache(args.cache, version=ingestor.archive_version())
+        else:
+            cache = QueryCache(args.cache, manifest_path=os.path.join(args.data_folder, "ingest_manifest.json"))
+    engine = QueryEngine(args.engine, cache=cache)
+
+    # Only pass the parameters a query takes, so one --param can apply to several queries
+    params = {name: {k: v for k, v in args.param if k in QUERIES[name]['params']} for name in names}
+    results = {}
+    if cache is not None and ingestor is not None:
+        # Serve what the cache holds before paying for a read of the archives
+        for name in names:
+            entry = QUERIES[name]
+            query = entry['sql'] if args.no_summaries else entry.get('summary_sql', entry['sql'])
+            start_time = time.perf_counter()
+            result = cache.get(query, engine.cache_params({**entry['params'], **params[name]}))
+            if result is not None:
+                results[name] = (result, time.perf_counter() - start_time)
+    if len(results) < len(names):
+        if ingestor is not None:
+            engine.register_dataframes(ingestor.read_data(workers=None))
+        else:
+            engine.register_parquet(args.parquet)
+
+    for name in names:
+        if name not in results:
+            start_time = time.perf_counter()
+            result = engine.run(name, use_summaries=not args.no_summaries, **params[name])
+            results[name] = (result, time.perf_counter() - start_time)
+        result, elapsed = results[name]
+        print(f"\n=== {name}: {QUERIES[name]['title']} ({len(result)} rows, {elapsed * 1000:.1f} ms) ===")
+        print(result.to_string(index=False))
+    if cache is not None:
+        print(f"\nQuery cache: {cache.stats()}")
+    engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# Declared MySQL schema for the cricket tables. Table names are '<format>_<kind>'
+# (e.g. 'odi_deliveries'); every format shares the column types, keys and indexes of its kind.
+
+PLAYER = "VARCHAR(100)"
+SURROGATE_KEY = "INT UNSIGNED"
+TEAM = "VARCHAR(100)"
+NAME_LIST = "VARCHAR(255)"
+
+# Column types by column name, shared by all tables and formats
+COLUMN_TYPES = {
+    # Keys
+    'match_id': "VARCHAR(64)",
+    'innings_number': "TINYINT UNSIGNED",
+    'over_number': "SMALLINT UNSIGNED",
+    'ball_number': "TINYINT UNSIGNED",
+
+    # Matches
+    'data_version': "VARCHAR(16)",
+    'created': "DATE",
+    'revision': "SMALLINT UNSIGNED",
+    'city': "VARCHAR(100)",
+    'venue': "VARCHAR(255)",
+    'date': "DATE",
+    'season': "VARCHAR(16)",
+    'match_type': "VARCHAR(16)",
+    'match_type_number': "INT",
+    'balls_per_over': "TINYINT UNSIGNED",
+    'overs': "SMALLINT UNSIGNED",
+    'team1': TEAM,
+    'team2': TEAM,
+    'team_type': "VARCHAR(16)",
+    'toss_winner': TEAM,
+    'toss_decision': "VARCHAR(16)",
+    'winner': TEAM,
+    'result': "VARCHAR(32)",
+    'method': "VARCHAR(32)",
+    'win_by_runs': "SMALLINT UNSIGNED",
+    'win_by_wickets': "TINYINT UNSIGNED",
+    'outcome_result': "VARCHAR(32)",
+    'outcome_winner': TEAM,
+    'outcome_by_innings': "TINYINT UNSIGNED",
+    'outcome_by_runs': "SMALLINT UNSIGNED",
+    'outcome_by_wickets': "TINYINT UNSIGNED",
+    'player_of_match': NAME_LIST,
+    'event_name': "VARCHAR(150)",
+    'event_match_number': "INT",
+    'ipl_match_number': "INT",
+    'match_referee': NAME_LIST,
+    'umpires': NAME_LIST,
+    'tv_umpire': NAME_LIST,
+    'reserve_umpire': NAME_LIST,
+
+    # Innings
+    'team': TEAM,
+    'target_runs': "SMALLINT UNSIGNED",
+    'target_overs': "FLOAT",
+    'revised_target': "BOOLEAN",
+    'declared': "BOOLEAN",
+    'forfeited': "BOOLEAN",
+    'follow_on': "BOOLEAN",
+    'super_over': "BOOLEAN",
+
+    # Powerplays
+    'powerplay_from': "FLOAT",
+    'powerplay_to': "FLOAT",
+    'powerplay_type': "VARCHAR(32)",
+
+    # Deliveries
+    'batter': PLAYER,
+    'bowler': PLAYER,
+    'non_striker': PLAYER,
+    'runs_batter': "TINYINT UNSIGNED",
+    'runs_extras': "TINYINT UNSIGNED",
+    'runs_total': "TINYINT UNSIGNED",
+    'extras_wides': "TINYINT UNSIGNED",
+    'extras_noballs': "TINYINT UNSIGNED",
+    'extras_byes': "TINYINT UNSIGNED",
+    'extras_legbyes': "TINYINT UNSIGNED",
+    'extras_penalty': "TINYINT UNSIGNED",
+    'wicket_player_out': PLAYER,
+    'wicket_kind': "VARCHAR(32)",
+    'wicket_fielders': NAME_LIST,
+
+    # Innings state after each delivery (ball_state.py)
+    'innings_runs': "SMALLINT UNSIGNED",
+    'innings_wickets': "TINYINT UNSIGNED",
+    'innings_balls': "SMALLINT UNSIGNED",
+    'runs_required': "SMALLINT",
+    'balls_remaining': "SMALLINT",
+    'required_run_rate': "FLOAT",
+
+    # Summary tables (summaries.py) - totals per player, innings or phase
+    'phase': "VARCHAR(16)",
+    'deliveries': "SMALLINT UNSIGNED",
+    'legal_balls': "SMALLINT UNSIGNED",
+    'balls_faced': "SMALLINT UNSIGNED",
+    'runs': "SMALLINT UNSIGNED",
+    'runs_conceded': "SMALLINT UNSIGNED",
+    'total_runs': "SMALLINT UNSIGNED",
+    'runs_off_bat': "SMALLINT UNSIGNED",
+    'extras': "SMALLINT UNSIGNED",
+    'fours': "SMALLINT UNSIGNED",
+    'sixes': "SMALLINT UNSIGNED",
+    'wides': "SMALLINT UNSIGNED",
+    'noballs': "SMALLINT UNSIGNED",
+    'dismissed': "TINYINT UNSIGNED",
+    'wickets': "TINYINT UNSIGNED",
+
+    # Dimension tables and the surrogate keys that replace names in normalised fact tables
+    'name': "VARCHAR(100)",
+    'cricsheet_id': "VARCHAR(16)",
+    'role': "VARCHAR(32)",
+    'player_key': SURROGATE_KEY,
+    'team_key': SURROGATE_KEY,
+    'venue_key': SURROGATE_KEY,
+    'official_key': SURROGATE_KEY,
+    'batter_key': SURROGATE_KEY,
+    'bowler_key': SURROGATE_KEY,
+    'non_striker_key': SURROGATE_KEY,
+    'wicket_player_out_key': SURROGATE_KEY,
+    'team1_key': SURROGATE_KEY,
+    'team2_key': SURROGATE_KEY,
+    'toss_winner_key': SURROGATE_KEY,
+    'winner_key': SURROGATE_KEY,
+    'outcome_winner_key': SURROGATE_KEY,
+}
+
+# Primary key and secondary indexes by table kind
+TABLE_KEYS = {
+    'matches': {
+        'primary_key': ('match_id',),
+        'indexes': {
+            'idx_venue': ('venue',),
+            'idx_venue_key': ('venue_key',),
+            'idx_season': ('season',),
+            'idx_date': ('date',),
+        },
+    },
+    'innings': {
+        'primary_key': ('match_id', 'innings_number'),
+        'indexes': {},
+    },
+    'powerplays': {
+        'primary_key': (),
+        'indexes': {
+            'idx_match': ('match_id', 'innings_number'),
+        },
+    },
+    'overs': {
+        'primary_key': ('match_id', 'innings_number', 'over_number'),
+        'indexes': {},
+    },
+    'deliveries': {
+        'primary_key': ('match_id', 'innings_number', 'over_number', 'ball_number'),
+        'indexes': {
+            # Player indexes carry the columns the bundled batting/bowling queries aggregate
+            'idx_batter': ('batter', 'runs_batter'),
+            'idx_bowler': ('bowler', 'over_number', 'runs_total'),
+            'idx_team': ('team',),
+            # Score, wickets and chase state at a given ball of every innings, e.g. after 15 overs
+            'idx_innings_balls': ('innings_balls', 'innings_runs', 'innings_wickets', 'runs_required'),
+            'idx_batter_key': ('batter_key', 'runs_batter'),
+            'idx_bowler_key': ('bowler_key', 'over_number', 'runs_total'),
+            'idx_team_key': ('team_key',),
+        },
+    },
+    # Summary tables have no primary key: with normalise=True the player and team columns are keys
+    'batting_innings': {
+        'primary_key': (),
+        'indexes': {
+            'idx_match': ('match_id', 'innings_number'),
+            'idx_batter': ('batter', 'phase'),
+            'idx_batter_key': ('batter_key', 'phase'),
+        },
+    },
+    'bowling_innings': {
+        'primary_key': (),
+        'indexes': {
+            'idx_match': ('match_id', 'innings_number'),
+            'idx_bowler': ('bowler', 'phase'),
+            'idx_bowler_key': ('bowler_key', 'phase'),
+        },
+    },
+    'innings_phases': {
+        'primary_key': (),
+        'indexes': {
+            'idx_match': ('match_id', 'innings_number'),
+            'idx_phase': ('phase',),
+        },
+    },
+    'team_totals': {
+        'primary_key': (),
+        'indexes': {
+            'idx_match': ('match_id', 'innings_number'),
+        },
+    },
+    'match_officials': {
+        'primary_key': (),
+        'indexes': {
+            'idx_match': ('match_id',),
+            'idx_official_key': ('official_key',),
+        },
+    },
+    'players': {
+        'primary_key': ('player_key',),
+        'indexes': {
+            'idx_name': ('name',),
+            'idx_cricsheet_id': ('cricsheet_id',),
+        },
+    },
+    'teams': {
+        'primary_key': ('team_key',),
+        'indexes': {},
+    },
+    'venues': {
+        'primary_key': ('venue_key',),
+        'indexes': {},
+    },
+    'officials': {
+        'primary_key': ('official_key',),
+        'indexes': {},
+    },
+}
+
+def table_kind(table_name):
+    """Return the kind of a '<format>_<kind>' table name, e.g. 'deliveries'"""
+    return table_name.split('_', 1)[-1]
+
+def column_type(column):
+    """Return the declared MySQL type of a column, or None if it is not declared"""
+    return COLUMN_TYPES.get(column)
+
+def table_keys(table_name):
+    """Return the (primary key columns, {index name: columns}) declared for a table"""
+    keys = TABLE_KEYS.get(table_kind(table_name), {})
+    return tuple(keys.get('primary_key', ())), dict(keys.get('indexes', {}))
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+# The per-delivery rules live in metrics; NON_BOWLER_WICKETS stays importable from here
+from metrics import NON_BOWLER_WICKETS, bowler_runs, bowler_wickets
+
+# Summary tables built per format from the deliveries table, named '<format>_<summary>'
+SUMMARY_TABLES = ('batting_innings', 'bowling_innings', 'innings_phases', 'team_totals')
+
+def delivery_phases(over_number, phase_overs):
+    """Label each delivery 'powerplay', 'middle' or 'death' from the first over of the middle and death phases
+
+    Formats without phases (phase_overs None, e.g. Test cricket) label every delivery 'all'.
+    """
+    if phase_overs is None:
+        return np.full(len(over_number), 'all', dtype=object)
+    middle_start, death_start = phase_overs
+    over_number = over_number.to_numpy()
+    return np.select([over_number < middle_start, over_number < death_start], ['powerplay', 'middle'], 'death')
+
+def delivery_counts(deliveries, phase_overs=None):
+    """Return the deliveries' key columns plus the per-ball 0/1 and run columns the summaries add up"""
+    wicket_player_out = deliveries.get('wicket_player_out', pd.Series(np.nan, index=deliveries.index))
+    wicket = wicket_player_out.notna() & (wicket_player_out != '')
+    wides = deliveries['extras_wides'].to_numpy()
+    noballs = deliveries['extras_noballs'].to_numpy()
+
+    return pd.DataFrame({
+        'match_id': deliveries['match_id'],
+        'innings_number': deliveries['innings_number'],
+        'team': deliveries['team'],
+        'batter': deliveries['batter'],
+        'bowler': deliveries['bowler'],
+        'phase': delivery_phases(deliveries['over_number'], phase_overs),
+        'deliveries': 1,
+        'legal_balls': ((wides == 0) & (noballs == 0)).astype(np.int64),
+        # Batters face no-balls but not wides
+        'balls_faced': (wides == 0).astype(np.int64),
+        'runs_batter': deliveries['runs_batter'],
+        'runs_extras': deliveries['runs_extras'],
+        'runs_total': deliveries['runs_total'],
+        # Byes, leg byes and penalty runs are not charged to the bowler
+        'bowler_runs': bowler_runs(deliveries),
+        'fours': (deliveries['runs_batter'] == 4).astype(np.int64),
+        'sixes': (deliveries['runs_batter'] == 6).astype(np.int64),
+        'wides': (wides > 0).astype(np.int64),
+        'noballs': (noballs > 0).astype(np.int64),
+        'dismissed': (wicket_player_out == deliveries['batter']).astype(np.int64),
+        'wicket': wicket.astype(np.int64),
+        'bowler_wicket': bowler_wickets(deliveries).astype(np.int64),
+    })
+
+def aggregate(counts, keys, **columns):
+    """Sum count columns per key, keeping first-seen order and rows with missing keys"""
+    return (counts.groupby(keys, sort=False, dropna=False)
+            .agg(**{name: (column, 'sum') for name, column in columns.items()})
+            .reset_index())
+
+def build_summaries(deliveries, phase_overs=None):
+    """Aggregate one format's deliveries into its summary tables, keyed by summary name
+
+    - batting_innings: one line per batter per innings and phase
+    - bowling_innings: one line per bowler per innings and phase; runs_conceded counts the runs
+      charged to the bowler as metrics.bowling_stats does, total_runs every run off their deliveries
+    - innings_phases: team totals per innings and phase
+    - team_totals: team totals per innings (one innings per team in limited-overs matches)
+
+    Every summary row belongs to a single match, so incremental loads maintain the tables
+    by deleting the rows of replaced match IDs and appending the new ones, as for deliveries.
+    """
+    counts = delivery_counts(deliveries, phase_overs)
+    innings_keys = ['match_id', 'innings_number', 'team']
+    return {
+        'batting_innings': aggregate(
+            counts, innings_keys + ['batter', 'phase'], deliveries='deliveries', balls_faced='balls_faced',
+            runs='runs_batter', fours='fours', sixes='sixes', dismissed='dismissed'),
+        'bowling_innings': aggregate(
+            counts, innings_keys + ['bowler', 'phase'], deliveries='deliveries', legal_balls='legal_balls',
+            runs_conceded='bowler_runs', total_runs='runs_total', runs_off_bat='runs_batter',
+            wides='wides', noballs='noballs',
+            wickets='bowler_wicket'),
+        'innings_phases': aggregate(
+            counts, innings_keys + ['phase'], deliveries='deliveries', legal_balls='legal_balls',
+            runs='runs_total', extras='runs_extras', wickets='wicket'),
+        'team_totals': aggregate(
+            counts, innings_keys, deliveries='deliveries', legal_balls='legal_balls',
+            runs='runs_total', extras='runs_extras', wickets='wicket'),
+    }
+
+def add_summaries(dataframes, readers, verbose=True):
+    """Add every reader's summary tables, built from its deliveries DataFrame, to the dict in place"""
+    for reader in readers:
+        deliveries = dataframes.get(f'{reader.format_name}_deliveries')
+        if deliveries is None or deliveries.empty:
+            continue
+        for summary, df in build_summaries(deliveries, reader.phase_overs).items():
+            dataframes[f'{reader.format_name}_{summary}'] = df
+        if verbose:
+            print(f"Created {reader.label} summary DataFrames: {len(deliveries)} deliveries summarised")
@@ -0,0 +1,322 @@
+import os
+import json
+import random
+import hashlib
+import zipfile
+import argparse
+
+# Relative frequency of 0, 1, 2, 3, 4 and 6 runs off the bat - about 3, 5 and 8 runs an over
+TEST_SCORING = (72, 17, 4, 1, 5.5, 0.5)
+ODI_SCORING = (52, 32, 6, 0.5, 8, 1.5)
+T20_SCORING = (40, 35, 7, 0.5, 12, 5.5)
+
+# Archive, match type, innings, overs, scoring and typical wicket rate (wickets per legal ball)
+# per format, named like the Cricsheet downloads so the readers find them
+FORMATS = {
+    'test': {'archive': 'tests_json.zip', 'match_type': 'Test', 'innings': 4, 'overs': None,
+             'scoring': TEST_SCORING, 'wicket_rate': 0.018},
+    'odi': {'archive': 'odis_json.zip', 'match_type': 'ODI', 'innings': 2, 'overs': 50,
+            'scoring': ODI_SCORING, 'wicket_rate': 0.02},
+    't20': {'archive': 't20s_json.zip', 'match_type': 'T20', 'innings': 2, 'overs': 20,
+            'scoring': T20_SCORING, 'wicket_rate': 0.045, 'event_name': "ICC Men's T20 World Cup"},
+    'ipl': {'archive': 'ipl_json.zip', 'match_type': 'T20', 'innings': 2, 'overs': 20,
+            'scoring': T20_SCORING, 'wicket_rate': 0.045, 'event_name': 'Indian Premier League'},
+}
+
+INTERNATIONAL_TEAMS = ['Australia', 'Bangladesh', 'England', 'India', 'New Zealand',
+                       'Pakistan', 'South Africa', 'Sri Lanka', 'West Indies', 'Zimbabwe']
+IPL_TEAMS = ['Chennai Super Kings', 'Delhi Capitals', 'Gujarat Titans', 'Kolkata Knight Riders',
+             'Lucknow Super Giants', 'Mumbai Indians', 'Punjab Kings', 'Rajasthan Royals',
+             'Royal Challengers Bengaluru', 'Sunrisers Hyderabad']
+VENUES = [('Melbourne Cricket Ground', 'Melbourne'), ("Lord's", 'London'), ('Eden Gardens', 'Kolkata'),
+          ('Wankhede Stadium', 'Mumbai'), ('Newlands', 'Cape Town'), ('Gaddafi Stadium', 'Lahore'),
+          ('Basin Reserve', 'Wellington'), ('Kensington Oval', 'Bridgetown'), ('Sydney Cricket Ground', 'Sydney'),
+          ('R Premadasa Stadium', 'Colombo'), ('Shere Bangla National Stadium', 'Mirpur'), ('Edgbaston', 'Birmingham')]
+SURNAMES = ['Ahmed', 'Anderson', 'Bairstow', 'Bavuma', 'Boult', 'Buttler', 'Chahal', 'Conway', 'Cummins', 'de Kock',
+            'Dhawan', 'Hasaranga', 'Hazlewood', 'Head', 'Holder', 'Iyer', 'Jadeja', 'Khan', 'Kohli', 'Labuschagne',
+            'Latham', 'Livingstone', 'Malan', 'Markram', 'Marsh', 'Mendis', 'Miller', 'Nortje', 'Pandya', 'Pant',
+            'Rabada', 'Rahul', 'Rashid', 'Root', 'Russell', 'Santner', 'Sharma', 'Shakib', 'Smith', 'Southee',
+            'Starc', 'Stokes', 'Taylor', 'Theekshana', 'Warner', 'Williamson', 'Wood', 'Yadav', 'Zampa', 'Zaman']
+UMPIRES = ['Aleem Dar', 'HDPK Dharmasena', 'MA Gough', 'RK Illingworth', 'RA Kettleborough',
+           'Nitin Menon', 'CB Gaffaney', 'JS Wilson', 'AT Holdstock', 'PR Reiffel']
+
+BATTER_RUNS = (0, 1, 2, 3, 4, 6)
+# How batters are dismissed, with their relative frequencies - including the rare kinds the bowler is not credited with
+DISMISSALS = (('caught', 48), ('bowled', 17), ('lbw', 14), ('run out', 7), ('stumped', 4), ('caught and bowled', 3),
+              ('retired hurt', 1), ('retired out', 1), ('retired not out', 1), ('obstructing the field', 1),
+              ('handled the ball', 1), ('timed out', 1), ('hit the ball twice', 1))
+
+def cumulative(weights):
+    """Return the running totals of weights, for random.choices(cum_weights=...)"""
+    totals, total = [], 0
+    for weight in weights:
+        total += weight
+        totals.append(total)
+    return totals
+
+DISMISSAL_KINDS = [kind for kind, _ in DISMISSALS]
+DISMISSAL_WEIGHTS = cumulative(weight for _, weight in DISMISSALS)
+
+def person_id(name):
+    """Return a stable Cricsheet-style registry ID for a name"""
+    return hashlib.md5(name.encode()).hexdigest()[:8]
+
+class SyntheticArchiveGenerator:
+    """Class to write synthetic Cricsheet-format ZIP archives for benchmarking and testing
+
+    Every match is simulated ball by ball: strike rotates on odd runs and at the end of each over,
+    bowlers rotate through five-over spells, wickets bring in the next batter, innings end when
+    the side is all out, the overs run out or the target is reached, and the outcome follows
+    from the scores. The output depends only on the seed and the size settings.
+    """
+
+    def __init__(self, output_folder="synthetic_data", matches=100, innings=None, overs=None, wicket_rate=None,
+                 powerplays=True, seed=0):
+        """Initialize with the output folder and the size of the archives
+
+        - matches: matches per format
+        - innings: innings per match (default 4 for Tests and 2 otherwise)
+        - overs: overs per innings (default 50 for ODIs, 20 for T20s; a Test innings is then capped at this many)
+        - wicket_rate: chance of a wicket per legal ball (default per format, about 0.02 to 0.05)
+        - powerplays: include the powerplay overs of limited-overs innings
+        """
+        if matches < 0:
+            raise ValueError(f"matches must be zero or more, not {matches}")
+        if innings is not None and not 1 <= innings <= 4:
+            raise ValueError(f"innings must be between 1 and 4, not {innings}")
+        if overs is not None and overs < 1:
+            raise ValueError(f"overs must be positive, not {overs}")
+        if wicket_rate is not None and not 0 <= wicket_rate < 1:
+            raise ValueError(f"wicket_rate must be between 0 and 1, not {wicket_rate}")
+        self.output_folder = output_folder
+        self.matches = matches
+        self.innings = innings
+        self.overs = overs
+        self.wicket_rate = wicket_rate
+        self.powerplays = powerplays
+        self.seed = seed
+
+    def squad(self, teams, team):
+        """Return the eleven players of a team, with names unique across the teams"""
+        first = teams.index(team) * 11
+        return [f"{chr(65 + (first + i) // len(SURNAMES) % 26)} {SURNAMES[(first + i) % len(SURNAMES)]}"
+                for i in range(11)]
+
+    def delivery(self, rng, batter, bowler, non_striker, fielders, scoring, wicket_rate):
+        """Simulate one delivery, returning the Cricsheet delivery and whether it was a legal ball
+
+        scoring holds the cumulative weights of BATTER_RUNS.
+        """
+        delivery = {'batter': batter, 'bowler': bowler, 'non_striker': non_striker}
+        batter_runs, extras, wicket = 0, {}, None
+        roll = rng.random()
+        if roll < 0.03:
+            extras['wides'] = 5 if rng.random() < 0.02 else 1
+        elif roll < 0.04:
+            extras['noballs'] = 1
+            batter_runs = rng.choices(BATTER_RUNS, cum_weights=scoring)[0]
+        elif roll < 0.05:
+            extras['byes'] = rng.choice((1, 1, 2, 4))
+        elif roll < 0.07:
+            extras['legbyes'] = rng.choice((1, 1, 2, 4))
+        elif rng.random() < wicket_rate:
+            kind = rng.choices(DISMISSAL_KINDS, cum_weights=DISMISSAL_WEIGHTS)[0]
+            wicket = {'player_out': batter, 'kind': kind}
+            if kind == 'run out':
+                # Run out coming back for a second run, either batter
+                batter_runs = 1
+                wicket['player_out'] = rng.choice((batter, non_striker))
+                wicket['fielders'] = [{'name': rng.choice(fielders)}]
+            elif kind == 'caught':
+                wicket['fielders'] = [{'name': rng.choice(fielders)}]
+            elif kind == 'stumped':
+                wicket['fielders'] = [{'name': fielders[0]}]
+        else:
+            batter_runs = rng.choices(BATTER_RUNS, cum_weights=scoring)[0]
+
+        extra_runs = sum(extras.values())
+        delivery['runs'] = {'batter': batter_runs, 'extras': extra_runs, 'total': batter_runs + extra_runs}
+        if extras:
+            delivery['extras'] = extras
+        if wicket:
+            delivery['wickets'] = [wicket]
+        return delivery, not ('wides' in extras or 'noballs' in extras)
+
+    def simulate_innings(self, rng, batting, bowling, max_overs, scoring, wicket_rate, target=None, declare_at=None):
+        """Simulate an innings, returning its overs, runs and wickets
+
+        The innings ends when the side is all out, the overs run out, the target is reached, or
+        at the end of the first over with declare_at runs or more (a Test declaration).
+        """
+        # Openers 0 and 1 and the rest in order; the last five of the fielding side bowl and the first keeps wicket
+        striker, non_striker, next_batter = batting[0], batting[1], 2
+        bowlers = bowling[6:]
+        # Spells of up to five overs from each end; bowlers change ends in turn, so nobody bowls
+        # consecutive overs and over a full limited-overs innings each bowls a fifth of the overs
+        spell = max(1, min(max_overs // 10, 5))
+        runs = wickets = 0
+        overs = []
+        for over_number in range(max_overs):
+            bowler = bowlers[(over_number // 2 // spell * 2 + over_number % 2) % len(bowlers)]
+            deliveries = []
+            legal = 0
+            while legal < 6:
+                delivery, is_legal = self.delivery(rng, striker, bowler, non_striker, bowling, scoring, wicket_rate)
+                deliveries.append(delivery)
+                legal += is_legal
+                runs += delivery['runs']['total']
+                if (delivery['runs']['batter'] + delivery.get('extras', {}).get('byes', 0)
+                        + delivery.get('extras', {}).get('legbyes', 0)) % 2:
+                    striker, non_striker = non_striker, striker
+                if 'wickets' in delivery:
+                    wickets += 1
+                    if wickets == 10:
+                        break
+                    # The new batter takes the place of the batter who was out
+                    if delivery['wickets'][0]['player_out'] == striker:
+                        striker = batting[next_batter]
+                    else:
+                        non_striker = batting[next_batter]
+                    next_batter += 1
+                if target is not None and runs >= target:
+                    break
+            overs.append({'over': over_number, 'deliveries': deliveries})
+            if wickets == 10 or (target is not None and runs >= target) or (declare_at is not None and runs >= declare_at):
+                break
+            striker, non_striker = non_striker, striker
+        return overs, runs, wickets
+
+    def match(self, format_name, number, rng):
+        """Simulate match number (0-based) of a format as a Cricsheet match dict"""
+        spec = FORMATS[format_name]
+        limited = spec['overs'] is not None
+        team_pool = IPL_TEAMS if format_name == 'ipl' else INTERNATIONAL_TEAMS
+        teams = rng.sample(team_pool, 2)
+        squads = {team: self.squad(team_pool, team) for team in teams}
+        venue, city = rng.choice(VENUES)
+        year = 2010 + number * 15 // max(self.matches, 1)
+        month = 4 + number % 2 if format_name == 'ipl' else 1 + number % 12
+        season = str(year) if format_name == 'ipl' or month >= 4 else f"{year - 1}/{str(year)[2:]}"
+        toss_winner = rng.choice(teams)
+        toss_decision = rng.choice(('bat', 'field'))
+        batting_first = toss_winner if toss_decision == 'bat' else teams[1 - teams.index(toss_winner)]
+        bowling_first = teams[1 - teams.index(batting_first)]
+
+        innings_count = self.innings or spec['innings']
+        max_overs = self.overs or spec['overs'] or 150
+        scoring = cumulative(spec['scoring'])
+        wicket_rate = spec['wicket_rate'] if self.wicket_rate is None else self.wicket_rate
+        innings, totals = [], {team: 0 for team in teams}
+        outcome = {'result': 'draw'} if not limited else {'result': 'no result'}
+        # A Test lasts five days of 90 overs
+        overs_left = 450
+        for innings_idx in range(innings_count):
+            batting = batting_first if innings_idx % 2 == 0 else bowling_first
+            bowling = teams[1 - teams.index(batting)]
+            inning = {'team': batting}
+            target = declare_at = None
+            last = innings_idx == innings_count - 1
+            if last and innings_count % 2 == 0:
+                target = totals[bowling] - totals[batting] + 1
+                if target <= 0:
+                    # The side batting last already leads after the opposition's two innings
+                    outcome = {'winner': batting, 'by': {'innings': 1, 'runs': 1 - target}}
+                    break
+                if limited:
+                    inning['target'] = {'overs': max_overs, 'runs': target}
+            elif not limited and not last:
+                if innings_idx < 2 and rng.random() < 0.4:
+                    declare_at = rng.randint(400, 600)
+                elif innings_idx == 2:
+                    # Declare once the lead looks big enough to bowl the opposition out
+                    declare_at = max(1, totals[bowling] - totals[batting] + rng.randint(250, 450))
+            innings_overs = max_overs if limited else min(max_overs, overs_left)
+            if innings_overs <= 0:
+                break
+            if self.powerplays and limited:
+                powerplay_overs = max(1, round(max_overs * (0.3 if max_overs <= 20 else 0.2)))
+                inning['powerplays'] = [{'from': 0.1, 'to': powerplay_overs - 1 + 0.6, 'type': 'mandatory'}]
+            overs, runs, wickets = self.simulate_innings(
+                rng, squads[batting], squads[bowling], innings_overs, scoring, wicket_rate, target, declare_at)
+            inning['overs'] = overs
+            if declare_at is not None and runs >= declare_at and wickets < 10:
+                inning['declared'] = True
+            innings.append(inning)
+            totals[batting] += runs
+            overs_left -= len(overs)
+
+            if target is not None:
+                if runs >= target:
+                    outcome = {'winner': batting, 'by': {'wickets': 10 - wickets}}
+                elif runs == target - 1 and (limited or wickets == 10):
+                    outcome = {'result': 'tie'}
+                elif wickets == 10 or limited:
+                    outcome = {'winner': bowling, 'by': {'runs': target - 1 - runs}}
+
+        info = {
+            'balls_per_over': 6,
+            'city': city,
+            'dates': [f"{year}-{month:02d}-{1 + number * 7 % 28:02d}"],
+            'gender': 'male',
+            'match_type': spec['match_type'],
+            'officials': {'umpires': rng.sample(UMPIRES, 2), 'match_referees': [rng.choice(UMPIRES)]},
+            'outcome': outcome,
+            'player_of_match': [rng.choice(squads[outcome.get('winner', batting_first)])],
+            'players': squads,
+            'registry': {'people': {name: person_id(name) for squad in squads.values() for name in squad}},
+            'season': season,
+            'team_type': 'club' if format_name == 'ipl' else 'international',
+            'teams': teams,
+            'toss': {'decision': toss_decision, 'winner': toss_winner},
+            'venue': venue,
+        }
+        if limited:
+            info['overs'] = max_overs
+        if 'event_name' in spec:
+            info['event'] = {'name': spec['event_name'], 'match_number': number + 1}
+        else:
+            info['match_type_number'] = number + 1
+        return {
+            'meta': {'data_version': '1.1.0', 'created': f"{year}-{month:02d}-28", 'revision': 1},
+            'info': info,
+            'innings': innings,
+        }
+
+    def write_archive(self, format_name):
+        """Write one format's archive, one pretty-printed JSON file per match as Cricsheet does, and return its path"""
+        os.makedirs(self.output_folder, exist_ok=True)
+        rng = random.Random(f"{self.seed}-{format_name}")
+        path = os.path.join(self.output_folder, FORMATS[format_name]['archive'])
+        first_id = 1000000 * (list(FORMATS).index(format_name) + 1)
+        tmp_path = f"{path}.tmp"
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as z:
+            for number in range(self.matches):
+                z.writestr(f"{first_id + number}.json", json.dumps(self.match(format_name, number, rng), indent=2))
+            z.writestr('README.txt', f"Synthetic Cricsheet data: {self.matches} {format_name} matches, seed {self.seed}\n")
+        os.replace(tmp_path, path)
+        print(f"Wrote {self.matches} {format_name} matches to {path} ({os.path.getsize(path) / 2**20:.1f} MB)")
+        return path
+
+    def generate(self, formats=None):
+        """Write the archives of the given formats (all by default) and return their paths"""
+        return [self.write_archive(format_name) for format_name in formats or FORMATS]
+
+def main():
+    """Command line entry point for the synthetic archive generator"""
+    parser = argparse.ArgumentParser(description="Write synthetic Cricsheet-format ZIP archives")
+    parser.add_argument('--output-folder', default='synthetic_data')
+    parser.add_argument('--formats', nargs='+', default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument('--matches', type=int, default=100, help="matches per format")
+    parser.add_argument('--innings', type=int, help="innings per match (default 4 for Tests, 2 otherwise)")
+    parser.add_argument('--overs', type=int, help="overs per innings (default 50 for ODIs, 20 for T20s)")
+    parser.add_argument('--wicket-rate', type=float, help="chance of a wicket per legal ball")
+    parser.add_argument('--no-powerplays', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generator = SyntheticArchiveGenerator(args.output_folder, args.matches, args.innings, args.overs,
+                                          args.wicket_rate, not args.no_powerplays, args.seed)
+    generator.generate(args.formats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ball_state import add_ball_state
+
+COLUMNS = ['match_id', 'innings_number', 'runs_total', 'extras_wides', 'extras_noballs',
+           'wicket_player_out', 'wicket_kind']
+
+@pytest.fixture
+def deliveries():
+    return pd.DataFrame([
+        # M1, innings 1: a four, a wide, A1 bowled, A2 retired hurt, a single
+        ('M1', 1, 4, 0, 0, None, None),
+        ('M1', 1, 1, 1, 0, None, None),
+        ('M1', 1, 0, 0, 0, 'A1', 'bowled'),
+        ('M1', 1, 0, 0, 0, 'A2', 'retired hurt'),
+        ('M1', 1, 1, 0, 0, None, None),
+        # M1, innings 2: chasing 7 in the match's 1 over - a two, a no-ball, C1 retired not out,
+        # C2 caught, then the winning four
+        ('M1', 2, 2, 0, 0, None, None),
+        ('M1', 2, 1, 0, 1, None, None),
+        ('M1', 2, 0, 0, 0, 'C1', 'retired not out'),
+        ('M1', 2, 0, 0, 0, 'C2', 'caught'),
+        ('M1', 2, 4, 0, 0, None, None),
+        # M2, innings 2: chasing 10 in a revised 0.4 overs
+        ('M2', 2, 6, 0, 0, None, None),
+    ], columns=COLUMNS)
+
+@pytest.fixture
+def innings():
+    return pd.DataFrame({'match_id': ['M1', 'M1', 'M2', 'M2'], 'innings_number': [1, 2, 1, 2],
+                         'target_runs': [np.nan, 7, np.nan, 10], 'target_overs': [np.nan, np.nan, np.nan, 0.4]})
+
+@pytest.fixture
+def matches():
+    return pd.DataFrame({'match_id': ['M1', 'M2'], 'balls_per_over': [6, 6], 'overs': [1, 1]})
+
+def test_running_score_wickets_and_balls(deliveries):
+    add_ball_state(deliveries)
+    # The wide and the no-ball are not legal balls; neither retirement is a wicket
+    assert deliveries['innings_runs'].tolist() == [4, 5, 5, 5, 6, 2, 3, 3, 3, 7, 6]
+    assert deliveries['innings_wickets'].tolist() == [0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 0]
+    assert deliveries['innings_balls'].tolist() == [1, 1, 2, 3, 4, 1, 1, 2, 3, 4, 1]
+    assert 'runs_required' not in deliveries.columns
+
+def test_chase_state(deliveries, innings, matches):
+    add_ball_state(deliveries, innings, matches)
+    first_innings = deliveries['innings_number'] == 1
+    assert deliveries.loc[first_innings, ['runs_required', 'balls_remaining', 'required_run_rate']].isna().all().all()
+
+    chase = deliveries[~first_innings]
+    # M1 has no target_overs, so the target is set over the match's 1 over; M2's 0.4 overs are 4 balls
+    assert chase['runs_required'].tolist() == [5, 4, 4, 4, 0, 4]
+    assert chase['balls_remaining'].tolist() == [5, 5, 4, 3, 2, 3]
+    assert chase['required_run_rate'].tolist() == pytest.approx([6.0, 4.8, 6.0, 8.0, 0.0, 8.0])
+
+@pytest.mark.parametrize('kind', ['retired hurt', 'retired not out'])
+def test_retirements_are_not_wickets(kind):
+    deliveries = pd.DataFrame([('M1', 1, 0, 0, 0, 'A1', kind), ('M1', 1, 0, 0, 0, 'A2', 'retired out')],
+                              columns=COLUMNS)
+    add_ball_state(deliveries)
+    # Retired out is a wicket
+    assert deliveries['innings_wickets'].tolist() == [0, 1]
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import pytest
+import metrics
+from metrics import NON_BOWLER_WICKETS
+from summaries import build_summaries
+
+COLUMNS = ['over_number', 'ball_number', 'batter', 'non_striker', 'bowler',
+           'runs_batter', 'extras_wides', 'extras_noballs', 'extras_byes', 'extras_legbyes',
+           'wicket_player_out', 'wicket_kind']
+NO_WICKET = (None, None)
+
+# Match M1, innings 1 (team A): a four, a wide, a leg bye, a six, A1 bowled, a no-ball,
+# non-striker A2 run out and A3 retired out
+INNINGS_1 = [
+    (0, 1, 'A1', 'A2', 'B1', 4, 0, 0, 0, 0, *NO_WICKET),
+    (0, 2, 'A1', 'A2', 'B1', 0, 1, 0, 0, 0, *NO_WICKET),
+    (0, 3, 'A1', 'A2', 'B1', 1, 0, 0, 0, 0, *NO_WICKET),
+    (0, 4, 'A2', 'A1', 'B1', 0, 0, 0, 0, 1, *NO_WICKET),
+    (0, 5, 'A1', 'A2', 'B1', 6, 0, 0, 0, 0, *NO_WICKET),
+    (0, 6, 'A1', 'A2', 'B1', 0, 0, 0, 0, 0, 'A1', 'bowled'),
+    (0, 7, 'A3', 'A2', 'B1', 0, 0, 0, 0, 0, *NO_WICKET),
+    (1, 1, 'A2', 'A3', 'B2', 2, 0, 0, 0, 0, *NO_WICKET),
+    (1, 2, 'A2', 'A3', 'B2', 1, 0, 1, 0, 0, *NO_WICKET),
+    (1, 3, 'A3', 'A2', 'B2', 0, 0, 0, 0, 0, 'A2', 'run out'),
+    (1, 4, 'A3', 'A4', 'B2', 1, 0, 0, 0, 0, *NO_WICKET),
+    (1, 5, 'A4', 'A3', 'B2', 3, 0, 0, 0, 0, *NO_WICKET),
+    (1, 6, 'A3', 'A4', 'B2', 0, 0, 0, 0, 0, 'A3', 'retired out'),
+]
+# Innings 2 (team B): a wicket maiden, C3 obstructing the field, two byes, C4 stumped,
+# and an unbroken last stand
+INNINGS_2 = [
+    *[(0, ball, 'C1', 'C2', 'D1', 0, 0, 0, 0, 0, *NO_WICKET) for ball in range(1, 6)],
+    (0, 6, 'C1', 'C2', 'D1', 0, 0, 0, 0, 0, 'C1', 'caught'),
+    (1, 1, 'C2', 'C3', 'D2', 1, 0, 0, 0, 0, *NO_WICKET),
+    (1, 2, 'C3', 'C2', 'D2', 0, 0, 0, 0, 0, 'C3', 'obstructing the field'),
+    (1, 3, 'C4', 'C2', 'D2', 0, 0, 0, 2, 0, *NO_WICKET),
+    (1, 4, 'C4', 'C2', 'D2', 0, 0, 0, 0, 0, 'C4', 'stumped'),
+    (1, 5, 'C5', 'C2', 'D2', 1, 0, 0, 0, 0, *NO_WICKET),
+]
+
+def make_deliveries(innings):
+    """Build a deliveries table from {(match_id, innings_number, team): rows} in the readers' columns"""
+    frames = []
+    for (match_id, innings_number, team), rows in innings.items():
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df.insert(0, 'match_id', match_id)
+        df.insert(1, 'innings_number', innings_number)
+        df.insert(2, 'team', team)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df['extras_penalty'] = 0
+    df['runs_extras'] = df[['extras_wides', 'extras_noballs', 'extras_byes', 'extras_legbyes']].sum(axis=1)
+    df['runs_total'] = df['runs_batter'] + df['runs_extras']
+    return df
+
+@pytest.fixture
+def deliveries():
+    return make_deliveries({('M1', 1, 'A'): INNINGS_1, ('M1', 2, 'B'): INNINGS_2})
+
+def by_key(df, key, columns):
+    return {row[key]: tuple(row[c] for c in columns) for _, row in df.iterrows()}
+
+def assert_rows(actual, expected):
+    assert set(actual) == set(expected)
+    for key, values in expected.items():
+        assert actual[key] == pytest.approx(values, nan_ok=True), key
+
+def test_batting_stats(deliveries):
+    stats = metrics.batting_stats(deliveries)
+    columns = ['innings', 'runs', 'balls_faced', 'dismissals', 'not_outs', 'average', 'strike_rate', 'fours', 'sixes']
+    assert_rows(by_key(stats, 'batter', columns), {
+        # The wide is not a ball faced; the no-ball is
+        'A1': (1, 11, 4, 1, 0, 11.0, 275.0, 1, 1),
+        # Run out as the non-striker
+        'A2': (1, 3, 3, 1, 0, 3.0, 100.0, 0, 0),
+        'A3': (1, 1, 4, 1, 0, 1.0, 25.0, 0, 0),
+        'A4': (1, 3, 1, 0, 1, np.nan, 300.0, 0, 0),
+        'C1': (1, 0, 6, 1, 0, 0.0, 0.0, 0, 0),
+        'C2': (1, 1, 1, 0, 1, np.nan, 100.0, 0, 0),
+        'C3': (1, 0, 1, 1, 0, 0.0, 0.0, 0, 0),
+        # Byes are not the batter's runs, but the ball was faced
+        'C4': (1, 0, 2, 1, 0, 0.0, 0.0, 0, 0),
+        'C5': (1, 1, 1, 0, 1, np.nan, 100.0, 0, 0),
+    })
+    # Most runs first, ties in the order the batters appeared
+    assert list(stats['batter'][:4]) == ['A1', 'A2', 'A4', 'A3']
+
+def test_bowling_stats(deliveries):
+    stats = metrics.bowling_stats(deliveries)
+    columns = ['legal_balls', 'overs', 'runs_conceded', 'wickets', 'wides', 'noballs', 'economy', 'average', 'strike_rate']
+    assert_rows(by_key(stats, 'bowler', columns), {
+        # The wide is charged to the bowler, the leg bye is not
+        'B1': (6, 1.0, 12, 1, 1, 0, 12.0, 12.0, 6.0),
+        # Neither the run out nor the retirement is the bowler's wicket
+        'B2': (5, 0.5, 8, 0, 0, 1, 9.6, np.nan, np.nan),
+        'D1': (6, 1.0, 0, 1, 0, 0, 0.0, 0.0, 6.0),
+        # Stumped counts, obstructing the field does not; the byes are not charged
+        'D2': (5, 0.5, 2, 1, 0, 0, 2.4, 2.0, 5.0),
+    })
+    # Most wickets first, then fewest runs
+    assert list(stats['bowler']) == ['D1', 'D2', 'B1', 'B2']
+
+def test_bowling_figures(deliveries):
+    figures = metrics.bowling_figures(deliveries)
+    columns = ['innings_number', 'overs', 'maidens', 'runs_conceded', 'wickets', 'figures']
+    assert_rows(by_key(figures, 'bowler', columns), {
+        'B1': (1, 1.0, 0, 12, 1, '1/12'),
+        'B2': (1, 0.5, 0, 8, 0, '0/8'),
+        'D1': (2, 1.0, 1, 0, 1, '1/0'),
+        'D2': (2, 0.5, 0, 2, 1, '1/2'),
+    })
+
+def test_metrics_agree_with_summaries(deliveries):
+    # Split into phases, so each bowler's and batter's lines are summed back up
+    summaries = build_summaries(deliveries, phase_overs=(1, 2))
+
+    bowling = summaries['bowling_innings'].groupby('bowler')[['legal_balls', 'runs_conceded', 'wickets']].sum()
+    stats = metrics.bowling_stats(deliveries).set_index('bowler')
+    pd.testing.assert_frame_equal(bowling.sort_index(), stats[bowling.columns].sort_index(), check_dtype=False)
+    # The byes and the leg bye are in the total but not charged to the bowler
+    assert summaries['bowling_innings']['total_runs'].sum() - bowling['runs_conceded'].sum() == 3
+
+    # Dismissals are left out: the summaries credit them to the striker, like the raw queries,
+    # so a non-striker run out is only in the metrics
+    batting = summaries['batting_innings'].groupby('batter')[['balls_faced', 'runs', 'fours', 'sixes']].sum()
+    stats = metrics.batting_stats(deliveries).set_index('batter')
+    pd.testing.assert_frame_equal(batting.sort_index(), stats[batting.columns].sort_index(), check_dtype=False)
+
+@pytest.mark.parametrize('kind', NON_BOWLER_WICKETS)
+def test_non_bowler_dismissals_are_not_credited(kind):
+    deliveries = make_deliveries({('M1', 1, 'A'): [
+        (0, 1, 'A1', 'A2', 'B1', 0, 0, 0, 0, 0, 'A1', kind),
+        (0, 2, 'A3', 'A2', 'B1', 0, 0, 0, 0, 0, 'A3', 'lbw'),
+    ]})
+    assert metrics.bowling_stats(deliveries)['wickets'].tolist() == [1]
+    assert metrics.bowling_figures(deliveries)['figures'].tolist() == ['1/0']
+
+def test_partnerships(deliveries):
+    # Rows out of order are put back in the order they were bowled
+    shuffled = deliveries.sample(frac=1, random_state=3)
+    stands = metrics.partnerships(shuffled)
+    columns = ['match_id', 'innings_number', 'team', 'wicket', 'batter_1', 'batter_2',
+               'runs', 'balls', 'batter_1_runs', 'batter_2_runs', 'unbroken']
+    assert [tuple(row) for row in stands[columns].itertuples(index=False)] == [
+        # Runs include the wide and leg bye; the wide is not a ball faced
+        ('M1', 1, 'A', 1, 'A1', 'A2', 13, 5, 11, 0, False),
+        # A2 and A3 swap strike across the over; the stand ends when A2 is run out
+        ('M1', 1, 'A', 2, 'A2', 'A3', 4, 4, 3, 0, False),
+        ('M1', 1, 'A', 3, 'A3', 'A4', 4, 3, 1, 3, False),
+        ('M1', 2, 'B', 1, 'C1', 'C2', 0, 6, 0, 0, False),
+        ('M1', 2, 'B', 2, 'C2', 'C3', 1, 2, 1, 0, False),
+        ('M1', 2, 'B', 3, 'C2', 'C4', 2, 2, 0, 0, False),
+        ('M1', 2, 'B', 4, 'C2', 'C5', 1, 1, 0, 1, True),
+    ]
+
+def test_win_method():
+    limited = pd.DataFrame({'win_by_runs': [25, np.nan, np.nan, 0], 'win_by_wickets': [np.nan, 4, np.nan, np.nan]})
+    assert metrics.win_method(limited, other='No result').tolist() == ['Runs', 'Wickets', 'No result', 'No result']
+
+    tests = pd.DataFrame({'outcome_by_runs': [np.nan, 120, np.nan],
+                          'outcome_by_wickets': [7, np.nan, np.nan],
+                          'outcome_by_innings': [np.nan, 1, np.nan]})
+    labels = metrics.win_method(tests)
+    assert labels[:2].tolist() == ['Wickets', 'Runs']
+    assert pd.isna(labels[2])
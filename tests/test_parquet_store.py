@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+from parquet_store import ParquetStore
+
+@pytest.mark.parametrize('season', [None, '2019'])
+def test_appends_from_separate_stores_keep_earlier_files(tmp_path, season):
+    # Each run creates its own store; writes within the same second must not replace each other
+    first = pd.DataFrame({'match_id': ['1', '2'], 'runs': [10, 20]})
+    second = pd.DataFrame({'match_id': ['3'], 'runs': [30]})
+    if season is not None:
+        first['season'] = second['season'] = season
+    ParquetStore(str(tmp_path)).write_dataframe('t', first)
+    ParquetStore(str(tmp_path)).write_dataframe('t', second, truncate=False)
+    df = ParquetStore(str(tmp_path)).read_table('t')
+    assert sorted(df['match_id'].astype(str)) == ['1', '2', '3']
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+from ingest import MatchIngestor
+from query_catalog import QUERIES, QueryEngine, duckdb
+from summaries import NON_BOWLER_WICKETS
+from synthetic_data import SyntheticArchiveGenerator
+
+SUMMARY_QUERIES = sorted(name for name, entry in QUERIES.items() if 'summary_sql' in entry)
+# The synthetic matches have no super overs, so this query returns nothing either way
+EMPTY_ON_SYNTHETIC_DATA = {'t20_super_overs'}
+ENGINES = ['sqlite'] + (['duckdb'] if duckdb is not None else [])
+
+@pytest.fixture(scope='module')
+def dataframes(tmp_path_factory):
+    """The raw and summary tables of a few synthetic matches per format"""
+    folder = tmp_path_factory.mktemp('data')
+    SyntheticArchiveGenerator(str(folder), matches=12, seed=7).generate()
+    return MatchIngestor(data_folder=str(folder), summaries=True, cache=False).read_data()
+
+def full_result_params(name):
+    """Parameters that let every row through: thresholds of 1 and no effective limit"""
+    return {param: 10 ** 6 if param == 'limit' else 1 for param in QUERIES[name]['params']}
+
+def sorted_frame(df):
+    """Order the rows by every column, as tied rows may come back in any order"""
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def test_synthetic_data_has_every_dismissal_kind(dataframes):
+    # The summaries must leave the bowler's uncredited dismissals out just like the raw queries
+    kinds = set()
+    for table_name, df in dataframes.items():
+        if table_name.endswith('_deliveries'):
+            kinds.update(df['wicket_kind'].dropna().astype(str))
+    assert set(NON_BOWLER_WICKETS) <= kinds
+
+@pytest.mark.parametrize('engine_name', ENGINES)
+@pytest.mark.parametrize('name', SUMMARY_QUERIES)
+def test_summary_query_matches_raw_query(dataframes, engine_name, name):
+    engine = QueryEngine(engine_name)
+    engine.register_dataframes(dataframes)
+    try:
+        assert engine.query_sql(name) == QUERIES[name]['summary_sql']
+        params = full_result_params(name)
+        summary = engine.run(name, **params)
+        raw = engine.run(name, use_summaries=False, **params)
+    finally:
+        engine.close()
+
+    assert len(raw) > 0 or name in EMPTY_ON_SYNTHETIC_DATA
+    pd.testing.assert_frame_equal(sorted_frame(summary), sorted_frame(raw), check_dtype=False)
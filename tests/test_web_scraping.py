@@ -0,0 +1,143 @@
+import os
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from web_scraping import JSONDownloader, VALIDATORS_FILE
+
+ARCHIVES = {
+    'tests_json.zip': b'PK test archive',
+    'odis_json.zip': b'PK odi archive',
+    't20s_json.zip': b'PK t20 archive',
+    'ipl_json.zip': b'PK ipl archive',
+}
+CATEGORIES = {
+    'Test matches': 'tests_json.zip',
+    'One-day internationals': 'odis_json.zip',
+    'T20 internationals': 't20s_json.zip',
+    'Indian Premier League': 'ipl_json.zip',
+}
+LAST_MODIFIED = 'Sat, 01 Jun 2024 00:00:00 GMT'
+
+class FixtureServer(ThreadingHTTPServer):
+    """Serves a Cricsheet-like matches page and fixture ZIPs, recording every request"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FixtureHandler)
+        self.requests = []
+        # Archive name -> number of 503 responses to send before serving it
+        self.failures = {}
+        # Archive names whose response is cut short
+        self.truncated = set()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        name = self.path.rsplit('/', 1)[-1]
+        self.server.requests.append((name or 'matches', self.headers.get('If-None-Match'),
+                                     self.headers.get('If-Modified-Since')))
+        if self.path == '/matches/':
+            items = ''.join(f'<dt>{category}</dt><dd><a href="/downloads/{archive}">JSON</a></dd>'
+                            for category, archive in CATEGORIES.items())
+            return self.reply(200, f'<html><body><dl>{items}</dl></body></html>'.encode(), 'text/html')
+        if name not in ARCHIVES:
+            return self.reply(404, b'')
+        if self.server.failures.get(name):
+            self.server.failures[name] -= 1
+            return self.reply(503, b'')
+        etag = f'"{name}-1"'
+        if self.headers.get('If-None-Match') == etag or self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+            return self.reply(304, None, etag=etag)
+        body = ARCHIVES[name]
+        if name in self.server.truncated:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body) * 10))
+            self.end_headers()
+            self.wfile.write(body)
+            self.close_connection = True
+            return
+        self.reply(200, body, 'application/zip', etag=etag)
+
+    def reply(self, status, body, content_type='application/octet-stream', etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', LAST_MODIFIED)
+        if body is not None:
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+@pytest.fixture
+def server():
+    server = FixtureServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def downloader(server, folder):
+    return JSONDownloader(download_dir=str(folder), base_url=f'http://127.0.0.1:{server.server_port}')
+
+def archive_requests(server):
+    return [request for request in server.requests if request[0] != 'matches']
+
+def test_downloads_every_category_and_saves_validators(server, tmp_path):
+    downloaded = downloader(server, tmp_path).scrape_and_download()
+
+    assert sorted(os.path.basename(path) for path in downloaded) == sorted(ARCHIVES)
+    for name, content in ARCHIVES.items():
+        assert (tmp_path / name).read_bytes() == content
+    validators = json.loads((tmp_path / VALIDATORS_FILE).read_text())
+    assert validators['odis_json.zip']['etag'] == '"odis_json.zip-1"'
+    assert validators['odis_json.zip']['last_modified'] == LAST_MODIFIED
+    # The first download sends no validators
+    assert all(etag is None and since is None for _, etag, since in archive_requests(server))
+
+def test_unchanged_archives_are_not_downloaded_again(server, tmp_path):
+    downloader(server, tmp_path).scrape_and_download()
+    (tmp_path / 'ipl_json.zip').write_bytes(b'kept as it is')
+    server.requests.clear()
+
+    downloaded = downloader(server, tmp_path).scrape_and_download()
+
+    assert len(downloaded) == len(ARCHIVES)
+    # A 304 keeps the local file untouched
+    assert (tmp_path / 'ipl_json.zip').read_bytes() == b'kept as it is'
+    assert sorted(archive_requests(server)) == sorted(
+        (name, f'"{name}-1"', LAST_MODIFIED) for name in ARCHIVES)
+
+def test_missing_file_is_downloaded_without_validators(server, tmp_path):
+    downloader(server, tmp_path).scrape_and_download()
+    (tmp_path / 'tests_json.zip').unlink()
+    server.requests.clear()
+
+    downloader(server, tmp_path).scrape_and_download()
+
+    assert ('tests_json.zip', None, None) in archive_requests(server)
+    assert (tmp_path / 'tests_json.zip').read_bytes() == ARCHIVES['tests_json.zip']
+
+def test_server_errors_are_retried(server, tmp_path):
+    server.failures['t20s_json.zip'] = 2
+
+    downloaded = downloader(server, tmp_path).scrape_and_download()
+
+    assert len(downloaded) == len(ARCHIVES)
+    assert [request[0] for request in server.requests].count('t20s_json.zip') == 3
+    assert (tmp_path / 't20s_json.zip').read_bytes() == ARCHIVES['t20s_json.zip']
+
+def test_failed_download_leaves_no_partial_file(server, tmp_path):
+    (tmp_path / 'odis_json.zip').write_bytes(b'previous archive')
+    server.truncated.add('odis_json.zip')
+
+    downloaded = downloader(server, tmp_path).scrape_and_download()
+
+    assert 'odis_json.zip' not in [os.path.basename(path) for path in downloaded]
+    assert (tmp_path / 'odis_json.zip').read_bytes() == b'previous archive'
+    assert not (tmp_path / 'odis_json.zip.part').exists()
+    assert 'odis_json.zip' not in json.loads((tmp_path / VALIDATORS_FILE).read_text())
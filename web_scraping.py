@@ -1,16 +1,31 @@
 import os
+import json
+import threading
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import instrumentation
+
+# ETag/Last-Modified of every downloaded archive, kept next to the files
+VALIDATORS_FILE = 'download_validators.json'
 
 class JSONDownloader:
     """Class to handle downloading cricket match data from cricsheet.org"""
-    
-    def __init__(self, download_dir="data"):
-        """Initialize with the directory to save downloaded files"""
+
+    def __init__(self, download_dir="data", base_url="https://cricsheet.org", workers=4, chunk_size=1 << 20):
+        """Initialize with the directory to save downloaded files
+
+        base_url can point at another server (e.g. a local one serving fixture ZIPs),
+        workers is the number of concurrent downloads and chunk_size the streaming chunk in bytes.
+        """
         self.download_dir = download_dir
-        self.base_url = "https://cricsheet.org"
+        self.base_url = base_url
         self.page_url = urljoin(self.base_url, "/matches/")
+        self.workers = workers
+        self.chunk_size = chunk_size
         # Categories to download
         self.categories = [
             "Test matches",
@@ -18,53 +33,133 @@ class JSONDownloader:
             "T20 internationals",
             "Indian Premier League"
         ]
-        
+
         # Create download directory
         os.makedirs(self.download_dir, exist_ok=True)
-    
+
+        # One pooled session shared by every download thread
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.validators_path = os.path.join(self.download_dir, VALIDATORS_FILE)
+        self.validators = self.load_validators()
+        self.lock = threading.Lock()
+
+    def load_validators(self):
+        """Load the ETag/Last-Modified headers saved by previous runs"""
+        if os.path.exists(self.validators_path):
+            with open(self.validators_path) as f:
+                return json.load(f)
+        return {}
+
+    def save_validators(self):
+        """Write the ETag/Last-Modified headers atomically"""
+        tmp_path = f"{self.validators_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.validators, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.validators_path)
+
+    def conditional_headers(self, filename, file_path):
+        """Return If-None-Match/If-Modified-Since headers for a file downloaded before"""
+        saved = self.validators.get(filename)
+        if not saved or not os.path.exists(file_path):
+            return {}
+        headers = {}
+        if saved.get('etag'):
+            headers['If-None-Match'] = saved['etag']
+        if saved.get('last_modified'):
+            headers['If-Modified-Since'] = saved['last_modified']
+        return headers
+
+    @instrumentation.timed('download', lambda self, url: {'file': os.path.basename(url)})
     def download_file(self, url):
-        """Download a file from a given URL and save it in the download directory."""
+        """Download a file from a given URL and save it in the download directory.
+
+        The response is streamed to disk in chunks; an archive the server reports as
+        unchanged (304 Not Modified) is kept as it is. Returns the file path, or None on error.
+        """
         filename = os.path.basename(url)
         file_path = os.path.join(self.download_dir, filename)
-        
-        response = requests.get(url)
-        with open(file_path, "wb") as f:
-            f.write(response.content)
+
+        try:
+            with self.session.get(url, headers=self.conditional_headers(filename, file_path), stream=True) as response:
+                if response.status_code == 304:
+                    print(f"Unchanged: {filename}")
+                    instrumentation.count('downloads', status='unchanged')
+                    return file_path
+                response.raise_for_status()
+
+                # Write to a temporary file so an interrupted download never replaces a good archive
+                tmp_path = f"{file_path}.part"
+                try:
+                    with open(tmp_path, "wb") as f:
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            f.write(chunk)
+                    os.replace(tmp_path, file_path)
+                finally:
+                    # Only left behind when the download failed part way
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                instrumentation.count('downloads', status='downloaded')
+                instrumentation.count('download_bytes', os.path.getsize(file_path), file=filename)
+
+                with self.lock:
+                    self.validators[filename] = {
+                        'url': url,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                    }
+        except (requests.RequestException, OSError) as e:
+            print(f"Error downloading {filename}: {e}")
+            return None
         print(f"Downloaded: {filename}")
         return file_path
-    
-    def scrape_and_download(self):
-        """Main method to scrape cricket data from cricsheet.org and download ZIP files"""
-        print("Starting download of cricket match data...")
-        
+
+    def find_links(self):
+        """Return the absolute JSON archive URL of every category found on the matches page"""
         # Get the webpage content
-        response = requests.get(self.page_url)
+        response = self.session.get(self.page_url)
+        response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
-        
-        downloaded_files = []
-        
+
+        links = []
+
         # Process each category
         for category in self.categories:
             print(f"Processing category: {category}")
-            
-            # Find elements and download files
+
+            # Find elements and collect the links
             dt_element = soup.find('dt', string=lambda text: category in text if text else False)
             if dt_element:
                 dd_element = dt_element.find_next('dd')
                 json_link = dd_element.find('a', string='JSON')
                 if json_link:
                     relative_url = json_link['href']
-                    
+
                     # Convert relative URL to absolute URL
-                    absolute_url = urljoin(self.base_url, relative_url)
-                    
+                    absolute_url = urljoin(self.page_url, relative_url)
+
                     print(f"Found JSON link: {absolute_url}")
-                    downloaded_file = self.download_file(absolute_url)
-                    downloaded_files.append(downloaded_file)
+                    links.append(absolute_url)
                 else:
                     print(f"No JSON link found for {category}")
             else:
                 print(f"Category {category} not found on the page")
+        return links
+
+    def scrape_and_download(self):
+        """Main method to scrape cricket data from cricsheet.org and download ZIP files"""
+        print("Starting download of cricket match data...")
+
+        links = self.find_links()
+
+        # Download the categories concurrently over the pooled session
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            downloaded_files = [path for path in executor.map(self.download_file, links) if path]
+        self.save_validators()
 
         print("Download complete.")
-        return downloaded_files
\ No newline at end of file
+        return downloaded_files